@@ -613,6 +613,15 @@ PIPELINE_DEFAULT_CONTAINER_MEMORY_REQUEST = os.environ.get(
 )
 PIPELINE_RUN_DEFAULT_TIMEOUT = os.environ.get("PIPELINE_RUN_DEFAULT_TIMEOUT", 14400)
 PIPELINE_RUN_MAX_TIMEOUT = os.environ.get("PIPELINE_RUN_MAX_TIMEOUT", 43200)
+# "fork" spawns a runner process per run, "pool" supervises all runs from a single process
+PIPELINE_RUNNER_MODE = os.environ.get("PIPELINE_RUNNER_MODE", "fork")
+PIPELINE_RUNNER_MAX_CONCURRENCY = int(
+    os.environ.get("PIPELINE_RUNNER_MAX_CONCURRENCY", 100)
+)
+# Only the last PIPELINE_RUN_LOGS_MAX_SIZE bytes of the logs of a run are kept
+PIPELINE_RUN_LOGS_MAX_SIZE = int(
+    os.environ.get("PIPELINE_RUN_LOGS_MAX_SIZE", 20 * 1024 * 1024)
+)
 
 # AI Assistant config
 ASSISTANT_MONTHLY_LIMIT = int(os.environ.get("ASSISTANT_MONTHLY_LIMIT", 200))
@@ -645,6 +654,20 @@ OVERRIDE_WORKSPACES_DATABASE_HOST = os.environ.get(
 WORKSPACE_DATABASE_QUERY_MAX_ROWS = int(
     os.environ.get("WORKSPACE_DATABASE_QUERY_MAX_ROWS", "100000")
 )
+# Seconds a snapshot of the tables and columns of a workspace database is kept in the
+# cache, it is checked against the PostgreSQL catalog before use (see
+# hexa.databases.utils). 0 disables the cache.
+WORKSPACE_DATABASE_CATALOG_TTL = int(
+    os.environ.get("WORKSPACE_DATABASE_CATALOG_TTL", 15 * 60)
+)
+# Pools of connections to the workspace databases, per process and per role (see
+# hexa.databases.pool): maximum number of connections of a pool (0 disables the
+# pools) and seconds after which an unused connection is closed. The connections
+# of all the processes count towards the CONNECTION LIMIT of the databases.
+WORKSPACE_DATABASE_POOL_SIZE = int(os.environ.get("WORKSPACE_DATABASE_POOL_SIZE", 4))
+WORKSPACE_DATABASE_POOL_MAX_IDLE = int(
+    os.environ.get("WORKSPACE_DATABASE_POOL_MAX_IDLE", 60)
+)
 # Admission control for the Data Studio CSV export: max concurrent full-result
 # downloads per web-worker process. Each holds a read-only DB connection open for the
 # whole client download, so this bounds per-worker resource use; excess callers get a
@@ -660,6 +683,36 @@ WORKSPACE_DATASETS_BUCKET = os.environ.get("WORKSPACE_DATASETS_BUCKET", "hexa-da
 WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE = int(
     os.environ.get("WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE", 50)
 )
+# Above this number of rows, distinct counts and quantiles of dataset files are estimated
+WORKSPACE_DATASETS_PROFILING_EXACT_MAX_ROWS = int(
+    os.environ.get("WORKSPACE_DATASETS_PROFILING_EXACT_MAX_ROWS", 1_000_000)
+)
+# Engine used to read and profile CSV and Parquet dataset files: "arrow" (pyarrow compute kernels) or "pandas"
+WORKSPACE_DATASETS_PROFILING_ENGINE = os.environ.get(
+    "WORKSPACE_DATASETS_PROFILING_ENGINE", "arrow"
+)
+# Above this number of rows, Parquet files are only profiled from the statistics of their footer
+WORKSPACE_DATASETS_PARQUET_FOOTER_PROFILING_MIN_ROWS = int(
+    os.environ.get("WORKSPACE_DATASETS_PARQUET_FOOTER_PROFILING_MIN_ROWS", 1_000_000)
+)
+# Approximate memory (in bytes) used to read and profile a chunk of a dataset file
+WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT = int(
+    os.environ.get("WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT", 512 * 1024 * 1024)
+)
+# Number of metadata jobs processed at the same time by a dataset worker, and limits of each job (0 for no limit)
+WORKSPACE_DATASETS_WORKER_PROCESSES = int(
+    os.environ.get("WORKSPACE_DATASETS_WORKER_PROCESSES", 2)
+)
+WORKSPACE_DATASETS_WORKER_JOB_MEMORY_LIMIT = int(
+    os.environ.get("WORKSPACE_DATASETS_WORKER_JOB_MEMORY_LIMIT", 4 * 1024 * 1024 * 1024)
+)
+WORKSPACE_DATASETS_WORKER_JOB_TIME_LIMIT = int(
+    os.environ.get("WORKSPACE_DATASETS_WORKER_JOB_TIME_LIMIT", 60 * 60)
+)
+# Minimum delay in seconds between two crawls of the bucket of a workspace to refresh the index of its objects
+WORKSPACE_FILES_INDEX_CRAWL_INTERVAL = int(
+    os.environ.get("WORKSPACE_FILES_INDEX_CRAWL_INTERVAL", 60 * 60)
+)
 # Dynamically configure the storage backend based on the STORAGE_BACKEND environment variable
 STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "fs")
 WORKSPACE_BUCKET_VERSIONING_ENABLED = (
@@ -15,6 +15,11 @@ DEBUG = False
 # hash), which adds up since many tests create users in setUp/setUpTestData.
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 
+# The workspace database catalogs are read live, the tests of the catalog cache enable it.
+WORKSPACE_DATABASE_CATALOG_TTL = 0
+# Connections are not pooled either (many tests mock psycopg2.connect), the tests of the pools enable them.
+WORKSPACE_DATABASE_POOL_SIZE = 0
+
 ALLOWED_HOSTS = ["*"]
 CORS_ALLOWED_ORIGINS = ["http://localhost:3000"]
 CORS_ALLOW_CREDENTIALS = True
@@ -0,0 +1,124 @@
+"""Concurrent calls to slow backends, such as the databases or the buckets of the workspaces.
+
+`fan_out` calls a function for each item in threads, with a bounded number of calls in progress. Each call is given
+`timeout` seconds from its submission: the calls that fail or take longer are left out of the results (a thread can
+not be interrupted, a timed out call runs to its end in the background and its result is ignored), so that a slow or
+unavailable backend only delays the others by the timeout and the other results are still returned.
+
+The calls of all the fan-outs of a process run in a single pool of `FAN_OUT_MAX_THREADS` threads: the calls that
+keep running after their timeout hold one of its threads until they end, instead of adding threads without bound.
+The calls given to `fan_out` should therefore be bounded in time themselves (with connection and statement timeouts).
+"""
+
+import math
+import os
+import threading
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from logging import getLogger
+
+from django import db
+
+logger = getLogger(__name__)
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+# Maximum number of threads running the calls of the fan-outs of a process
+FAN_OUT_MAX_THREADS = 32
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # The threads of the parent process do not exist in a forked process
+            _executor = ThreadPoolExecutor(
+                max_workers=FAN_OUT_MAX_THREADS, thread_name_prefix="fan-out"
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+@dataclass
+class FanOutResult(typing.Generic[T, R]):
+    # (item, result) of the successful calls, in the order of the items
+    results: list[tuple[T, R]] = field(default_factory=list)
+    failed: list[T] = field(default_factory=list)
+    timed_out: list[T] = field(default_factory=list)
+
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.failed or self.timed_out)
+
+
+def fan_out(
+    func: typing.Callable[[T], R],
+    items: typing.Iterable[T],
+    max_workers: int = 8,
+    timeout: float | None = None,
+) -> FanOutResult[T, R]:
+    """Call `func` for each item, with up to `max_workers` calls in progress, and return the results of the calls that
+    succeeded within `timeout` seconds.
+    """
+    items = list(items)
+    executor = get_executor()
+    # Positions of the items of the calls in progress (and not timed out), with their deadlines
+    positions: dict[Future, int] = {}
+    deadlines: dict[Future, float] = {}
+    values: dict[int, R] = {}
+    result = FanOutResult()
+
+    def call(item: T) -> R:
+        try:
+            return func(item)
+        finally:
+            # Django connections are per thread, the ones opened by the call would otherwise be leaked
+            db.connections.close_all()
+
+    next_position = 0
+    while next_position < len(items) or positions:
+        while next_position < len(items) and len(positions) < max_workers:
+            future = executor.submit(call, items[next_position])
+            positions[future] = next_position
+            deadlines[future] = (
+                time.monotonic() + timeout if timeout is not None else math.inf
+            )
+            next_position += 1
+
+        remaining = min(deadlines.values()) - time.monotonic()
+        done, _ = wait(
+            positions,
+            timeout=None if remaining == math.inf else max(remaining, 0),
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            position = positions.pop(future)
+            del deadlines[future]
+            error = future.exception()
+            if error is not None:
+                logger.warning("Call for %s failed", items[position], exc_info=error)
+                result.failed.append(items[position])
+            else:
+                values[position] = future.result()
+
+        now = time.monotonic()
+        for future, deadline in list(deadlines.items()):
+            if deadline <= now:
+                position = positions.pop(future)
+                del deadlines[future]
+                # A call still waiting for a thread is not started anymore
+                future.cancel()
+                logger.warning("Call for %s timed out", items[position])
+                result.timed_out.append(items[position])
+
+    result.results = [
+        (items[position], values[position]) for position in sorted(values)
+    ]
+    return result
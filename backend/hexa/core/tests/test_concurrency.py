@@ -0,0 +1,110 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from hexa.core import concurrency
+from hexa.core.concurrency import fan_out
+
+
+class FanOutTest(SimpleTestCase):
+    def test_fan_out(self):
+        def double(item):
+            # The last items complete first
+            time.sleep(0.01 * (5 - item))
+            return item * 2
+
+        result = fan_out(double, range(5))
+
+        self.assertEqual(result.results, [(i, i * 2) for i in range(5)])
+        self.assertFalse(result.is_partial)
+
+    def test_fan_out_concurrently(self):
+        barrier = threading.Barrier(3, timeout=1)
+
+        # Would time out if the calls were made one after the other
+        result = fan_out(lambda item: barrier.wait() >= 0, range(3), timeout=2)
+
+        self.assertEqual(len(result.results), 3)
+
+    def test_fan_out_max_workers(self):
+        lock = threading.Lock()
+        in_progress = []
+        max_in_progress = []
+
+        def call(item):
+            with lock:
+                in_progress.append(item)
+                max_in_progress.append(len(in_progress))
+            time.sleep(0.01)
+            with lock:
+                in_progress.remove(item)
+            return item
+
+        result = fan_out(call, range(10), max_workers=3)
+
+        self.assertEqual([value for _, value in result.results], list(range(10)))
+        self.assertEqual(max(max_in_progress), 3)
+
+    def test_fan_out_timeout(self):
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def call(item):
+            if item == "slow":
+                released.wait(5)
+            return item
+
+        started_at = time.monotonic()
+        result = fan_out(call, ["a", "slow", "b"], timeout=0.2)
+
+        self.assertLess(time.monotonic() - started_at, 2)
+        self.assertEqual(result.results, [("a", "a"), ("b", "b")])
+        self.assertEqual(result.timed_out, ["slow"])
+        self.assertTrue(result.is_partial)
+
+    def test_fan_out_timeout_frees_worker(self):
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def call(item):
+            if item == "slow":
+                released.wait(5)
+            return item
+
+        result = fan_out(call, ["slow", "a", "b"], max_workers=1, timeout=0.2)
+
+        self.assertEqual(result.results, [("a", "a"), ("b", "b")])
+        self.assertEqual(result.timed_out, ["slow"])
+
+    def test_fan_out_threads_are_bounded(self):
+        released = threading.Event()
+        self.addCleanup(released.set)
+        threads = set()
+
+        def call(item):
+            threads.add(threading.get_ident())
+            released.wait(5)
+            return item
+
+        with patch.multiple(concurrency, FAN_OUT_MAX_THREADS=2, _executor=None):
+            # The timed out calls keep running, the calls of the next fan-outs wait for their threads
+            for _ in range(3):
+                result = fan_out(call, range(2), timeout=0.1)
+                self.assertEqual(result.timed_out, [0, 1])
+
+        self.assertEqual(len(threads), 2)
+
+    def test_fan_out_failure(self):
+        def call(item):
+            if item == "broken":
+                raise ValueError("Broken")
+            return item
+
+        with self.assertLogs("hexa.core.concurrency", level="WARNING"):
+            result = fan_out(call, ["a", "broken", "b"])
+
+        self.assertEqual(result.results, [("a", "a"), ("b", "b")])
+        self.assertEqual(result.failed, ["broken"])
+        self.assertEqual(result.timed_out, [])
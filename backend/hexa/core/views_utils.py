@@ -22,3 +22,30 @@ def disable_cors(view_func):
         return view_func(request, *args, **kwargs)
 
     return _wrapped_view
+
+
+def parse_range_header(header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse the `Range` header of a request for a resource of `size` bytes.
+
+    Only single byte ranges are supported. Returns the (start, end) offsets of the range, `end`
+    excluded, or None if there is no supported range. Raises ValueError if the range cannot be
+    satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header.removeprefix("bytes=").strip().partition("-")
+    try:
+        start = int(first) if first else None
+        last = int(last) if last else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # the last `last` bytes
+        if not last or not size:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - last), size
+    end = size if last is None else min(last + 1, size)
+    if start >= size or end <= start:
+        raise ValueError("Range not satisfiable")
+    return start, end
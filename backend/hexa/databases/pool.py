@@ -0,0 +1,258 @@
+"""Pools of connections to the workspace databases.
+
+Opening a connection to a workspace database costs a TCP handshake and an authentication, which the queries of the
+Data Studio and the listings of the tables would otherwise pay on every call. The connections are kept open after use
+in a pool per process for each database and role, and reused by the next calls:
+
+- a pool opens at most `WORKSPACE_DATABASE_POOL_SIZE` connections, the calls wait for a connection to be released
+  when they are all in use
+- the connections left unused for `WORKSPACE_DATABASE_POOL_MAX_IDLE` seconds are closed, the ones left unused for
+  more than `LIVENESS_CHECK_IDLE` seconds are checked with a query before being reused
+- closing a pooled connection returns it to its pool, after its transaction is rolled back and its session state is
+  discarded (the read-only role runs arbitrary statements, the next caller must not see their settings)
+- the pool of a role is closed when its password changes (see `Workspace.generate_new_database_password`)
+"""
+
+import os
+import threading
+import time
+from logging import getLogger
+
+import psycopg2
+from django.conf import settings
+from psycopg2.extensions import TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extensions import connection as Connection
+from psycopg2.pool import PoolError
+
+logger = getLogger(__name__)
+
+# Seconds to wait for a connection to be released when all the connections of a pool are in use
+ACQUIRE_TIMEOUT = 10
+# Seconds after which an idle connection is checked on the server before being reused (the server, or a proxy in
+# between, may have closed it in the meantime)
+LIVENESS_CHECK_IDLE = 5
+
+
+class PooledConnection(Connection):
+    """Connection returned to its pool when closed."""
+
+    pool = None
+    in_use = False
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+
+def reset_connection(conn: Connection) -> bool:
+    """Roll back the transaction of the connection and discard its session state.
+
+    Returns False when the connection can not be used anymore.
+    """
+    if conn.closed:
+        return False
+    try:
+        conn.rollback()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            # Also drops the temporary tables, prepared statements and session settings
+            cursor.execute("DISCARD ALL")
+        conn.autocommit = False
+    except psycopg2.Error:
+        return False
+    return True
+
+
+def is_alive(conn: Connection, idle: float) -> bool:
+    """Whether an idle connection can be used, checked on the server when it has been idle for a while."""
+    if conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if idle < LIVENESS_CHECK_IDLE:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+class ConnectionPool:
+    def __init__(self, max_size: int, max_idle: float, **connect_kwargs):
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.connect_kwargs = connect_kwargs
+        # Idle connections with the time they were released, the most recently released last
+        self._idle: list[tuple[PooledConnection, float]] = []
+        # Number of open connections, idle or in use
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return self._size
+
+    def acquire(
+        self, timeout: float = ACQUIRE_TIMEOUT, connect_timeout: int | None = None
+    ) -> PooledConnection:
+        """Return an idle connection, or a new connection opened within `connect_timeout` seconds when none is idle.
+
+        Waits up to `timeout` seconds for a connection to be released when all the connections are in use.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                self._evict_idle()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError("Connection pool exhausted")
+                    self._condition.wait(remaining)
+                if not self._idle:
+                    self._size += 1
+                    break
+                conn, released_at = self._idle.pop()
+
+            # Checked outside of the lock, the connection is not idle anymore
+            if is_alive(conn, time.monotonic() - released_at):
+                conn.in_use = True
+                return conn
+            logger.info("Discarding a broken connection of the pool")
+            with self._condition:
+                self._size -= 1
+                self._discard(conn)
+                self._condition.notify()
+
+        try:
+            conn = psycopg2.connect(
+                connection_factory=PooledConnection,
+                connect_timeout=connect_timeout,
+                **self.connect_kwargs,
+            )
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        conn.pool = self
+        conn.in_use = True
+        return conn
+
+    def release(self, conn: PooledConnection):
+        if not conn.in_use:
+            # Already released
+            return
+        conn.in_use = False
+        reusable = not self._closed and reset_connection(conn)
+        with self._condition:
+            if reusable and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._size -= 1
+                self._discard(conn)
+            self._condition.notify()
+
+    def evict_idle(self):
+        with self._condition:
+            self._evict_idle()
+
+    def close(self):
+        """Close the idle connections, the connections in use are closed when released."""
+        with self._condition:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._size -= 1
+                self._discard(conn)
+            self._idle = []
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            self._discard(conn)
+
+    @staticmethod
+    def _discard(conn: PooledConnection):
+        conn.pool = None
+        if not conn.closed:
+            conn.close()
+
+
+# Pools of the process, by (host, port, database, role)
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+_pools_swept_at = time.monotonic()
+
+
+def _sweep_pools():
+    """Close the idle connections of all the pools, including the pools of the workspaces not queried anymore."""
+    global _pools_swept_at
+    _pools_swept_at = time.monotonic()
+    for pool in _pools.values():
+        pool.evict_idle()
+
+
+def get_pool(host, port, dbname: str, user: str, password: str) -> ConnectionPool:
+    global _pools, _pools_pid
+    with _pools_lock:
+        if os.getpid() != _pools_pid:
+            # The connections of the parent process can not be shared with a forked process
+            _pools, _pools_pid = {}, os.getpid()
+        if (
+            time.monotonic() - _pools_swept_at
+            > settings.WORKSPACE_DATABASE_POOL_MAX_IDLE
+        ):
+            _sweep_pools()
+
+        key = (host, port, dbname, user)
+        pool = _pools.get(key)
+        if pool is not None and pool.connect_kwargs["password"] != password:
+            # The password of the role was changed, the connections opened with the previous one are closed
+            logger.info("Closing the connection pool of role %s on %s", user, dbname)
+            pool.close()
+            pool = None
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                max_size=settings.WORKSPACE_DATABASE_POOL_SIZE,
+                max_idle=settings.WORKSPACE_DATABASE_POOL_MAX_IDLE,
+                host=host,
+                port=port,
+                dbname=dbname,
+                user=user,
+                password=password,
+            )
+        return pool
+
+
+def connect(
+    *,
+    host,
+    port,
+    dbname: str,
+    user: str,
+    password: str,
+    connect_timeout: int | None = None,
+) -> Connection:
+    """Return a connection from the pool of the database and role, or a new connection when the pools are disabled.
+
+    The connection must be closed after use to be returned to its pool. With a `connect_timeout`, it is also the
+    maximum time to wait for a connection of a full pool.
+    """
+    if not settings.WORKSPACE_DATABASE_POOL_SIZE:
+        return psycopg2.connect(
+            host=host,
+            port=port,
+            dbname=dbname,
+            user=user,
+            password=password,
+            connect_timeout=connect_timeout,
+        )
+    return get_pool(host, port, dbname, user, password).acquire(
+        timeout=ACQUIRE_TIMEOUT if connect_timeout is None else connect_timeout,
+        connect_timeout=connect_timeout,
+    )
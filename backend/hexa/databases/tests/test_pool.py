@@ -0,0 +1,171 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.pool import PoolError
+
+from hexa.core.test import TestCase
+from hexa.databases import pool
+from hexa.databases.utils import (
+    get_workspace_database_connection,
+    get_workspace_database_ro_connection,
+    stream_database_query,
+)
+from hexa.user_management.models import User
+from hexa.workspaces.tests.testutils import create_workspace
+
+
+def backend_pid(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+def close_pools():
+    with pool._pools_lock:
+        for connection_pool in pool._pools.values():
+            connection_pool.close()
+        pool._pools.clear()
+
+
+@override_settings(WORKSPACE_DATABASE_POOL_SIZE=2, WORKSPACE_DATABASE_POOL_MAX_IDLE=60)
+class ConnectionPoolTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER = User.objects.create_user(
+            "superuser@bluesquarehub.com", "superuserpassword", is_superuser=True
+        )
+        cls.WORKSPACE = create_workspace(
+            cls.USER, name="Test Workspace", description="", countries=[]
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(close_pools)
+
+    def test_connection_is_reused(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        pid = backend_pid(conn)
+        conn.close()
+
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        self.assertEqual(pid, backend_pid(conn))
+        conn.close()
+
+    def test_roles_have_their_own_pool(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        ro_conn = get_workspace_database_ro_connection(self.WORKSPACE)
+
+        with ro_conn.cursor() as cursor:
+            cursor.execute("SELECT current_user")
+            self.assertEqual(self.WORKSPACE.db_ro_username, cursor.fetchone()[0])
+        self.assertNotEqual(backend_pid(conn), backend_pid(ro_conn))
+        conn.close()
+        ro_conn.close()
+
+    def test_session_state_is_discarded(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = 1234")
+            cursor.execute("CREATE TEMPORARY TABLE scratch (id int)")
+        conn.close()
+
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        self.assertFalse(conn.autocommit)
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            self.assertEqual("0", cursor.fetchone()[0])
+            cursor.execute("SELECT to_regclass('scratch')")
+            self.assertIsNone(cursor.fetchone()[0])
+        conn.close()
+
+    def test_transaction_is_rolled_back(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE TABLE uncommitted (id int)")
+        conn.close()
+
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('uncommitted')")
+            self.assertIsNone(cursor.fetchone()[0])
+        conn.close()
+
+    def test_pool_size_is_bounded(self):
+        connections = [
+            get_workspace_database_connection(self.WORKSPACE) for _ in range(2)
+        ]
+
+        workspace_pool = connections[0].pool
+        with self.assertRaises(PoolError):
+            workspace_pool.acquire(timeout=0.1)
+
+        connections[0].close()
+        conn = workspace_pool.acquire(timeout=0.1)
+        self.assertIs(connections[0], conn)
+        conn.close()
+        connections[1].close()
+
+    def test_streamed_query_closed_before_first_batch_is_released(self):
+        for _ in range(3):
+            _, batches = stream_database_query(self.WORKSPACE, "SELECT 1 AS id")
+            batches.close()
+
+        conn = get_workspace_database_ro_connection(self.WORKSPACE)
+        self.assertEqual(1, len(conn.pool))
+        conn.close()
+
+    def test_broken_connection_is_discarded(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        pid = backend_pid(conn)
+        workspace_pool = conn.pool
+        # Close the underlying connection, as if the server had terminated it
+        workspace_pool._discard(conn)
+        conn.pool = workspace_pool
+        conn.close()
+
+        self.assertEqual(0, len(workspace_pool))
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        self.assertNotEqual(pid, backend_pid(conn))
+        conn.close()
+
+    @patch.object(pool, "LIVENESS_CHECK_IDLE", 0)
+    def test_terminated_idle_connection_is_discarded(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        other_conn = get_workspace_database_connection(self.WORKSPACE)
+        pid = backend_pid(conn)
+        conn.close()
+        # The server terminates the idle connection
+        with other_conn.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        self.assertNotEqual(pid, backend_pid(conn))
+        self.assertEqual(2, len(conn.pool))
+        conn.close()
+        other_conn.close()
+
+    @override_settings(WORKSPACE_DATABASE_POOL_MAX_IDLE=0)
+    def test_idle_connection_is_evicted(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        pid = backend_pid(conn)
+        conn.close()
+
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        self.assertNotEqual(pid, backend_pid(conn))
+        conn.close()
+
+    def test_pool_is_closed_when_password_changes(self):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        idle_conn = get_workspace_database_connection(self.WORKSPACE)
+        idle_conn.close()
+
+        self.WORKSPACE.generate_new_database_password(principal=self.USER)
+
+        new_conn = get_workspace_database_connection(self.WORKSPACE)
+        self.assertIsNot(conn.pool, new_conn.pool)
+        self.assertTrue(idle_conn.closed)
+        conn.close()
+        self.assertTrue(conn.closed)
+        new_conn.close()
@@ -1,5 +1,7 @@
 from unittest import mock
 
+from django.core.cache import cache
+from django.test import override_settings
 from psycopg2.errors import (
     InsufficientPrivilege,
     QueryCanceled,
@@ -8,25 +10,31 @@ from psycopg2.errors import (
 from psycopg2.errors import (
     SyntaxError as PgSyntaxError,
 )
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from psycopg2.extras import DictRow
 
 from hexa.core.test import TestCase
 from hexa.databases.query_text import MultipleStatementsError
 from hexa.databases.tests.helpers import seed_demo_table
 from hexa.databases.utils import (
+    CatalogSnapshot,
     OrderByDirectionEnum,
     TableNotFound,
     TableRowsPage,
     delete_table,
     execute_database_query,
+    get_catalog_cache_key,
     get_database_definition,
     get_database_definition_page,
     get_full_database_definition,
     get_row_count,
     get_table_definition,
     get_table_rows,
+    get_workspace_database_connection,
     get_workspace_database_ro_connection,
+    invalidate_catalog_snapshot,
     stream_database_query,
+    take_catalog_snapshot,
     validate_query,
 )
 from hexa.plugins.connector_postgresql.models import Database
@@ -96,6 +104,126 @@ class GetRowCountTest(TestCase):
         self.assertEqual(1, cursor.execute.call_count)
 
 
+class CatalogSnapshotTest(TestCase):
+    def setUp(self):
+        self.snapshot = CatalogSnapshot(
+            structure="structure",
+            tables=[
+                {"name": "demo", "columns": []},
+                {"name": "demo_view", "columns": []},
+            ],
+            taken_at=0,
+            reltuples={"demo": 10, "demo_view": -1},
+        )
+        self.snapshot.update_statistics({"demo": [10, 3], "demo_view": [-1, None]})
+
+    @mock.patch("hexa.databases.utils.get_row_count", return_value=10)
+    def test_row_count_is_kept(self, mock_get_row_count):
+        self.assertEqual(10, self.snapshot.get_row_count(mock.MagicMock(), "demo"))
+        self.assertEqual(10, self.snapshot.get_row_count(mock.MagicMock(), "demo"))
+
+        mock_get_row_count.assert_called_once()
+
+    @mock.patch("hexa.databases.utils.get_row_count", side_effect=[10, 12])
+    def test_row_count_of_modified_table_is_computed_again(self, _):
+        self.assertEqual(10, self.snapshot.get_row_count(mock.MagicMock(), "demo"))
+        self.snapshot.update_statistics({"demo": [10, 5]})
+
+        self.assertEqual(12, self.snapshot.get_row_count(mock.MagicMock(), "demo"))
+
+    @mock.patch("hexa.databases.utils.get_row_count", side_effect=[4, 5])
+    def test_row_count_of_view_is_always_computed(self, _):
+        cursor = mock.MagicMock()
+        self.assertEqual(4, self.snapshot.get_row_count(cursor, "demo_view"))
+        self.assertEqual(5, self.snapshot.get_row_count(cursor, "demo_view"))
+
+
+@override_settings(WORKSPACE_DATABASE_CATALOG_TTL=60)
+class CachedCatalogTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER_SUPERUSER = User.objects.create_user(
+            "superuser@bluesquarehub.com", "superuserpassword", is_superuser=True
+        )
+        cls.WORKSPACE = create_workspace(
+            cls.USER_SUPERUSER,
+            name="Test Workspace",
+            description="Test workspace",
+            countries=[],
+        )
+
+    def setUp(self):
+        super().setUp()
+        seed_demo_table(self.WORKSPACE, [(1, "a"), (2, "b")])
+        invalidate_catalog_snapshot(self.WORKSPACE)
+        self.addCleanup(invalidate_catalog_snapshot, self.WORKSPACE)
+
+    def execute(self, statement):
+        conn = get_workspace_database_connection(self.WORKSPACE)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(statement)
+        finally:
+            conn.close()
+
+    def test_catalog_is_cached(self):
+        with mock.patch(
+            "hexa.databases.utils.take_catalog_snapshot",
+            wraps=take_catalog_snapshot,
+        ) as mock_take_catalog_snapshot:
+            first = get_table_definition(self.WORKSPACE, "demo")
+            second = get_table_definition(self.WORKSPACE, "demo")
+            get_database_definition_page(self.WORKSPACE, with_columns=True)
+
+        self.assertEqual(first, second)
+        self.assertEqual(2, second["count"])
+        mock_take_catalog_snapshot.assert_called_once()
+
+    def test_catalog_is_invalidated_by_ddl(self):
+        get_table_definition(self.WORKSPACE, "demo")
+
+        self.execute("ALTER TABLE demo ADD COLUMN value float")
+        self.assertEqual(
+            ["id", "label", "value"],
+            [
+                column["name"]
+                for column in get_table_definition(self.WORKSPACE, "demo")["columns"]
+            ],
+        )
+
+        self.execute("ALTER TABLE demo RENAME COLUMN value TO amount")
+        self.assertEqual(
+            "amount",
+            get_table_definition(self.WORKSPACE, "demo")["columns"][2]["name"],
+        )
+
+        self.execute("CREATE TABLE demo_2 (id int)")
+        self.assertIn(
+            "demo_2",
+            [table["name"] for table in get_database_definition(self.WORKSPACE)],
+        )
+
+        self.execute("DROP TABLE demo_2")
+        self.assertIsNone(get_table_definition(self.WORKSPACE, "demo_2"))
+
+    def test_catalog_is_invalidated_on_delete_table(self):
+        get_table_definition(self.WORKSPACE, "demo")
+        self.assertIsNotNone(cache.get(get_catalog_cache_key(self.WORKSPACE)))
+
+        delete_table(self.WORKSPACE, "demo")
+
+        self.assertIsNone(cache.get(get_catalog_cache_key(self.WORKSPACE)))
+        self.assertIsNone(get_table_definition(self.WORKSPACE, "demo"))
+
+    def test_row_count_is_computed_again_after_truncate(self):
+        self.assertEqual(2, get_table_definition(self.WORKSPACE, "demo")["count"])
+
+        self.execute("TRUNCATE demo")
+
+        self.assertEqual(0, get_table_definition(self.WORKSPACE, "demo")["count"])
+
+
 class DatabaseUtilsTest(TestCase):
     USER_SABRINA = None
 
@@ -132,7 +260,12 @@ class DatabaseUtilsTest(TestCase):
     def test_get_database_tables(self, mock_connect):
         table_name = "database_tutorial"
         row_count = 2
-        table = {"name": table_name, "columns": [], "count": row_count}
+        table = {
+            "name": table_name,
+            "count": row_count,
+            "column_name": None,
+            "data_type": None,
+        }
 
         mock_context_object = mock_connect.return_value
         cursor = mock_context_object.cursor.return_value.__enter__.return_value
@@ -218,7 +351,14 @@ class DatabaseUtilsTest(TestCase):
 
         mock_context_object = mock_connect.return_value
         cursor = mock_context_object.cursor.return_value.__enter__.return_value
-        cursor.fetchall.return_value = [schema]
+        cursor.fetchall.return_value = [
+            {
+                "name": table_name,
+                "count": row_count,
+                "column_name": "id",
+                "data_type": "int",
+            }
+        ]
         cursor.fetchone.return_value = {"row_count": row_count}
 
         result = get_table_definition(self.WORKSPACE, table_name)
@@ -554,6 +694,21 @@ class DatabaseUtilsTest(TestCase):
 
         self.assertTrue(real_connection.closed)
 
+    def test_stream_database_query_closes_connection_when_closed_before_first_batch(
+        self,
+    ):
+        seed_demo_table(self.WORKSPACE, [(1, "a")])
+        real_connection = get_workspace_database_ro_connection(self.WORKSPACE)
+        with mock.patch(
+            "hexa.databases.utils.get_workspace_database_ro_connection",
+            return_value=real_connection,
+        ):
+            _, rows = stream_database_query(self.WORKSPACE, "SELECT id FROM demo")
+            rows.close()
+
+        self.assertTrue(real_connection.closed)
+        self.assertEqual([], list(rows))
+
     def test_get_full_database_definition(self):
         seed_demo_table(self.WORKSPACE, [(1, "a")])
         seed_demo_table(self.WORKSPACE, [(1, "a"), (2, "b")], table_name="demo_2")
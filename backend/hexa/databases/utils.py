@@ -2,11 +2,12 @@ import enum
 import json
 import math
 import time
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from typing import Dict, Iterator, List, Tuple
 
-import psycopg2
 from django.conf import settings
+from django.core.cache import cache
 from django.core.serializers.json import DjangoJSONEncoder
 from psycopg2 import sql
 from psycopg2.errors import UndefinedTable
@@ -15,6 +16,7 @@ from psycopg2.extras import RealDictCursor
 
 from hexa.workspaces.models import Workspace
 
+from . import pool
 from .api import get_db_server_credentials
 from .query_text import PreparedQuery
 
@@ -81,17 +83,22 @@ class OrderByDirectionEnum(enum.Enum):
     DESC = "DESC"
 
 
-def get_workspace_database_connection(workspace: Workspace):
+# The connections to the workspace databases come from per-process pools (see hexa.databases.pool): closing them
+# returns them to their pool.
+def get_workspace_database_connection(
+    workspace: Workspace, connect_timeout: int | None = None
+):
     credentials = get_db_server_credentials()
     host = credentials["host"]
     port = credentials["port"]
 
-    return psycopg2.connect(
+    return pool.connect(
         host=host,
         port=port,
         dbname=workspace.db_name,
         user=workspace.db_name,
         password=workspace.db_password,
+        connect_timeout=connect_timeout,
     )
 
 
@@ -100,7 +107,7 @@ def get_workspace_database_ro_connection(workspace: Workspace):
     host = credentials["host"]
     port = credentials["port"]
 
-    return psycopg2.connect(
+    return pool.connect(
         host=host,
         port=port,
         dbname=workspace.db_name,
@@ -176,6 +183,53 @@ DOWNLOAD_QUERY_IDLE_TIMEOUT_MS = 5 * 60 * 1000
 DOWNLOAD_QUERY_BATCH_SIZE = 2_000
 
 
+class RowBatches:
+    """Row batches of a streamed query, owning its cursor and connection.
+
+    The connection is closed (returned to its pool) when the batches are exhausted or
+    closed. Unlike a generator, ``close()`` also releases it before the first batch is
+    read, which is how an export abandoned before streaming hands its connection back.
+    """
+
+    def __init__(self, conn, cursor, first_batch: List[dict], batch_size: int):
+        self.conn = conn
+        self.cursor = cursor
+        self.first_batch = first_batch
+        self.batch_size = batch_size
+
+    def __iter__(self) -> "RowBatches":
+        return self
+
+    def __next__(self) -> List[dict]:
+        if self.cursor is None:
+            raise StopIteration
+        if self.first_batch is not None:
+            batch, self.first_batch = self.first_batch, None
+        else:
+            try:
+                batch = self.cursor.fetchmany(self.batch_size)
+            except Exception:
+                self.close()
+                raise
+        if not batch:
+            self.close()
+            raise StopIteration
+        return batch
+
+    def close(self):
+        if self.cursor is None:
+            return
+        cursor, conn = self.cursor, self.conn
+        self.cursor = self.conn = self.first_batch = None
+        try:
+            cursor.close()
+        finally:
+            conn.close()
+
+    def __del__(self):
+        self.close()
+
+
 def stream_database_query(
     workspace: Workspace,
     query: str,
@@ -183,7 +237,7 @@ def stream_database_query(
     timeout_ms: int = DOWNLOAD_QUERY_TIMEOUT_MS,
     idle_timeout_ms: int = DOWNLOAD_QUERY_IDLE_TIMEOUT_MS,
     batch_size: int = DOWNLOAD_QUERY_BATCH_SIZE,
-) -> Tuple[List[str], Iterator[List[dict]]]:
+) -> Tuple[List[str], RowBatches]:
     """Execute a read-only query and stream its full result set, batch by batch.
 
     Unlike :func:`execute_database_query`, no row cap is applied — the whole result is
@@ -197,7 +251,7 @@ def stream_database_query(
 
     The first batch is fetched eagerly, so an invalid statement raises here (surfacing
     as an HTTP 400) rather than mid-stream once bytes are on the wire. The returned
-    generator owns the connection and closes it when exhausted or closed early. The two
+    :class:`RowBatches` own the connection and close it when exhausted or closed. The two
     timeouts set below bound a runaway scan and a stalled client.
     """
     prepared = PreparedQuery.from_text(query)
@@ -230,17 +284,7 @@ def stream_database_query(
         conn.close()
         raise
 
-    def row_batches() -> Iterator[List[dict]]:
-        try:
-            batch = first_batch
-            while batch:
-                yield batch
-                batch = cursor.fetchmany(batch_size)
-        finally:
-            cursor.close()
-            conn.close()
-
-    return columns, row_batches()
+    return columns, RowBatches(conn, cursor, first_batch, batch_size)
 
 
 # EXPLAIN only parses and plans the query (it never executes it), so this is a
@@ -278,107 +322,198 @@ def validate_query(workspace: Workspace, query: str) -> None:
             conn.close()
 
 
-def get_database_definition(workspace: Workspace):
-    conn = None
-    try:
-        conn = get_workspace_database_connection(workspace)
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(
-                """
-                        SELECT table_name as name, pg_class.reltuples as count
-                        FROM information_schema.tables
-                        JOIN pg_class ON information_schema.tables.table_name = pg_class.relname
-                        WHERE
-                            table_schema = 'public'
-                            -- Exclude child tables from inheritance hierarchies (e.g., partition children)
-                            AND pg_class.oid NOT IN (SELECT inhrelid FROM pg_inherits)
-                        ORDER BY table_name;
-                """
+# Tables and columns of the workspace databases are read from catalog snapshots kept in the Django cache for
+# WORKSPACE_DATABASE_CATALOG_TTL seconds, so that showing the tables does not query information_schema and count the
+# rows of every table on each request. Before a snapshot is used, a single query on the PostgreSQL catalog tells
+# whether it is still valid:
+# - the snapshot is taken again when the structure of the tables changed (any DDL statement writes new versions of
+#   the pg_class or pg_attribute rows of the tables it changes)
+# - the exact row count of a table is computed again when rows were inserted into or deleted from the table since it
+#   was computed (counters of pg_stat_user_tables). Views are always counted again.
+_CATALOG_CHECK_QUERY = """
+    SELECT
+        (
+            SELECT md5(coalesce(string_agg(
+                concat_ws(':', c.oid, c.xmin, c.relfilenode, a.attnum, a.xmin), ',' ORDER BY c.oid, a.attnum
+            ), ''))
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'v', 'm', 'p', 'f')
+        ) AS structure,
+        (
+            SELECT json_object_agg(c.relname, json_build_array(
+                c.reltuples,
+                CASE WHEN c.relkind IN ('r', 'm') THEN s.n_tup_ins + s.n_tup_del END
+            ))
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'v', 'm', 'p', 'f')
+        ) AS tables
+"""
+
+_TABLES_QUERY = """
+    SELECT tables.name, tables.count, c.column_name, c.data_type
+    FROM (
+        SELECT table_name AS name, pg_class.reltuples AS count
+        FROM information_schema.tables
+        JOIN pg_class ON information_schema.tables.table_name = pg_class.relname
+        JOIN pg_namespace ON pg_class.relnamespace = pg_namespace.oid
+            AND pg_namespace.nspname = information_schema.tables.table_schema
+        WHERE
+            table_schema = 'public'
+            -- Exclude child tables from inheritance hierarchies (e.g., partition children)
+            AND pg_class.oid NOT IN (SELECT inhrelid FROM pg_inherits)
+            AND table_name <> ALL(%(ignore_tables)s)
+    ) AS tables
+    LEFT JOIN information_schema.columns AS c
+    ON c.table_name = tables.name AND c.table_schema = 'public'
+    ORDER BY tables.name, c.ordinal_position
+"""
+
+
+@dataclass
+class CatalogSnapshot:
+    """Tables (ordered by name, with their columns) of a workspace database, with the row counts computed so far."""
+
+    # Signature of the structure of the tables, None when the snapshot is not cached
+    structure: str | None
+    tables: List[Dict]
+    taken_at: float
+    # Planner estimates of the number of rows (pg_class.reltuples), by table
+    reltuples: Dict[str, float]
+    # Number of rows inserted and deleted (None when not tracked), by table
+    modifications: Dict[str, int | None] = field(default_factory=dict)
+    # Row counts, with the number of modifications of the table when they were computed, by table
+    row_counts: Dict[str, Tuple[int, int | None]] = field(default_factory=dict)
+    changed: bool = field(default=True, compare=False)
+
+    def get_table(self, table_name: str) -> Dict | None:
+        return next((t for t in self.tables if t["name"] == table_name), None)
+
+    def get_row_count(self, cursor, table_name: str) -> int:
+        modifications = self.modifications.get(table_name)
+        if modifications is not None and table_name in self.row_counts:
+            count, counted_modifications = self.row_counts[table_name]
+            if counted_modifications == modifications:
+                return count
+        count = get_row_count(cursor, table_name, self.reltuples.get(table_name, -1))
+        self.row_counts[table_name] = (count, modifications)
+        self.changed = True
+        return count
+
+    def update_statistics(self, statistics: Dict[str, list]):
+        for name, (reltuples, modifications) in statistics.items():
+            self.reltuples[name] = reltuples
+            self.modifications[name] = modifications
+
+
+def get_catalog_cache_key(workspace: Workspace) -> str:
+    return f"databases:catalog:{workspace.db_name}"
+
+
+def take_catalog_snapshot(cursor, structure: str | None = None) -> CatalogSnapshot:
+    cursor.execute(_TABLES_QUERY, {"ignore_tables": IGNORE_TABLES})
+    tables: Dict[str, Dict] = {}
+    reltuples: Dict[str, float] = {}
+    for row in cursor.fetchall():
+        table = tables.get(row["name"])
+        if table is None:
+            table = tables[row["name"]] = {"name": row["name"], "columns": []}
+            reltuples[row["name"]] = row["count"]
+        if row["column_name"] is not None:
+            table["columns"].append(
+                {"name": row["column_name"], "type": row["data_type"]}
             )
+    return CatalogSnapshot(
+        structure=structure,
+        tables=list(tables.values()),
+        taken_at=time.time(),
+        reltuples=reltuples,
+    )
 
-            response: List[Tuple[str, str, int]] = cursor.fetchall()
-            tables: Dict[str, Dict] = {
-                x["name"]: x for x in response if x["name"] not in IGNORE_TABLES
-            }
 
-            result = []
-            for name, data in tables.items():
-                data["count"] = get_row_count(cursor, name, data["count"])
-                result.append({"workspace": workspace, **data})
-            return result
-    finally:
-        if conn:
-            conn.close()
+def load_catalog_snapshot(cursor, workspace: Workspace) -> CatalogSnapshot:
+    """Return the cached catalog snapshot of the workspace database if it is still valid, or take a new one."""
+    ttl = settings.WORKSPACE_DATABASE_CATALOG_TTL
+    if not ttl:
+        return take_catalog_snapshot(cursor)
 
+    cursor.execute(_CATALOG_CHECK_QUERY)
+    check = cursor.fetchone()
+    snapshot = cache.get(get_catalog_cache_key(workspace))
+    if (
+        snapshot is None
+        or snapshot.structure != check["structure"]
+        or time.time() - snapshot.taken_at > ttl
+    ):
+        snapshot = take_catalog_snapshot(cursor, check["structure"])
+    else:
+        snapshot.changed = False
+    snapshot.update_statistics(check["tables"] or {})
+    return snapshot
 
-# Filtering, ordering and slicing happen in SQL, and row counts are only
-# computed for the tables of the requested page, so that listing tables stays
-# cheap on workspaces with many (potentially large) tables.
-_TABLES_FROM_CLAUSE = """
-    FROM information_schema.tables
-    JOIN pg_class ON information_schema.tables.table_name = pg_class.relname
-    JOIN pg_namespace ON pg_class.relnamespace = pg_namespace.oid
-        AND pg_namespace.nspname = information_schema.tables.table_schema
-    WHERE
-        table_schema = 'public'
-        -- Exclude child tables from inheritance hierarchies (e.g., partition children)
-        AND pg_class.oid NOT IN (SELECT inhrelid FROM pg_inherits)
-        AND table_name <> ALL(%(ignore_tables)s)
-"""
 
+def save_catalog_snapshot(workspace: Workspace, snapshot: CatalogSnapshot):
+    ttl = settings.WORKSPACE_DATABASE_CATALOG_TTL
+    if not ttl or not snapshot.changed:
+        return
+    timeout = snapshot.taken_at + ttl - time.time()
+    if timeout > 0:
+        cache.set(get_catalog_cache_key(workspace), snapshot, timeout)
 
-def _fetch_tables(cursor, workspace: Workspace, params: dict) -> List[Dict]:
-    """Return the page of tables (name + raw ``reltuples`` estimate), without columns."""
-    cursor.execute(
-        "SELECT table_name AS name, pg_class.reltuples AS count"
-        + _TABLES_FROM_CLAUSE
-        + "ORDER BY table_name LIMIT %(limit)s OFFSET %(offset)s",
-        params,
-    )
-    return [
-        {"workspace": workspace, "name": row["name"], "count": row["count"]}
-        for row in cursor.fetchall()
-    ]
 
+def invalidate_catalog_snapshot(workspace: Workspace):
+    cache.delete(get_catalog_cache_key(workspace))
 
-def _fetch_tables_with_columns(
-    cursor, workspace: Workspace, params: dict
-) -> List[Dict]:
-    """Return the page of tables together with their columns in a single query.
 
-    A LEFT JOIN on ``information_schema.columns`` fetches every column of every
-    table on the page in one round trip (no per-table N+1) while still keeping
-    columnless tables. Rows arrive grouped by table thanks to the ORDER BY.
+@contextmanager
+def workspace_catalog(
+    workspace: Workspace,
+    connect_timeout: int | None = None,
+    timeout_ms: int | None = None,
+) -> Iterator[Tuple[object, CatalogSnapshot]]:
+    """Yield a cursor on the workspace database and its catalog snapshot, saved back to the cache on exit.
+
+    `connect_timeout` (in seconds) and `timeout_ms` (per statement) bound the time spent on an unresponsive database.
     """
-    cursor.execute(
-        "WITH paged AS ("
-        "SELECT table_name AS name, pg_class.reltuples AS count"
-        + _TABLES_FROM_CLAUSE
-        + "ORDER BY table_name LIMIT %(limit)s OFFSET %(offset)s"
-        ") "
-        "SELECT paged.name, paged.count, c.column_name, c.data_type "
-        "FROM paged "
-        "LEFT JOIN information_schema.columns AS c "
-        "ON c.table_name = paged.name AND c.table_schema = 'public' "
-        "ORDER BY paged.name, c.ordinal_position",
-        params,
-    )
-    tables: Dict[str, Dict] = {}
-    for row in cursor.fetchall():
-        table = tables.get(row["name"])
-        if table is None:
-            table = {
+    conn = None
+    try:
+        conn = get_workspace_database_connection(
+            workspace, connect_timeout=connect_timeout
+        )
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            if timeout_ms is not None:
+                cursor.execute(
+                    sql.SQL("SET LOCAL statement_timeout = {timeout};").format(
+                        timeout=sql.Literal(timeout_ms)
+                    )
+                )
+            snapshot = load_catalog_snapshot(cursor, workspace)
+            yield cursor, snapshot
+        save_catalog_snapshot(workspace, snapshot)
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_database_definition(
+    workspace: Workspace,
+    connect_timeout: int | None = None,
+    timeout_ms: int | None = None,
+):
+    with workspace_catalog(
+        workspace, connect_timeout=connect_timeout, timeout_ms=timeout_ms
+    ) as (cursor, catalog):
+        return [
+            {
                 "workspace": workspace,
-                "name": row["name"],
-                "count": row["count"],
-                "columns": [],
+                "name": table["name"],
+                "count": catalog.get_row_count(cursor, table["name"]),
             }
-            tables[row["name"]] = table
-        if row["column_name"] is not None:
-            table["columns"].append(
-                {"name": row["column_name"], "type": row["data_type"]}
-            )
-    return list(tables.values())
+            for table in catalog.tables
+        ]
 
 
 def get_database_definition_page(
@@ -389,47 +524,28 @@ def get_database_definition_page(
     with_counts: bool = True,
 ):
     # Clamp caller-provided values: a GraphQL client can send any Int (or an
-    # explicit null), and negative/zero values would end up in LIMIT/OFFSET.
+    # explicit null), and negative/zero values would end up in the slice.
     page = max(page or 1, 1)
     per_page = min(max(per_page or 1, 1), settings.GRAPHQL_MAX_PAGE_SIZE)
-    conn = None
-    try:
-        conn = get_workspace_database_connection(workspace)
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(
-                "SELECT COUNT(*) AS total" + _TABLES_FROM_CLAUSE,
-                {"ignore_tables": IGNORE_TABLES},
+    with workspace_catalog(workspace) as (cursor, catalog):
+        total_items = len(catalog.tables)
+        items = []
+        for table in catalog.tables[(page - 1) * per_page : page * per_page]:
+            item = {"workspace": workspace, "name": table["name"]}
+            if with_columns:
+                item["columns"] = list(table["columns"])
+            # Row counts are skipped when not requested because they can
+            # trigger an expensive COUNT(*) per table.
+            item["count"] = (
+                catalog.get_row_count(cursor, table["name"]) if with_counts else None
             )
-            total_items = cursor.fetchone()["total"]
-
-            params = {
-                "ignore_tables": IGNORE_TABLES,
-                "limit": per_page,
-                "offset": (page - 1) * per_page,
-            }
-            items = (
-                _fetch_tables_with_columns(cursor, workspace, params)
-                if with_columns
-                else _fetch_tables(cursor, workspace, params)
-            )
-
-            # Row counts are computed separately (and skipped when not requested)
-            # because they can trigger an expensive COUNT(*) per table.
-            for item in items:
-                item["count"] = (
-                    get_row_count(cursor, item["name"], item["count"])
-                    if with_counts
-                    else None
-                )
-        return {
-            "page_number": page,
-            "total_pages": max(math.ceil(total_items / per_page), 1),
-            "total_items": total_items,
-            "items": items,
-        }
-    finally:
-        if conn:
-            conn.close()
+            items.append(item)
+    return {
+        "page_number": page,
+        "total_pages": max(math.ceil(total_items / per_page), 1),
+        "total_items": total_items,
+        "items": items,
+    }
 
 
 def get_full_database_definition(workspace: Workspace) -> List[Dict]:
@@ -440,64 +556,24 @@ def get_full_database_definition(workspace: Workspace) -> List[Dict]:
     every conversation turn, and the consumer needs all tables at once, so
     pagination does not apply.
     """
-    conn = None
-    try:
-        conn = get_workspace_database_connection(workspace)
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            # LIMIT NULL means "no limit" in PostgreSQL, which lets us reuse
-            # the paginated query to fetch the full listing.
-            params = {"ignore_tables": IGNORE_TABLES, "limit": None, "offset": 0}
-            tables = _fetch_tables_with_columns(cursor, workspace, params)
-        # The shared query also carries a reltuples-based ``count`` and the
-        # workspace, but only names and columns are inlined into the LLM schema,
-        # so keep just those (no COUNT(*) is ever run here).
+    with workspace_catalog(workspace) as (_, catalog):
         return [
-            {"name": table["name"], "columns": table["columns"]} for table in tables
+            {"name": table["name"], "columns": list(table["columns"])}
+            for table in catalog.tables
         ]
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_table_definition(workspace: Workspace, table_name: str):
-    columns = []
-    conn = None
-    try:
-        conn = get_workspace_database_connection(workspace)
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(
-                """
-                    SELECT column_name AS name, data_type AS type FROM information_schema.columns WHERE table_name = (%s);
-                """,
-                (table_name,),
-            )
-
-            columns = cursor.fetchall()
-
-            if not columns:
-                return None
-
-            cursor.execute(
-                """
-                    SELECT pg_class.reltuples AS row_count
-                    FROM information_schema.tables
-                    JOIN pg_class ON information_schema.tables.table_name = pg_class.relname
-                    WHERE table_schema = 'public'
-                    AND table_name=(%s);
-                """,
-                (table_name,),
-            )
-            res = cursor.fetchone()
-            row_count = get_row_count(cursor, table_name, res["row_count"])
+    with workspace_catalog(workspace) as (cursor, catalog):
+        table = catalog.get_table(table_name)
+        if table is None or not table["columns"]:
+            return None
         return {
             "name": table_name,
-            "columns": columns,
-            "count": row_count,
+            "columns": list(table["columns"]),
+            "count": catalog.get_row_count(cursor, table_name),
             "workspace": workspace,
         }
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_table_sample_data(workspace: Workspace, table_name: str, n_rows: int = 4):
@@ -528,6 +604,8 @@ def delete_table(workspace: Workspace, table_name: str):
             cursor.execute(
                 sql.SQL("DROP TABLE {table};").format(table=sql.Identifier(table_name)),
             )
+        # The next listing would otherwise check the snapshot against the catalog only to take it again
+        invalidate_catalog_snapshot(workspace)
     except UndefinedTable:
         raise TableNotFound
     finally:
@@ -26,6 +26,11 @@ def generate_download_url(
     )
 
 
+def open_version_file(version_file):
+    """Open a dataset file as a seekable file, read with ranged reads on the storage."""
+    return storage.open_object(settings.WORKSPACE_DATASETS_BUCKET, version_file.uri)
+
+
 def get_blob(uri):
     try:
         return storage.get_bucket_object(settings.WORKSPACE_DATASETS_BUCKET, uri)
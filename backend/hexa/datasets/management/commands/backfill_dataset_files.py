@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from hexa.datasets.api import get_blob
+from hexa.datasets.models import DatasetVersionFile
+
+
+class Command(BaseCommand):
+    help = "Store the size and checksum of the dataset version files created before they were persisted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of files updated per query",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        files = DatasetVersionFile.objects.filter(size__isnull=True).only("id", "uri")
+        updated, missing = 0, 0
+        batch = []
+        for file in files.iterator(chunk_size=batch_size):
+            blob = get_blob(file.uri)
+            if blob is None:
+                missing += 1
+                continue
+            file.size = blob.size
+            file.checksum = blob.checksum
+            batch.append(file)
+            if len(batch) >= batch_size:
+                updated += DatasetVersionFile.objects.bulk_update(
+                    batch, ["size", "checksum"]
+                )
+                batch = []
+        updated += DatasetVersionFile.objects.bulk_update(batch, ["size", "checksum"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{updated} files updated, {missing} files not found in the storage"
+            )
+        )
@@ -1,7 +1,218 @@
+"""Process the dataset file metadata jobs in a pool of child processes.
+
+Each claimed job runs in a process of its own, forked from the worker and limited in memory and in time: a large
+file does not hold up the smaller ones, and a crash or an exceeded limit only fails its own job. Failed jobs are
+put back in the queue by `AtMostLimitedAmountQueue.handle_job_failure`, until they reach their maximum number
+of retries.
+"""
+
+import multiprocessing
+import resource
+import signal
+import time
+from dataclasses import dataclass
+from logging import getLogger
+
+from django import db
+from django.conf import settings
 from dpq.commands import Worker
 
-from hexa.datasets.queue import dataset_file_metadata_queue
+from hexa.datasets.models import DatasetFileMetadataJob
+from hexa.datasets.queue import DatasetsFileMetadataQueue, dataset_file_metadata_queue
+
+logger = getLogger(__name__)
+
+# Seconds between two checks of the running jobs (exit, memory and time limits)
+POLL_INTERVAL = 1
+
+
+class JobFailure(Exception):
+    pass
+
+
+def get_resident_memory(pid: int) -> int | None:
+    """Return the resident memory of a process in bytes, or None where it is not known (outside of Linux)."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def run_job_process(queue: DatasetsFileMetadataQueue, job: DatasetFileMetadataJob):
+    # The worker waits for its running jobs on a warm shutdown
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        queue.run_job(job)
+    except Exception:
+        logger.exception("Job %s failed", job.id)
+        raise SystemExit(1)
+    finally:
+        db.connections.close_all()
+
+
+@dataclass
+class RunningJob:
+    job: DatasetFileMetadataJob
+    process: multiprocessing.Process
+    started_at: float
+
+
+class JobPool:
+    """Run up to `workers` jobs at the same time, each in its own process."""
+
+    def __init__(
+        self,
+        queue: DatasetsFileMetadataQueue,
+        workers: int,
+        memory_limit: int | None = None,
+        time_limit: float | None = None,
+    ):
+        self.queue = queue
+        self.workers = workers
+        self.memory_limit = memory_limit
+        self.time_limit = time_limit
+        self.running: dict[int, RunningJob] = {}
+        self.context = multiprocessing.get_context("fork")
+
+    def fill(self) -> int:
+        """Claim and start jobs until the pool is full or the queue is empty, return the number of started jobs."""
+        started = 0
+        while len(self.running) < self.workers:
+            job = self.queue.claim()
+            if job is None:
+                break
+            process = self.context.Process(
+                target=run_job_process,
+                args=(self.queue, job),
+                name=f"dataset-job-{job.id}",
+            )
+            # The job is tracked before its process is started, it is then either running or back in the queue
+            self.running[job.id] = RunningJob(job, process, time.monotonic())
+            try:
+                # The job process must not share the connection of the worker, which is opened again on the next query
+                db.connections.close_all()
+                process.start()
+            except BaseException:
+                del self.running[job.id]
+                self.queue.release(job)
+                raise
+            started += 1
+        return started
+
+    def reap(self) -> int:
+        """Collect the finished jobs and kill the ones over their limits, return the number of finished jobs."""
+        finished = 0
+        for job_id, running in list(self.running.items()):
+            error = self.check(running)
+            if running.process.is_alive() and error is None:
+                continue
+            if running.process.is_alive():
+                running.process.kill()
+            running.process.join()
+            if error is None and running.process.exitcode != 0:
+                error = JobFailure(
+                    f"Process exited with code {running.process.exitcode}"
+                    if running.process.exitcode > 0
+                    else f"Process killed by signal {-running.process.exitcode}"
+                )
+            del self.running[job_id]
+            finished += 1
+            if error is not None:
+                logger.error("Job %s failed: %s", job_id, error)
+                self.queue.handle_job_failure(running.job, error)
+        return finished
+
+    def check(self, running: RunningJob) -> JobFailure | None:
+        if not running.process.is_alive():
+            return None
+        if (
+            self.time_limit is not None
+            and time.monotonic() - running.started_at > self.time_limit
+        ):
+            return JobFailure(f"Time limit of {self.time_limit}s exceeded")
+        if self.memory_limit is not None:
+            memory = get_resident_memory(running.process.pid)
+            if memory is not None and memory > self.memory_limit:
+                return JobFailure(
+                    f"Memory limit of {self.memory_limit} bytes exceeded ({memory} bytes)"
+                )
+        return None
+
+    def shutdown(self, wait: bool = True):
+        if not wait:
+            for running in self.running.values():
+                running.process.kill()
+        while self.running:
+            self.reap()
+            if self.running:
+                time.sleep(POLL_INTERVAL)
 
 
 class Command(Worker):
+    help = "Generate the metadata of dataset files, running the jobs in a pool of processes"
+
     queue = dataset_file_metadata_queue
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.WORKSPACE_DATASETS_WORKER_PROCESSES,
+            help="Number of jobs processed at the same time",
+        )
+        parser.add_argument(
+            "--memory-limit",
+            type=int,
+            default=settings.WORKSPACE_DATASETS_WORKER_JOB_MEMORY_LIMIT,
+            help="Maximum resident memory of a job process, in bytes (0 for no limit)",
+        )
+        parser.add_argument(
+            "--time-limit",
+            type=float,
+            default=settings.WORKSPACE_DATASETS_WORKER_JOB_TIME_LIMIT,
+            help="Maximum duration of a job, in seconds (0 for no limit)",
+        )
+
+    def handle(self, **options):
+        self.pool = JobPool(
+            self.queue,
+            workers=options["workers"],
+            memory_limit=options["memory_limit"] or None,
+            time_limit=options["time_limit"] or None,
+        )
+        try:
+            super().handle(**options)
+        finally:
+            # Running jobs are waited for, and killed (then retried) on a second signal
+            try:
+                self.pool.shutdown()
+            except InterruptedError:
+                self.pool.shutdown(wait=False)
+
+    def run_available_tasks(self):
+        # As in `Worker.run_available_tasks`, a shutdown signal received while jobs are claimed or reaped stops the
+        # worker afterwards: a job claimed and not started yet would otherwise be lost
+        while True:
+            self._in_task = True
+            try:
+                busy = self.pool.reap() or self.pool.fill()
+            finally:
+                self._in_task = False
+            if self._shutdown:
+                raise InterruptedError
+            if not busy:
+                break
+
+    def wait(self):
+        if self.listen:
+            # The connection, and its LISTEN, is closed each time a job is started
+            self.queue.listen()
+        if not self.pool.running:
+            return super().wait()
+        if self.listen:
+            return len(self.queue.wait(min(self.delay, POLL_INTERVAL)))
+        time.sleep(min(self.delay, POLL_INTERVAL))
+        return 1
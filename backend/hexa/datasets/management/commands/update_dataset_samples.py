@@ -1,12 +1,143 @@
 # Update dataset files to change the sample and save the number of rows
-from django.core.management.base import BaseCommand
+import time
+from datetime import datetime
 
-from hexa.datasets.models import DatasetVersionFile
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from hexa.datasets.management.commands.dataset_worker import POLL_INTERVAL, JobPool
+from hexa.datasets.models import DatasetFileSample, DatasetVersionFile
+from hexa.datasets.queue import (
+    BACKFILL_PRIORITY,
+    dataset_file_metadata_queue,
+    enqueue_file_metadata,
+    is_file_supported,
+)
+
+# Seconds between two progress reports while processing the jobs
+REPORT_INTERVAL = 10
+
+
+def parse_since(value: str) -> datetime:
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date: {value}")
+        since = datetime.combine(date, datetime.min.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
 
 
 class Command(BaseCommand):
     help = "Regenerate metadata and preview for all dataset version files"
 
-    def handle(self, *args, **options):
-        for dvf in DatasetVersionFile.objects.all():
-            dvf.generate_metadata()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of files read and enqueued per query",
+        )
+        parser.add_argument(
+            "--since",
+            type=parse_since,
+            help="Only the files created since this date (YYYY-MM-DD or ISO 8601 date and time)",
+        )
+        parser.add_argument(
+            "--workspace",
+            action="append",
+            dest="workspaces",
+            metavar="SLUG",
+            help="Only the files of this workspace (can be repeated)",
+        )
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Only the supported files without a successfully generated sample",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Number of processes used to run the enqueued jobs from this command, alongside the dataset "
+            "workers (0 to only enqueue them)",
+        )
+
+    def handle(
+        self, *args, batch_size, since, workspaces, only_missing, workers, **options
+    ):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number")
+
+        files = DatasetVersionFile.objects.only("id", "uri").order_by("-created_at")
+        if since is not None:
+            files = files.filter(created_at__gte=since)
+        if workspaces:
+            files = files.filter(
+                dataset_version__dataset__workspace__slug__in=workspaces
+            )
+        if only_missing:
+            files = files.exclude(
+                sample_entry__status=DatasetFileSample.STATUS_FINISHED
+            )
+
+        total = files.count()
+        self.stdout.write(f"Enqueuing the metadata generation of {total} files")
+        enqueued = self.enqueue(files, total, batch_size, only_missing)
+        self.stdout.write(self.style.SUCCESS(f"{enqueued} files enqueued"))
+        if workers > 0 and enqueued:
+            self.process(workers)
+
+    def enqueue(self, files, total: int, batch_size: int, only_missing: bool) -> int:
+        started_at = time.monotonic()
+        read, enqueued = 0, 0
+        batch = []
+        for file in files.iterator(chunk_size=batch_size):
+            read += 1
+            # Unsupported files never have a sample
+            if not only_missing or is_file_supported(file.filename):
+                batch.append(file)
+            if read % batch_size == 0:
+                enqueued += len(enqueue_file_metadata(batch, BACKFILL_PRIORITY))
+                batch = []
+                elapsed = time.monotonic() - started_at
+                self.stdout.write(
+                    f"{read}/{total} files read, {enqueued} enqueued "
+                    f"({read / elapsed if elapsed else 0:.0f} files/s)"
+                )
+        enqueued += len(enqueue_file_metadata(batch, BACKFILL_PRIORITY))
+        return enqueued
+
+    def process(self, workers: int):
+        """Run the queued jobs until none is left, the jobs of files uploaded in the meantime are run first."""
+        pool = JobPool(
+            dataset_file_metadata_queue,
+            workers=workers,
+            memory_limit=settings.WORKSPACE_DATASETS_WORKER_JOB_MEMORY_LIMIT or None,
+            time_limit=settings.WORKSPACE_DATASETS_WORKER_JOB_TIME_LIMIT or None,
+        )
+        started_at = reported_at = time.monotonic()
+        processed = 0
+        try:
+            while pool.fill() or pool.running:
+                time.sleep(POLL_INTERVAL)
+                processed += pool.reap()
+                if time.monotonic() - reported_at >= REPORT_INTERVAL:
+                    reported_at = time.monotonic()
+                    self.report(processed, reported_at - started_at)
+        finally:
+            pool.shutdown()
+        self.report(processed, time.monotonic() - started_at)
+
+    def report(self, processed: int, elapsed: float):
+        remaining = dataset_file_metadata_queue.job_model.objects.filter(
+            priority=BACKFILL_PRIORITY
+        ).count()
+        self.stdout.write(
+            f"{processed} jobs processed, {remaining} left "
+            f"({processed / elapsed if elapsed else 0:.1f} jobs/s)"
+        )
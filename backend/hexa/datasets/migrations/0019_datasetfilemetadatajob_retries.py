@@ -0,0 +1,22 @@
+# Generated by Django 5.2.16 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("datasets", "0018_alter_datasetfilesample_dataset_version_file"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetfilemetadatajob",
+            name="max_retries",
+            field=models.IntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name="datasetfilemetadatajob",
+            name="retry_count",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.16 on 2026-10-18 07:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("datasets", "0019_datasetfilemetadatajob_retries"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetversionfile",
+            name="checksum",
+            field=models.CharField(default=None, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="datasetversionfile",
+            name="size",
+            field=models.BigIntegerField(default=None, null=True),
+        ),
+    ]
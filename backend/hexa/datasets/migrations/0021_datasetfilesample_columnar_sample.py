@@ -0,0 +1,17 @@
+# Generated by Django 5.2.16 on 2026-10-18 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("datasets", "0020_datasetversionfile_size_checksum"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetfilesample",
+            name="columnar_sample",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
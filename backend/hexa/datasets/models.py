@@ -1,9 +1,9 @@
 import io
 import logging
-import math
 import secrets
-from functools import cached_property
 
+import pandas as pd
+import pyarrow as pa
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import PermissionDenied
@@ -16,6 +16,13 @@ from slugify import slugify
 
 from hexa.core.models.base import Base, BaseQuerySet
 from hexa.datasets.api import get_blob
+from hexa.datasets.samples import (
+    decode_sample,
+    get_columns,
+    get_records,
+    json_safe,
+    to_arrow_table,
+)
 from hexa.files import storage
 from hexa.metadata.models import MetadataMixin
 from hexa.user_management.models import (
@@ -262,6 +269,7 @@ class DatasetVersionManager(models.Manager):
                         )
                         uploaded_uris.append(full_uri)
 
+                        file.update_storage_properties()
                         file.generate_metadata()
                 except Exception as e:
                     logger.warning("Failed to clean up uploaded file %s", full_uri)
@@ -384,6 +392,9 @@ class DatasetVersionFile(MetadataMixin, Base):
     created_by = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
     properties = JSONField(default=dict)
     rows = models.IntegerField(default=None, null=True)
+    # Size and checksum of the uploaded object, stored to serve them without querying the storage
+    size = models.BigIntegerField(default=None, null=True)
+    checksum = models.CharField(max_length=64, default=None, null=True)
     dataset_version = models.ForeignKey(
         DatasetVersion,
         null=False,
@@ -417,12 +428,15 @@ class DatasetVersionFile(MetadataMixin, Base):
     def full_uri(self):
         return self.dataset_version.get_full_uri(self.uri)
 
-    @cached_property
-    def size(self):
+    def update_storage_properties(self) -> bool:
+        """Store the size and checksum of the uploaded object, return False if it has not been uploaded yet."""
         blob = get_blob(self.uri)
         if blob is None:
-            return 0
-        return blob.size
+            return False
+        self.size = blob.size
+        self.checksum = blob.checksum
+        self.save(update_fields=["size", "checksum", "updated_at"])
+        return True
 
     def generate_metadata(self):
         from hexa.datasets.queue import dataset_file_metadata_queue, is_file_supported
@@ -433,6 +447,7 @@ class DatasetVersionFile(MetadataMixin, Base):
                     dataset_version_file=self,
                     defaults={
                         "sample": [],
+                        "columnar_sample": None,
                         "status": DatasetFileSample.STATUS_PROCESSING,
                         "status_reason": None,
                     },
@@ -451,24 +466,8 @@ class DatasetVersionFile(MetadataMixin, Base):
 
 class DataframeJsonEncoder(DjangoJSONEncoder):
     def encode(self, obj):
-        # Recursively replace NaN with None (since it's a float, it does not call 'default' method)
-        def custom_encoding(item):
-            SKIPPED_FIELD = "<SKIPPED_BYTES>"
-
-            if isinstance(item, float) and math.isnan(item):
-                return None
-            elif isinstance(item, dict):
-                return {key: custom_encoding(value) for key, value in item.items()}
-            elif isinstance(item, list):
-                return [custom_encoding(element) for element in item]
-            elif isinstance(item, bytes):
-                return SKIPPED_FIELD
-            return item
-
-        # Preprocess the object to replace NaN values with None and encode bytes to base64
-        obj = custom_encoding(obj)
-        # Use the superclass's encode method to serialize the preprocessed object
-        return super().encode(obj)
+        # Recursively replace NaN with None (since it's a float, it does not call 'default' method) and skip bytes
+        return super().encode(json_safe(obj))
 
 
 class DatasetFileSample(Base):
@@ -484,12 +483,15 @@ class DatasetFileSample(Base):
         (STATUS_FAILED, _("Failed")),
         (STATUS_FINISHED, _("Finished")),
     ]
+    # List of records, only used by the samples generated before the columnar ones
     sample = JSONField(
         blank=True,
         default=list,
         null=True,
         encoder=DataframeJsonEncoder,
     )
+    # Arrow IPC stream of the sample (see hexa.datasets.samples)
+    columnar_sample = models.BinaryField(blank=True, null=True)
     status = models.CharField(
         max_length=10,
         choices=STATUS_CHOICES,
@@ -504,6 +506,26 @@ class DatasetFileSample(Base):
         related_name="sample_entry",
     )
 
+    def get_table(self) -> pa.Table:
+        if self.columnar_sample is not None:
+            return decode_sample(self.columnar_sample)
+        if not isinstance(self.sample, list):
+            return pa.table({})
+        return to_arrow_table(pd.DataFrame.from_records(self.sample))
+
+    def get_records(self) -> list[dict]:
+        if self.columnar_sample is None:
+            return self.sample
+        return get_records(self.get_table())
+
+    def get_columns(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        columns: list[str] | None = None,
+    ) -> list[dict]:
+        return get_columns(self.get_table(), offset, limit, columns)
+
 
 class DatasetLinkQuerySet(BaseQuerySet):
     @staticmethod
@@ -613,6 +635,9 @@ class BaseJobWithRetry(BaseJob):
         abstract = True
 
 
-class DatasetFileMetadataJob(BaseJob):
+class DatasetFileMetadataJob(BaseJobWithRetry):
+    # Jobs only fail when their process crashes or exceeds its limits, which is unlikely to change on retry
+    max_retries = models.IntegerField(default=3)
+
     class Meta:
         db_table = "datasets_filemetadata_job"
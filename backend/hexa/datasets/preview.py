@@ -0,0 +1,117 @@
+"""Preview of a window of rows of a dataset file, read on demand from the storage.
+
+Files are read with ranged reads (see `Storage.open_object`): only the footer and the row groups holding the
+requested rows of Parquet files are fetched, and CSV files are read from their start up to the last requested
+row (the rows before the window are streamed and dropped as they are parsed, which bounds the memory but not the
+bytes read, hence the maximum offset of CSV previews). Worksheets can not be read partially and are not supported.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from hexa.core import mimetypes
+from hexa.datasets.api import open_version_file
+from hexa.datasets.models import DatasetVersionFile
+from hexa.datasets.queue import CSV_COMPRESSIONS, is_parquet_file
+from hexa.datasets.samples import get_columns, to_arrow_table
+
+# Maximum number of rows returned by a preview
+PREVIEW_MAX_ROWS = 1000
+# Maximum offset of a preview of a CSV file, whose preceding rows are all read from the storage
+PREVIEW_MAX_CSV_OFFSET = 100_000
+
+
+def read_parquet_window(
+    parquet_file: pq.ParquetFile,
+    offset: int,
+    limit: int,
+    columns: list[str] | None = None,
+) -> pa.Table:
+    """Read `limit` rows from `offset`, decoding only the row groups (and the columns) that hold them."""
+    if columns is not None:
+        columns = [
+            column for column in columns if column in parquet_file.schema_arrow.names
+        ]
+    metadata = parquet_file.metadata
+    row_groups, skipped, start = [], 0, 0
+    for position in range(metadata.num_row_groups):
+        rows = metadata.row_group(position).num_rows
+        if start + rows <= offset:
+            skipped += rows
+        elif start < offset + limit:
+            row_groups.append(position)
+        start += rows
+
+    schema = parquet_file.schema_arrow
+    if columns is not None:
+        schema = pa.schema([schema.field(column) for column in columns])
+    batches, rows = [], -(offset - skipped)
+    if row_groups and limit:
+        for batch in parquet_file.iter_batches(
+            batch_size=min(limit, 10_000), row_groups=row_groups, columns=columns
+        ):
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= limit:
+                break
+    return pa.Table.from_batches(batches, schema=schema).slice(offset - skipped, limit)
+
+
+def read_csv_window(
+    file,
+    compression: str | None,
+    offset: int,
+    limit: int,
+    columns: list[str] | None = None,
+) -> pa.Table:
+    df = pd.read_csv(
+        file,
+        low_memory=False,
+        compression=compression,
+        # A callable is called for each row as it is parsed, a range would be turned into a set of all its rows
+        skiprows=lambda row: 0 < row <= offset,
+        nrows=limit,
+        usecols=None if columns is None else lambda column: column in columns,
+    )
+    return to_arrow_table(df)
+
+
+def get_preview(
+    version_file: DatasetVersionFile,
+    offset: int = 0,
+    limit: int = 100,
+    columns: list[str] | None = None,
+) -> dict:
+    """Return the total number of rows (when known) and the columns of a window of rows of a tabular file."""
+    offset = max(offset, 0)
+    limit = min(max(limit, 0), PREVIEW_MAX_ROWS)
+    mime_type, encoding = mimetypes.guess_type(version_file.filename, strict=False)
+
+    if is_parquet_file(version_file.filename):
+        with (
+            open_version_file(version_file) as file,
+            pq.ParquetFile(file) as parquet_file,
+        ):
+            table = read_parquet_window(parquet_file, offset, limit, columns)
+            total_rows = parquet_file.metadata.num_rows
+    elif mime_type == "text/csv":
+        total_rows = version_file.rows
+        if total_rows is not None and offset >= total_rows:
+            # Past the end of the file, only its header is read
+            offset = limit = 0
+        elif offset > PREVIEW_MAX_CSV_OFFSET:
+            raise ValueError(
+                f"Offset {offset} exceeds the maximum offset of a CSV preview ({PREVIEW_MAX_CSV_OFFSET})"
+            )
+        with open_version_file(version_file) as file:
+            table = read_csv_window(
+                file, CSV_COMPRESSIONS.get(encoding), offset, limit, columns
+            )
+    else:
+        raise ValueError(f"Unsupported file format: {version_file.filename}")
+
+    return {
+        "total_rows": total_rows,
+        "columns": get_columns(table, columns=columns),
+    }
@@ -0,0 +1,633 @@
+"""Per-column profiling of tabular dataset files.
+
+Statistics are computed with vectorized operations: the null counts of all columns at once, a single
+hash-based distinct count per column, and the moments, extrema and quantiles of all the numeric columns
+from a single float matrix. Above WORKSPACE_DATASETS_PROFILING_EXACT_MAX_ROWS rows, distinct counts are
+estimated with HyperLogLog and quantiles with a t-digest: both sketches use a fixed amount of memory and
+can be merged.
+
+Files too large to be loaded at once are profiled chunk by chunk with `DataFrameProfiler`, which relies on
+the same sketches and on mergeable moments. Large Parquet files are profiled from the statistics of their
+footer only, with `profile_parquet_metadata`.
+
+`profile_table` and `ArrowProfiler` compute the same statistics with Arrow compute kernels, on tables read
+straight from Parquet and CSV files: text columns are not converted to Python objects and columns are
+profiled in parallel threads.
+"""
+
+import math
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pandas.api import types
+
+QUANTILES = [0.25, 0.5, 0.75]
+TDIGEST_BATCH_SIZE = 1_000_000
+
+
+class HyperLogLog:
+    """Estimate the number of distinct 64-bit hashes, within about 1.04 / sqrt(2 ** precision)."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        remaining_bits = 64 - self.precision
+        rest = hashes & np.uint64((1 << remaining_bits) - 1)
+        # The rank is the position of the leftmost 1 in the remaining bits. They are converted exactly to
+        # floats (remaining_bits <= 53), whose exponent is their bit length.
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (remaining_bits + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class TDigest:
+    """Estimate quantiles from weighted centroids, more precise at the tails than around the median.
+
+    The centroids and the new values are sorted together and grouped so that the size of each centroid
+    is bounded by the arcsine scale function of its quantile.
+    """
+
+    def __init__(self, compression: int = 200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        # Values are merged in batches so that only small arrays are sorted
+        for start in range(0, len(values), TDIGEST_BATCH_SIZE):
+            batch = np.sort(values[start : start + TDIGEST_BATCH_SIZE])
+            positions = np.searchsorted(batch, self.means)
+            self._compress(
+                np.insert(batch, positions, self.means),
+                np.insert(np.ones(len(batch)), positions, self.weights),
+            )
+        return self
+
+    def merge(self, other: "TDigest"):
+        if len(other.means):
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            means = np.concatenate([self.means, other.means])
+            weights = np.concatenate([self.weights, other.weights])
+            order = np.argsort(means)
+            self._compress(means[order], weights[order])
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Group the sorted `means` into centroids."""
+        cumulative = np.cumsum(weights)
+        centers = (cumulative - weights / 2) / cumulative[-1]
+        buckets = np.floor(
+            self.compression / (2 * math.pi) * np.arcsin(2 * centers - 1)
+        )
+        # The buckets are sorted, the centroids are the runs of equal buckets
+        starts = np.flatnonzero(np.diff(buckets, prepend=-np.inf))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float | list[float]):
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        cumulative = np.cumsum(self.weights)
+        centers = (cumulative - self.weights / 2) / cumulative[-1]
+        return np.interp(
+            q,
+            np.concatenate([[0], centers, [1]]),
+            np.concatenate([[self.minimum], self.means, [self.maximum]]),
+        )
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """Return the 64-bit hashes of the non-null values of the series."""
+    values = series[series.notna()]
+    try:
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    except TypeError:
+        # Unhashable objects (lists, dicts...) are hashed through their string representation
+        return pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+
+
+def hash_numbers(values: np.ndarray) -> np.ndarray:
+    """Return the 64-bit hashes of the non-NaN numbers, integral floats hashed as the integers they are equal to.
+
+    A column can be read as integers in one chunk and as floats in another, the same numbers have the same hashes
+    either way. Integers are not converted to floats, which would merge the ones larger than 2**53.
+    """
+    if values.dtype.kind in "iu":
+        return hash_values(pd.Series(values))
+    integral = (np.floor(values) == values) & (np.abs(values) < 2.0**63)
+    return np.concatenate(
+        [
+            hash_values(pd.Series(values[integral].astype(np.int64))),
+            hash_values(pd.Series(values[~integral])),
+        ]
+    )
+
+
+def count_unique(series: pd.Series, approximate: bool = False) -> int:
+    if approximate:
+        return HyperLogLog().update(hash_values(series)).count()
+    try:
+        return int(series.nunique())
+    except TypeError:
+        return len(pd.unique(hash_values(series)))
+
+
+def is_numeric(dtype) -> bool:
+    return (
+        types.is_numeric_dtype(dtype)
+        and not types.is_bool_dtype(dtype)
+        and not types.is_complex_dtype(dtype)
+    )
+
+
+def get_data_type(dtype) -> str:
+    # Text columns are read with the object dtype, they are reported as strings
+    return "string" if dtype == object else str(dtype)
+
+
+def numeric_statistics(df: pd.DataFrame, approximate: bool = False) -> list[dict]:
+    """Return the statistics of every (numeric) column of the frame, or None for the columns without finite values."""
+    values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+    values[~np.isfinite(values)] = np.nan
+    finite_counts = np.count_nonzero(~np.isnan(values), axis=0)
+
+    with warnings.catch_warnings():
+        # All-NaN columns and columns with a single value are handled below
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        standard_deviation = np.nan_to_num(np.nanstd(values, axis=0, ddof=1))
+        minimum = np.nanmin(values, axis=0)
+        maximum = np.nanmax(values, axis=0)
+        if approximate:
+            quantiles = np.array(
+                [
+                    TDigest().update(column[~np.isnan(column)]).quantile(QUANTILES)
+                    for column in values.T
+                ]
+            ).T
+        else:
+            quantiles = np.nanquantile(values, QUANTILES, axis=0)
+
+    statistics = []
+    for position, dtype in enumerate(df.dtypes):
+        if not finite_counts[position]:
+            statistics.append(None)
+            continue
+        if types.is_integer_dtype(dtype):
+            # Integers larger than 2**53 are not exactly represented as floats
+            column = df.iloc[:, position]
+            column_minimum, column_maximum = int(column.min()), int(column.max())
+        else:
+            column_minimum = float(minimum[position])
+            column_maximum = float(maximum[position])
+        statistics.append(
+            {
+                "mean": float(mean[position]),
+                "minimum": column_minimum,
+                "maximum": column_maximum,
+                "quantiles25": float(quantiles[0, position]),
+                "median": float(quantiles[1, position]),
+                "quantiles75": float(quantiles[2, position]),
+                "standard_deviation": float(standard_deviation[position]),
+            }
+        )
+    return statistics
+
+
+def profile_dataframe(df: pd.DataFrame, approximate: bool = False) -> list[dict]:
+    """Compute the statistics of each column of the frame.
+
+    When `approximate` is set, distinct counts and quantiles are estimated with sketches.
+    """
+    rows = len(df.index)
+    counts = df.count().to_numpy()
+    numeric_positions = [
+        position for position, dtype in enumerate(df.dtypes) if is_numeric(dtype)
+    ]
+    statistics = dict(
+        zip(
+            numeric_positions,
+            numeric_statistics(df.iloc[:, numeric_positions], approximate)
+            if numeric_positions
+            else [],
+        )
+    )
+
+    profiles = []
+    for position, column in enumerate(df.columns):
+        series = df.iloc[:, position]
+        count = int(counts[position])
+        unique_values = count_unique(series, approximate)
+        profiles.append(
+            {
+                "column_name": str(column),
+                "count": count,
+                "data_type": get_data_type(series.dtype),
+                "missing_values": rows - count,
+                "unique_values": unique_values,
+                # nulls count as one more distinct value
+                "distinct_values": unique_values + (count < rows),
+                "constant_values": unique_values == 1,
+                **(statistics.get(position) or {}),
+            }
+        )
+    return profiles
+
+
+class ColumnAccumulator:
+    """Statistics of a column read in chunks, in a memory that does not depend on its size."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.count = 0
+        self.dtypes = set()
+        self.numeric = True
+        self.distinct = HyperLogLog()
+        self.digest = TDigest()
+        # Number, mean and sum of the squared deviations of the finite values (Chan et al.)
+        self.finite = 0
+        self.mean = 0.0
+        self.squares = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def update(self, series: pd.Series):
+        self.rows += len(series.index)
+        self.count += int(series.count())
+        self.dtypes.add(series.dtype)
+        self.numeric = self.numeric and is_numeric(series.dtype)
+        if not self.numeric:
+            self.distinct.update(hash_values(series))
+            return
+
+        if types.is_integer_dtype(series.dtype):
+            integers = series.dropna().to_numpy(
+                dtype=np.uint64
+                if types.is_unsigned_integer_dtype(series.dtype)
+                else np.int64
+            )
+            self.distinct.update(hash_numbers(integers))
+            if len(integers):
+                # Only the moments and quantiles are computed from floats
+                self.update_numeric(
+                    integers.astype(np.float64),
+                    int(integers.min()),
+                    int(integers.max()),
+                )
+            return
+
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        self.distinct.update(hash_numbers(values))
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.update_numeric(values, float(values.min()), float(values.max()))
+
+    def update_numeric(self, values: np.ndarray, minimum, maximum):
+        """Accumulate the finite values of a chunk, whose extrema are given in the type of the column."""
+        self.digest.update(values)
+
+        finite, mean = len(values), float(values.mean())
+        squares = float(((values - mean) ** 2).sum())
+        total = self.finite + finite
+        delta = mean - self.mean
+        self.mean += delta * finite / total
+        self.squares += squares + delta**2 * self.finite * finite / total
+        self.finite = total
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+
+    @property
+    def data_type(self) -> str:
+        if len(self.dtypes) == 1:
+            return get_data_type(next(iter(self.dtypes)))
+        # Chunks are typed separately, report the type the whole column would have been read with
+        return "float64" if self.numeric else "string"
+
+    def profile(self) -> dict:
+        unique_values = self.distinct.count()
+        profile = {
+            "column_name": self.name,
+            "count": self.count,
+            "data_type": self.data_type,
+            "missing_values": self.rows - self.count,
+            "unique_values": unique_values,
+            "distinct_values": unique_values + (self.count < self.rows),
+            "constant_values": unique_values == 1,
+        }
+        if self.numeric and self.finite:
+            quantiles = self.digest.quantile(QUANTILES)
+            profile.update(
+                {
+                    "mean": self.mean,
+                    "minimum": self.minimum,
+                    "maximum": self.maximum,
+                    "quantiles25": float(quantiles[0]),
+                    "median": float(quantiles[1]),
+                    "quantiles75": float(quantiles[2]),
+                    "standard_deviation": math.sqrt(self.squares / (self.finite - 1))
+                    if self.finite > 1
+                    else 0.0,
+                }
+            )
+        return profile
+
+
+class DataFrameProfiler:
+    """Profile a frame read in chunks.
+
+    A frame read in a single chunk is profiled with `profile_dataframe`. Once a second chunk is read,
+    the statistics are accumulated in sketches so that the chunks do not have to be kept in memory.
+    """
+
+    def __init__(self, approximate_above: int | None = None):
+        self.approximate_above = approximate_above
+        self.rows = 0
+        self.first_chunk = None
+        self.columns = None
+
+    def update(self, df: pd.DataFrame):
+        self.rows += len(df)
+        if self.first_chunk is None and self.columns is None:
+            self.first_chunk = df
+            return
+        if self.columns is None:
+            self.columns = self.create_accumulators(self.first_chunk)
+            self._accumulate(self.first_chunk)
+            self.first_chunk = None
+        self._accumulate(df)
+
+    def create_accumulators(self, df: pd.DataFrame) -> list[ColumnAccumulator]:
+        return [ColumnAccumulator(str(column)) for column in df.columns]
+
+    def _accumulate(self, df: pd.DataFrame):
+        for position, column in enumerate(self.columns):
+            column.update(df.iloc[:, position])
+
+    def profile_chunk(self, df: pd.DataFrame, approximate: bool) -> list[dict]:
+        return profile_dataframe(df, approximate=approximate)
+
+    def profile(self) -> list[dict]:
+        if self.columns is not None:
+            return [column.profile() for column in self.columns]
+        if self.first_chunk is None:
+            return []
+        return self.profile_chunk(
+            self.first_chunk,
+            approximate=self.approximate_above is not None
+            and self.rows > self.approximate_above,
+        )
+
+
+def is_arrow_numeric(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+
+def to_pandas_dtype(data_type: pa.DataType):
+    """Return the dtype a column would have been read with by pandas, to report the same data types."""
+    if pa.types.is_dictionary(data_type):
+        return pd.CategoricalDtype()
+    try:
+        return types.pandas_dtype(data_type.to_pandas_dtype())
+    except (NotImplementedError, TypeError):
+        return np.dtype(object)
+
+
+def hash_arrow_values(values: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """Return the 64-bit hashes of the non-null values, the same as `ColumnAccumulator` on the converted series."""
+    values = values.drop_null()
+    if pa.types.is_integer(values.type):
+        return hash_numbers(values.to_numpy())
+    if pa.types.is_floating(values.type):
+        return hash_numbers(pc.cast(values, pa.float64()).to_numpy())
+    if pa.types.is_dictionary(values.type):
+        values = values.cast(values.type.value_type)
+    return hash_values(pd.Series(values.to_numpy(zero_copy_only=False)))
+
+
+def count_nans(values: pa.Array | pa.ChunkedArray) -> int:
+    if not pa.types.is_floating(values.type):
+        return 0
+    return pc.sum(pc.is_nan(values)).as_py() or 0
+
+
+def get_unique_values(values: pa.Array | pa.ChunkedArray) -> pa.Array | None:
+    """Return the distinct values (with nulls and NaN), or None for the types without hash kernels (lists...)."""
+    try:
+        return pc.unique(values)
+    except pa.ArrowNotImplementedError:
+        return None
+
+
+def count_arrow_unique(values: pa.ChunkedArray, approximate: bool = False) -> int:
+    unique = get_unique_values(values)
+    if unique is None:
+        return count_unique(values.to_pandas(), approximate)
+    if approximate:
+        return HyperLogLog().update(hash_arrow_values(unique)).count()
+    # Like pandas, nulls and NaN are not counted as values
+    return len(unique) - unique.null_count - min(count_nans(unique), 1)
+
+
+def get_finite_values(values: pa.Array | pa.ChunkedArray) -> pa.Array | pa.ChunkedArray:
+    values = values.drop_null()
+    if pa.types.is_floating(values.type):
+        values = values.filter(pc.is_finite(values))
+    return values
+
+
+def get_extrema(values: pa.Array | pa.ChunkedArray) -> tuple:
+    extrema = pc.min_max(values)
+    minimum, maximum = extrema["min"].as_py(), extrema["max"].as_py()
+    if pa.types.is_floating(values.type):
+        return float(minimum), float(maximum)
+    return minimum, maximum
+
+
+def profile_arrow_column(
+    name: str, column: pa.ChunkedArray, approximate: bool = False
+) -> dict:
+    """Same as the profile of a column by `profile_dataframe`, computed with Arrow kernels."""
+    rows = len(column)
+    count = rows - column.null_count - count_nans(column)
+    unique_values = count_arrow_unique(column, approximate)
+    profile = {
+        "column_name": name,
+        "count": count,
+        "data_type": get_data_type(to_pandas_dtype(column.type)),
+        "missing_values": rows - count,
+        "unique_values": unique_values,
+        # nulls count as one more distinct value
+        "distinct_values": unique_values + (count < rows),
+        "constant_values": unique_values == 1,
+    }
+    if not is_arrow_numeric(column.type):
+        return profile
+    values = get_finite_values(column)
+    if not len(values):
+        return profile
+    minimum, maximum = get_extrema(values)
+    if approximate:
+        quantiles = (
+            TDigest()
+            .update(pc.cast(values, pa.float64(), safe=False).to_numpy())
+            .quantile(QUANTILES)
+        )
+    else:
+        quantiles = pc.quantile(values, q=QUANTILES).to_pylist()
+    profile.update(
+        {
+            "mean": pc.mean(values).as_py(),
+            "minimum": minimum,
+            "maximum": maximum,
+            "quantiles25": float(quantiles[0]),
+            "median": float(quantiles[1]),
+            "quantiles75": float(quantiles[2]),
+            "standard_deviation": pc.stddev(values, ddof=1).as_py()
+            if len(values) > 1
+            else 0.0,
+        }
+    )
+    return profile
+
+
+def profile_table(table: pa.Table, approximate: bool = False) -> list[dict]:
+    """Compute the statistics of each column of an Arrow table, the same as `profile_dataframe`.
+
+    Columns are profiled in parallel threads: Arrow kernels release the GIL, and text columns are not
+    converted to Python objects (only their distinct values are, to estimate their count).
+    """
+    with ThreadPoolExecutor(max_workers=pa.cpu_count()) as executor:
+        return list(
+            executor.map(
+                lambda position: profile_arrow_column(
+                    table.column_names[position], table.column(position), approximate
+                ),
+                range(table.num_columns),
+            )
+        )
+
+
+class ArrowColumnAccumulator(ColumnAccumulator):
+    """Same as `ColumnAccumulator` for the columns of Arrow record batches."""
+
+    def update(self, column: pa.Array | pa.ChunkedArray):
+        self.rows += len(column)
+        self.count += len(column) - column.null_count - count_nans(column)
+        self.dtypes.add(to_pandas_dtype(column.type))
+        self.numeric = self.numeric and is_arrow_numeric(column.type)
+        unique = get_unique_values(column)
+        if unique is None:
+            self.distinct.update(hash_values(column.to_pandas()))
+        else:
+            self.distinct.update(hash_arrow_values(unique))
+        if not self.numeric:
+            return
+        values = get_finite_values(column)
+        if len(values):
+            self.update_numeric(
+                # Integers larger than 2**53 are rounded, as for the moments of `ColumnAccumulator`
+                pc.cast(values, pa.float64(), safe=False).to_numpy(),
+                *get_extrema(values),
+            )
+
+
+class ArrowProfiler(DataFrameProfiler):
+    """Profile an Arrow table read in record batches, see `DataFrameProfiler`."""
+
+    def update(self, batch: pa.RecordBatch | pa.Table):
+        if isinstance(batch, pa.RecordBatch):
+            batch = pa.Table.from_batches([batch])
+        super().update(batch)
+
+    def create_accumulators(self, table: pa.Table) -> list[ColumnAccumulator]:
+        return [ArrowColumnAccumulator(name) for name in table.column_names]
+
+    def _accumulate(self, table: pa.Table):
+        with ThreadPoolExecutor(max_workers=pa.cpu_count()) as executor:
+            list(
+                executor.map(
+                    lambda position: self.columns[position].update(
+                        table.column(position)
+                    ),
+                    range(len(self.columns)),
+                )
+            )
+
+    def profile_chunk(self, table: pa.Table, approximate: bool) -> list[dict]:
+        return profile_table(table, approximate=approximate)
+
+
+def profile_parquet_metadata(metadata: pq.FileMetaData) -> list[dict]:
+    """Profile the columns of a Parquet file from the row group statistics of its footer, without reading any data.
+
+    Only the data types, the null counts and the extrema of the numeric columns are known from the footer:
+    they are left out of the profile of a column when a row group misses them.
+    """
+    rows = metadata.num_rows
+    row_groups = [
+        metadata.row_group(i)
+        for i in range(metadata.num_row_groups)
+        if metadata.row_group(i).num_rows
+    ]
+    # Nested columns have several leaves in the footer, and no statistics of their own
+    leaves = {metadata.schema.column(i).path: i for i in range(metadata.num_columns)}
+    dtypes = metadata.schema.to_arrow_schema().empty_table().to_pandas().dtypes
+
+    profiles = []
+    for column, dtype in dtypes.items():
+        profile = {"column_name": str(column), "data_type": get_data_type(dtype)}
+        profiles.append(profile)
+        if str(column) not in leaves:
+            continue
+        statistics = [
+            row_group.column(leaves[str(column)]).statistics for row_group in row_groups
+        ]
+        if all(s is not None and s.has_null_count for s in statistics):
+            missing_values = sum(s.null_count for s in statistics)
+            profile["count"] = rows - missing_values
+            profile["missing_values"] = missing_values
+        if (
+            is_numeric(dtype)
+            and statistics
+            and all(s is not None and s.has_min_max for s in statistics)
+        ):
+            minimum = min(s.min for s in statistics)
+            maximum = max(s.max for s in statistics)
+            if not types.is_integer_dtype(dtype):
+                minimum, maximum = float(minimum), float(maximum)
+            profile["minimum"] = minimum
+            profile["maximum"] = maximum
+    return profiles
@@ -1,15 +1,24 @@
 import hashlib
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
 from logging import getLogger
-from typing import Type
+from typing import IO, Callable, Iterator, Type
 
-import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
 from django.conf import settings
 from django.db import transaction
-from dpq.queue import AtMostOnceQueue, Queue
+from django.utils import timezone
+from dpq.queue import Queue
+from pyarrow import csv
 
 from hexa.core import mimetypes
-from hexa.datasets.api import generate_download_url
+from hexa.datasets.api import generate_download_url, open_version_file
 from hexa.datasets.models import (
     BaseJobWithRetry,
     DatasetFileMetadataJob,
@@ -17,10 +26,25 @@ from hexa.datasets.models import (
     DatasetVersion,
     DatasetVersionFile,
 )
+from hexa.datasets.profiling import (
+    ArrowProfiler,
+    DataFrameProfiler,
+    profile_dataframe,
+    profile_parquet_metadata,
+)
+from hexa.datasets.samples import encode_sample
 
 logger = getLogger(__name__)
 
 
+def is_parquet_file(filename: str) -> bool:
+    mime_type, _ = mimetypes.guess_type(filename, strict=False)
+    return (
+        mime_type == "application/vnd.apache.parquet"
+        or filename.split(".")[-1] == "parquet"
+    )
+
+
 def is_file_supported(filename: str) -> bool:
     supported_mimetypes = [
         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -34,8 +58,133 @@ def is_file_supported(filename: str) -> bool:
     return mime_type in supported_mimetypes or suffix in supported_extensions
 
 
-def load_df(dataset_version_file: DatasetVersionFile) -> pd.DataFrame:
-    mime_type, _ = mimetypes.guess_type(dataset_version_file.filename, strict=False)
+CSV_COMPRESSIONS = {"gzip": "gzip", "bzip2": "bz2", "xz": "xz"}
+# Rows read to estimate the memory footprint of a row before chunking a CSV file
+PROBE_ROWS = 10_000
+# Bounds of the size of the blocks in which CSV files are read by Arrow
+CSV_MIN_BLOCK_SIZE = 1024 * 1024
+CSV_MAX_BLOCK_SIZE = 1024 * 1024 * 1024
+# Ratio between the memory used to read and profile a chunk and the size of the resulting frame
+CHUNK_MEMORY_FACTOR = 4
+
+
+@contextmanager
+def open_file(download_url: str) -> Iterator[IO[bytes]]:
+    """Open the file behind a download url (or a local path) as a stream of bytes, without buffering it."""
+    if not download_url.startswith(("http://", "https://")):
+        with open(download_url, "rb") as file:
+            yield file
+        return
+
+    with requests.get(download_url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        yield response.raw
+
+
+def get_chunk_size(bytes_per_row: float, memory_limit: int) -> int:
+    return max(1, int(memory_limit / (CHUNK_MEMORY_FACTOR * max(bytes_per_row, 1))))
+
+
+def iter_csv(
+    file: IO[bytes], compression: str | None, memory_limit: int | None
+) -> Iterator[pd.DataFrame]:
+    # low_memory is set to False for datatype guessing (within each chunk)
+    reader = pd.read_csv(file, low_memory=False, compression=compression, iterator=True)
+    with reader:
+        if memory_limit is None:
+            yield reader.read()
+            return
+
+        chunk = reader.get_chunk(
+            max(PROBE_ROWS, settings.WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE)
+        )
+        yield chunk
+        if chunk.empty:
+            return
+        chunk_size = get_chunk_size(
+            chunk.memory_usage(deep=True).sum() / len(chunk.index), memory_limit
+        )
+        del chunk
+        while True:
+            try:
+                yield reader.get_chunk(chunk_size)
+            except StopIteration:
+                return
+
+
+def iter_csv_batches(
+    file: IO[bytes], memory_limit: int | None
+) -> Iterator[pa.RecordBatch | pa.Table]:
+    """Read an (uncompressed) CSV file as Arrow record batches.
+
+    Column types are inferred from the first block: pyarrow.ArrowInvalid is raised when a later block does
+    not match them.
+    """
+    block_size = (
+        CSV_MAX_BLOCK_SIZE
+        if memory_limit is None
+        else min(
+            max(memory_limit // CHUNK_MEMORY_FACTOR, CSV_MIN_BLOCK_SIZE),
+            CSV_MAX_BLOCK_SIZE,
+        )
+    )
+    reader = csv.open_csv(
+        file,
+        read_options=csv.ReadOptions(block_size=block_size),
+        # Empty strings are missing values, as with pandas
+        convert_options=csv.ConvertOptions(strings_can_be_null=True),
+    )
+    empty = True
+    for batch in reader:
+        empty = False
+        yield batch
+    if empty:
+        yield reader.schema.empty_table()
+
+
+def iter_parquet_batches(
+    parquet_file: pq.ParquetFile, memory_limit: int | None
+) -> Iterator[pa.RecordBatch | pa.Table]:
+    metadata = parquet_file.metadata
+    if memory_limit is None or metadata.num_rows == 0:
+        yield parquet_file.read()
+        return
+
+    # The uncompressed size of the row groups is known from the footer, before reading any data
+    uncompressed_size = sum(
+        metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups)
+    )
+    chunk_size = get_chunk_size(uncompressed_size / metadata.num_rows, memory_limit)
+    yield from parquet_file.iter_batches(batch_size=chunk_size)
+
+
+def iter_parquet(
+    parquet_file: pq.ParquetFile, memory_limit: int | None
+) -> Iterator[pd.DataFrame]:
+    for batch in iter_parquet_batches(parquet_file, memory_limit):
+        yield batch.to_pandas()
+
+
+def read_parquet_head(parquet_file: pq.ParquetFile, rows: int) -> pd.DataFrame:
+    """Read the first rows of a Parquet file, from its first row group only."""
+    if parquet_file.metadata.num_row_groups:
+        for batch in parquet_file.iter_batches(batch_size=rows, row_groups=[0]):
+            return batch.to_pandas()
+    return parquet_file.schema_arrow.empty_table().to_pandas()
+
+
+def iter_df(
+    dataset_version_file: DatasetVersionFile, memory_limit: int | None
+) -> Iterator[pd.DataFrame]:
+    """Read a tabular file in consecutive chunks, each of them taking about `memory_limit` bytes at most to process.
+
+    The whole file is read as a single frame if `memory_limit` is None. At least one (possibly empty) frame is
+    always yielded.
+    """
+    mime_type, encoding = mimetypes.guess_type(
+        dataset_version_file.filename, strict=False
+    )
     try:
         logger.info(f"Using {settings.INTERNAL_BASE_URL}")
         download_url = generate_download_url(
@@ -46,22 +195,34 @@ def load_df(dataset_version_file: DatasetVersionFile) -> pd.DataFrame:
         raise
 
     if mime_type == "text/csv":
-        # low_memory is set to False for datatype guessing
-        return pd.read_csv(download_url, low_memory=False)
+        with open_file(download_url) as file:
+            yield from iter_csv(file, CSV_COMPRESSIONS.get(encoding), memory_limit)
     elif (
         mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         or mime_type == "application/vnd.ms-excel"
     ):
-        return pd.read_excel(download_url, engine="openpyxl")
-    elif (
-        mime_type == "application/vnd.apache.parquet"
-        or dataset_version_file.filename.split(".")[-1] == "parquet"
-    ):
-        return pd.read_parquet(download_url)
+        # Worksheets cannot be read by chunks, they are limited in size anyway
+        yield pd.read_excel(download_url, engine="openpyxl")
+    elif is_parquet_file(dataset_version_file.filename):
+        if not download_url.startswith(("http://", "https://")):
+            with pq.ParquetFile(download_url) as parquet_file:
+                yield from iter_parquet(parquet_file, memory_limit)
+            return
+        # Parquet files are read from their footer, they have to be seekable
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as local_file:
+            with open_file(download_url) as file:
+                shutil.copyfileobj(file, local_file)
+            local_file.flush()
+            with pq.ParquetFile(local_file.name) as parquet_file:
+                yield from iter_parquet(parquet_file, memory_limit)
     else:
         raise ValueError(f"Unsupported file format: {dataset_version_file.filename}")
 
 
+def load_df(dataset_version_file: DatasetVersionFile) -> pd.DataFrame:
+    return next(iter_df(dataset_version_file, memory_limit=None))
+
+
 def generate_sample(
     version_file: DatasetVersionFile, df: pd.DataFrame
 ) -> DatasetFileSample:
@@ -70,17 +231,15 @@ def generate_sample(
         dataset_version_file=version_file,
         defaults={
             "sample": list,
+            "columnar_sample": None,
             "status": DatasetFileSample.STATUS_PROCESSING,
             "status_reason": None,
         },
     )
     try:
-        if not df.empty:
-            sample = df.head(settings.WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE)
-            sample = sample.replace(
-                {np.inf: "inf", -np.inf: "-inf"}
-            )  # We are not supporting Infinity as numbers
-            dataset_file_sample.sample = sample.to_dict(orient="records")
+        dataset_file_sample.columnar_sample = encode_sample(
+            df.head(settings.WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE)
+        )
         dataset_file_sample.status = DatasetFileSample.STATUS_FINISHED
     except Exception as e:
         logger.exception(
@@ -102,61 +261,11 @@ def generate_sample(
 def generate_profile(df: pd.DataFrame) -> list:
     logger.info("Starting profiling calculation per column")
     try:
-        for col in df.select_dtypes(include=["object"]).columns:
-            try:
-                df[col] = df[col].astype("string")
-            except Exception as e:
-                logger.warning(f"Failed to convert column '{col}' to string: {e}")
-                df.drop(columns=[col], inplace=True)
-
-        data_types = df.dtypes.apply(str).to_dict()
-        missing_values = df.isnull().sum().to_dict()
-        unique_values = df.nunique().to_dict()
-        distinct_values = df.apply(lambda x: x.nunique(dropna=False)).to_dict()
-        constant_values = df.apply(lambda x: x.nunique() == 1).astype("bool").to_dict()
-        count = df.count().to_dict()
-
-        numeric_df = df.select_dtypes(include=["number"]).replace(
-            [np.inf, -np.inf], np.nan
+        metadata_per_column = profile_dataframe(
+            df,
+            approximate=len(df.index)
+            > settings.WORKSPACE_DATASETS_PROFILING_EXACT_MAX_ROWS,
         )
-        numeric_df = numeric_df.dropna(
-            how="all", axis=1
-        )  # Drop numeric columns with all NaN values
-
-        mean = numeric_df.mean().to_dict()
-        minimum = numeric_df.min().to_dict()
-        maximum = numeric_df.max().to_dict()
-        quantiles25 = numeric_df.quantile(0.25).to_dict()
-        median = numeric_df.median().to_dict()
-        quantiles75 = numeric_df.quantile(0.75).to_dict()
-        standard_deviation = numeric_df.std().replace({np.nan: 0.0}).to_dict()
-        metadata_per_column = [
-            {
-                **{
-                    "column_name": str(column),
-                    "count": count.get(column),
-                    "data_type": data_types.get(column),
-                    "missing_values": missing_values.get(column),
-                    "unique_values": unique_values.get(column),
-                    "distinct_values": distinct_values.get(column),
-                    "constant_values": constant_values.get(column),
-                },
-                **(
-                    {
-                        "mean": mean.get(column),
-                        "minimum": minimum.get(column),
-                        "maximum": maximum.get(column),
-                        "quantiles25": quantiles25.get(column),
-                        "median": median.get(column),
-                        "quantiles75": quantiles75.get(column),
-                        "standard_deviation": standard_deviation.get(column),
-                    }
-                    if column in numeric_df.columns
-                    else {}
-                ),
-            }
-            for column in df.columns
-        ]
         logger.info("Finished profiling calculation per column")
         return metadata_per_column
 
@@ -190,45 +299,218 @@ def get_previous_version_file(
         return None
 
 
-def add_system_attributes(version_file: DatasetVersionFile, df: pd.DataFrame | None):
-    """Add user defined attributes to the file based on the previous version and automated profiling if a dataframe has been passed."""
+# Size of the blocks read to compute the checksum of files that have none on the storage
+CHECKSUM_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def compute_checksum(version_file: DatasetVersionFile) -> str:
+    """Compute the hex MD5 of a dataset file, for storages and uploads (S3 multipart) that do not provide one."""
+    checksum = hashlib.md5(usedforsecurity=False)
+    with open_version_file(version_file) as file:
+        while block := file.read(CHECKSUM_BLOCK_SIZE):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def has_same_content(
+    version_file: DatasetVersionFile, prev_file: DatasetVersionFile
+) -> bool:
+    """Check whether two dataset files have the same content, comparing their sizes and then their checksums.
+
+    Missing checksums are computed (and stored) only for files of the same size.
+    """
+    if version_file.size is None or version_file.size != prev_file.size:
+        return False
+    for file in (version_file, prev_file):
+        if file.checksum is None:
+            file.checksum = compute_checksum(file)
+            file.save(update_fields=["checksum", "updated_at"])
+    return version_file.checksum == prev_file.checksum
+
+
+def copy_metadata_from_previous_version(version_file: DatasetVersionFile) -> bool:
+    """Copy the sample, row count and attributes of the same file in the previous version if its content did not
+    change, return False if the file has to be profiled.
+    """
+    prev_file = get_previous_version_file(version_file)
+    if prev_file is None:
+        return False
+    prev_sample = DatasetFileSample.objects.filter(
+        dataset_version_file=prev_file, status=DatasetFileSample.STATUS_FINISHED
+    ).first()
+    if prev_sample is None or not has_same_content(version_file, prev_file):
+        return False
+
+    logger.info(f"File unchanged since the previous version, copying {prev_file}")
+    DatasetFileSample.objects.update_or_create(
+        dataset_version_file=version_file,
+        defaults={
+            "sample": prev_sample.sample,
+            "columnar_sample": prev_sample.columnar_sample,
+            "status": DatasetFileSample.STATUS_FINISHED,
+            "status_reason": None,
+        },
+    )
+    version_file.bulk_update_or_create_attributes(
+        {
+            "key": attribute.key,
+            "value": attribute.value,
+            "label": attribute.label,
+            "system": attribute.system,
+        }
+        for attribute in prev_file.attributes.all()
+    )
+    version_file.rows = prev_file.rows
+    for key in ["columns", "column_order"]:
+        if key in prev_file.properties:
+            version_file.properties[key] = prev_file.properties[key]
+    version_file.save()
+    return True
+
+
+def add_system_attributes(
+    version_file: DatasetVersionFile,
+    df: pd.DataFrame | None,
+    profiling: list[dict] | None = None,
+):
+    """Add user defined attributes to the file based on the previous version and automated profiling if a dataframe
+    (or its already computed profiling) has been passed.
+    """
     # Copy user attributes from the previous version of the file if it exists
     prev_file = get_previous_version_file(version_file)
     if prev_file:
         logger.info(f"Copying attributes from previous version - {prev_file}")
-        for attribute in prev_file.attributes.filter(system=False).all():
-            logger.info(f"Attribute {attribute.key}={attribute.value} copied")
-            version_file.update_or_create_attribute(
-                key=attribute.key,
-                value=attribute.value,
-                label=attribute.label,
-                system=False,
-            )
+        version_file.bulk_update_or_create_attributes(
+            {
+                "key": attribute.key,
+                "value": attribute.value,
+                "label": attribute.label,
+                "system": False,
+            }
+            for attribute in prev_file.attributes.filter(system=False)
+        )
 
     # Add attributes from automated profiling (if the file is supported)
-    if df is None:
-        return
-    profiling = generate_profile(df)
+    if profiling is None:
+        if df is None:
+            return
+        profiling = generate_profile(df)
     columns = {}
     column_order = []
+    attributes = []
     for column_profile in profiling:
         hashed_column_name = hashlib.md5(
             column_profile["column_name"].encode()
         ).hexdigest()
         columns[hashed_column_name] = column_profile["column_name"]
         column_order.append(hashed_column_name)
-        for key, value in column_profile.items():
-            version_file.update_or_create_attribute(
-                key=f"{hashed_column_name}.{key}",
-                value=value,
-                system=True,
-            )
+        attributes.extend(
+            {"key": f"{hashed_column_name}.{key}", "value": value, "system": True}
+            for key, value in column_profile.items()
+        )
+    version_file.bulk_update_or_create_attributes(attributes)
     version_file.properties["columns"] = columns
     version_file.properties["column_order"] = column_order
     version_file.save()
     # Set properties map
 
 
+def use_arrow_engine() -> bool:
+    return settings.WORKSPACE_DATASETS_PROFILING_ENGINE == "arrow"
+
+
+def create_profiler() -> DataFrameProfiler:
+    profiler_class = ArrowProfiler if use_arrow_engine() else DataFrameProfiler
+    return profiler_class(
+        approximate_above=settings.WORKSPACE_DATASETS_PROFILING_EXACT_MAX_ROWS
+    )
+
+
+def read_csv_metadata(version_file: DatasetVersionFile) -> Callable[[], list[dict]]:
+    """Same as `read_metadata` for uncompressed CSV files, read and profiled as Arrow record batches."""
+    profiler = create_profiler()
+    download_url = generate_download_url(version_file, host=settings.INTERNAL_BASE_URL)
+    with open_file(download_url) as file:
+        batches = iter_csv_batches(
+            file, settings.WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT
+        )
+        for position, batch in enumerate(batches):
+            if position == 0:
+                generate_sample(
+                    version_file,
+                    batch.slice(
+                        0, settings.WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE
+                    ).to_pandas(),
+                )
+            profiler.update(batch)
+    version_file.rows = profiler.rows
+    return profiler.profile
+
+
+def read_metadata(version_file: DatasetVersionFile) -> Callable[[], list[dict]]:
+    """Count the rows and sample a tabular file, and return the function computing its profiling.
+
+    Chunks are profiled as they are read so that only one of them is in memory at a time.
+    """
+    mime_type, encoding = mimetypes.guess_type(version_file.filename, strict=False)
+    if use_arrow_engine() and mime_type == "text/csv" and encoding is None:
+        try:
+            return read_csv_metadata(version_file)
+        except pa.ArrowInvalid as e:
+            # Types are inferred from the first block of the file, the next ones may not match them
+            logger.warning(
+                "Arrow could not read file %s, reading it with pandas: %s",
+                version_file.id,
+                e,
+            )
+    profiler = DataFrameProfiler(
+        approximate_above=settings.WORKSPACE_DATASETS_PROFILING_EXACT_MAX_ROWS
+    )
+    chunks = iter_df(version_file, settings.WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT)
+    for position, chunk in enumerate(chunks):
+        if position == 0:
+            generate_sample(version_file, chunk)
+        profiler.update(chunk)
+    version_file.rows = profiler.rows
+    return profiler.profile
+
+
+def read_parquet_metadata(
+    version_file: DatasetVersionFile,
+) -> Callable[[], list[dict]]:
+    """Same as `read_metadata` for Parquet files, read with ranged reads on the storage.
+
+    The row count comes from the footer and the sample from the first row group. Files of more than
+    WORKSPACE_DATASETS_PARQUET_FOOTER_PROFILING_MIN_ROWS rows are profiled from the footer statistics,
+    without reading the rest of the file.
+    """
+    with (
+        open_version_file(version_file) as file,
+        pq.ParquetFile(file) as parquet_file,
+    ):
+        metadata = parquet_file.metadata
+        version_file.rows = metadata.num_rows
+        generate_sample(
+            version_file,
+            read_parquet_head(
+                parquet_file, settings.WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE
+            ),
+        )
+        if (
+            metadata.num_rows
+            > settings.WORKSPACE_DATASETS_PARQUET_FOOTER_PROFILING_MIN_ROWS
+        ):
+            return partial(profile_parquet_metadata, metadata)
+
+        profiler = create_profiler()
+        chunks = (iter_parquet_batches if use_arrow_engine() else iter_parquet)(
+            parquet_file, settings.WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT
+        )
+        for chunk in chunks:
+            profiler.update(chunk)
+        return profiler.profile
+
+
 def generate_file_metadata_task(file_id: str) -> None:
     """Task to extract a sample of tabular files, generate profiling metadata when possible and copy user defined attributes."""
     try:
@@ -238,13 +520,24 @@ def generate_file_metadata_task(file_id: str) -> None:
         return
 
     logger.info("Generating metadata for file %s", version_file.id)
-    df = None
+    if version_file.size is None:
+        # The file may have been uploaded after its creation
+        version_file.update_storage_properties()
+    try:
+        if copy_metadata_from_previous_version(version_file):
+            return
+    except Exception as e:
+        # The file is profiled as if it had no previous version
+        logger.exception(
+            "Failed to copy the metadata of the previous version", exc_info=e
+        )
+    profile = None
     try:
         # We only support tabular data for now (CSV, Excel, Parquet) for the sample generation & profiling
-        if is_file_supported(version_file.filename):
-            df = load_df(version_file)
-            version_file.rows = len(df.index)
-            generate_sample(version_file, df)
+        if is_parquet_file(version_file.filename):
+            profile = read_parquet_metadata(version_file)
+        elif is_file_supported(version_file.filename):
+            profile = read_metadata(version_file)
     except Exception as e:
         logger.exception(
             f"Failed to load dataframe for file {version_file.id}", exc_info=e
@@ -255,54 +548,91 @@ def generate_file_metadata_task(file_id: str) -> None:
         )
         return
     logger.info("Finished sample generation, calculating profiling")
-    add_system_attributes(version_file, df)
+    profiling = None
+    if profile is not None:
+        try:
+            profiling = profile()
+        except Exception as e:
+            logger.exception("Failed to calculate profiling", exc_info=e)
+            profiling = []
+    add_system_attributes(version_file, None, profiling=profiling)
+
+
+# Delay before the first retry of a failed job, doubled on each of the following failures
+RETRY_BACKOFF = 30
+MAX_RETRY_BACKOFF = 3600
 
 
 class AtMostLimitedAmountQueue(Queue):
+    """Queue whose failed jobs are put back in the queue with an exponential backoff, a limited amount of times."""
+
     def __init__(self, job_model: Type[BaseJobWithRetry], *args, **kwargs):
         self.job_model = job_model
         super().__init__(*args, **kwargs)
 
+    def claim(self, exclude_ids=[]) -> BaseJobWithRetry | None:
+        """Claim the next available job, which is deleted from the queue until it fails."""
+        while True:
+            job: BaseJobWithRetry | None = self.job_model.dequeue(
+                exclude_ids=exclude_ids
+            )
+            if job is None:
+                return None
+            self.logger.debug(
+                "Claimed %r.", job, extra={"data": {"job": job.to_json()}}
+            )
+            if job.retry_count < job.max_retries:
+                return job
+            self.logger.error(f"Job {job.id} reached max retries, skipping.")
+
     def run_once(self, exclude_ids=[]):
         job: BaseJobWithRetry | None = None
         try:
-            with transaction.atomic():
-                job = self.job_model.dequeue(exclude_ids=exclude_ids)
-                if job:
-                    self.logger.debug(
-                        "Claimed %r.", job, extra={"data": {"job": job.to_json()}}
-                    )
-                    if job.retry_count < job.max_retries:
-                        try:
-                            result = self.run_job(job)
-                            return (job, result, None)
-                        except Exception as e:
-                            self.handle_job_failure(job, e)
-                            raise e
-                    else:
-                        self.logger.error(
-                            f"Job {job.id} reached max retries, skipping."
-                        )
-                        return None
+            job = self.claim(exclude_ids=exclude_ids)
+            if job is None:
                 return None
+            try:
+                result = self.run_job(job)
+                return (job, result, None)
+            except Exception as e:
+                self.handle_job_failure(job, e)
+                raise e
         except Exception as e:
             return (job, None, e)
 
+    def release(self, job: BaseJobWithRetry):
+        """Put a claimed job back in the queue as it was, when it could not be started."""
+        self.logger.debug("Released %r.", job, extra={"data": {"job": job.to_json()}})
+        job.save(force_insert=True)
+
     def handle_job_failure(self, job: BaseJobWithRetry, exception: Exception):
         job.retry_count += 1
+        if job.retry_count >= job.max_retries:
+            self.logger.error(f"Job {job.id} failed after max retries: {exception}")
+            return
+        backoff = min(RETRY_BACKOFF * 2 ** (job.retry_count - 1), MAX_RETRY_BACKOFF)
         self.logger.warning(
-            f"Job {job.id} failed: {exception}, retrying {job.retry_count}/{job.max_retries}"
+            f"Job {job.id} failed: {exception}, retrying {job.retry_count}/{job.max_retries} in {backoff}s"
         )
-        if job.retry_count >= job.max_retries:
-            self.logger.error(f"Job {job.id} failed after max retries")
-        job.save()
+        job.execute_at = timezone.now() + timedelta(seconds=backoff)
+        # The job has been deleted from the queue when it was claimed
+        job.save(force_insert=True)
 
 
-class DatasetsFileMetadataQueue(AtMostOnceQueue):
-    job_model = DatasetFileMetadataJob
+class DatasetsFileMetadataQueue(AtMostLimitedAmountQueue):
+    def handle_job_failure(self, job: DatasetFileMetadataJob, exception: Exception):
+        super().handle_job_failure(job, exception)
+        if job.retry_count >= job.max_retries:
+            DatasetFileSample.objects.filter(
+                dataset_version_file_id=job.args["file_id"]
+            ).update(
+                status=DatasetFileSample.STATUS_FAILED,
+                status_reason=str(exception),
+            )
 
 
 dataset_file_metadata_queue = DatasetsFileMetadataQueue(
+    DatasetFileMetadataJob,
     tasks={
         "generate_file_metadata": lambda _, job: generate_file_metadata_task(
             job.args["file_id"]
@@ -310,3 +640,49 @@ dataset_file_metadata_queue = DatasetsFileMetadataQueue(
     },
     notify_channel="dataset_file_metadata_queue",
 )
+
+# Priority of the jobs enqueued in bulk by the backfill commands, so that the files uploaded in the meantime
+# (enqueued with the default priority of 0) are processed first
+BACKFILL_PRIORITY = -10
+
+
+def enqueue_file_metadata(
+    version_files: list[DatasetVersionFile], priority: int = 0
+) -> list[DatasetFileMetadataJob]:
+    """Same as `DatasetVersionFile.generate_metadata` for many files, with a constant number of queries."""
+    with transaction.atomic():
+        DatasetFileSample.objects.bulk_create(
+            [
+                DatasetFileSample(
+                    dataset_version_file=version_file,
+                    sample=[],
+                    columnar_sample=None,
+                    status=DatasetFileSample.STATUS_PROCESSING,
+                    status_reason=None,
+                )
+                for version_file in version_files
+                if is_file_supported(version_file.filename)
+            ],
+            update_conflicts=True,
+            unique_fields=["dataset_version_file"],
+            update_fields=[
+                "sample",
+                "columnar_sample",
+                "status",
+                "status_reason",
+                "updated_at",
+            ],
+        )
+        jobs = DatasetFileMetadataJob.objects.bulk_create(
+            [
+                DatasetFileMetadataJob(
+                    task="generate_file_metadata",
+                    args={"file_id": str(version_file.id)},
+                    priority=priority,
+                )
+                for version_file in version_files
+            ]
+        )
+        if jobs:
+            dataset_file_metadata_queue.notify()
+    return jobs
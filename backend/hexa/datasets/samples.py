@@ -0,0 +1,130 @@
+"""Columnar storage of the samples of dataset files.
+
+Samples are stored as an Arrow IPC stream, compressed when the codec is available: column names are stored once
+and values in typed arrays, and a range of rows or a subset of the columns can be read without decoding the
+values of the others to Python.
+"""
+
+import math
+import typing
+
+import pandas as pd
+import pyarrow as pa
+from django.core.serializers.json import DjangoJSONEncoder
+
+SKIPPED_BYTES = "<SKIPPED_BYTES>"
+
+SAMPLE_COMPRESSION = "zstd" if pa.Codec.is_available("zstd") else None
+
+_json_encoder = DjangoJSONEncoder()
+
+
+def json_safe(value: typing.Any) -> typing.Any:
+    """Recursively replace the values that can not be represented in JSON (NaN, infinity, bytes, dates...)."""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            # We are not supporting Infinity as numbers
+            return "inf" if value > 0 else "-inf"
+        return value
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, bytes):
+        return SKIPPED_BYTES
+    try:
+        return _json_encoder.default(value)
+    except TypeError:
+        return value
+
+
+def is_missing(value: typing.Any) -> bool:
+    return (
+        value is None
+        or value is pd.NA
+        or value is pd.NaT
+        or (isinstance(value, float) and math.isnan(value))
+    )
+
+
+def to_arrow_array(series: pd.Series) -> pa.Array:
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Columns mixing several types of values (e.g. numbers and strings) are stored as strings
+        return pa.array([None if is_missing(value) else str(value) for value in series])
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_arrays(
+        [to_arrow_array(df.iloc[:, position]) for position in range(len(df.columns))],
+        names=[str(column) for column in df.columns],
+    )
+
+
+def encode_sample(df: pd.DataFrame) -> bytes:
+    table = to_arrow_table(df)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=SAMPLE_COMPRESSION)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_sample(data: bytes | memoryview) -> pa.Table:
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+
+
+def to_json_values(column: pa.ChunkedArray) -> list:
+    if (
+        pa.types.is_string(column.type)
+        or pa.types.is_large_string(column.type)
+        or pa.types.is_integer(column.type)
+        or pa.types.is_boolean(column.type)
+        or pa.types.is_null(column.type)
+    ):
+        return column.to_pylist()
+    if (
+        pa.types.is_binary(column.type)
+        or pa.types.is_large_binary(column.type)
+        or pa.types.is_fixed_size_binary(column.type)
+    ):
+        return [
+            None if null else SKIPPED_BYTES for null in column.is_null().to_pylist()
+        ]
+    return [json_safe(value) for value in column.to_pylist()]
+
+
+def get_columns(
+    table: pa.Table,
+    offset: int = 0,
+    limit: int | None = None,
+    columns: list[str] | None = None,
+) -> list[dict]:
+    """Return the name, type and JSON values of the columns of a sample, for a range of its rows.
+
+    Only the requested columns are returned (in the requested order), unknown ones are ignored.
+    """
+    if columns is not None:
+        table = table.select(
+            [
+                table.column_names.index(column)
+                for column in columns
+                if column in table.column_names
+            ]
+        )
+    table = table.slice(offset, limit)
+    return [
+        {"name": field.name, "type": str(field.type), "values": to_json_values(column)}
+        for field, column in zip(table.schema, table.columns)
+    ]
+
+
+def get_records(table: pa.Table) -> list[dict]:
+    names = table.column_names
+    values = [to_json_values(column) for column in table.columns]
+    return [dict(zip(names, row)) for row in zip(*values)]
@@ -287,6 +287,7 @@ def resolve_create_version_file(_, info, **kwargs):
                     content_type=mutation_input["content_type"],
                 )
 
+            file.update_storage_properties()
             file.generate_metadata()
             return {
                 "success": True,
@@ -13,6 +13,7 @@ from hexa.datasets.models import (
     DatasetVersion,
     DatasetVersionFile,
 )
+from hexa.datasets.preview import get_preview
 from hexa.datasets.queue import is_file_supported
 from hexa.files import storage
 from hexa.workspaces.models import Workspace
@@ -23,6 +24,7 @@ dataset_permissions = ObjectType("DatasetPermissions")
 dataset_version_object = ObjectType("DatasetVersion")
 dataset_version_permissions = ObjectType("DatasetVersionPermissions")
 dataset_version_file_object = ObjectType("DatasetVersionFile")
+dataset_file_sample_object = ObjectType("DatasetFileSample")
 dataset_version_file_result_object = ObjectType("CreateDatasetVersionFileResult")
 dataset_link_object = ObjectType("DatasetLink")
 dataset_link_permissions = ObjectType("DatasetLinkPermissions")
@@ -233,6 +235,12 @@ def resolve_upload_url(obj, info, **kwargs):
         return None
 
 
+@dataset_version_file_object.field("size")
+def resolve_version_file_size(obj: DatasetVersionFile, info, **kwargs):
+    # The size is unknown until the file has been uploaded (or backfilled by the backfill_dataset_files command)
+    return obj.size or 0
+
+
 @dataset_version_file_object.field("fileSample")
 def resolve_version_file_metadata(obj: DatasetVersionFile, info, **kwargs):
     try:
@@ -245,6 +253,27 @@ def resolve_version_file_metadata(obj: DatasetVersionFile, info, **kwargs):
         return None
 
 
+@dataset_file_sample_object.field("sample")
+def resolve_file_sample_sample(obj: DatasetFileSample, info, **kwargs):
+    return obj.get_records()
+
+
+@dataset_file_sample_object.field("columns")
+def resolve_file_sample_columns(
+    obj: DatasetFileSample,
+    info,
+    offset: int = 0,
+    limit: int | None = None,
+    names: list[str] | None = None,
+    **kwargs,
+):
+    return obj.get_columns(
+        offset=max(offset, 0),
+        limit=None if limit is None else max(limit, 0),
+        columns=names,
+    )
+
+
 @dataset_version_file_object.field("downloadUrl")
 def resolve_version_file_download_url(
     obj: DatasetVersionFile, info, attachment: bool = True, **kwargs
@@ -254,6 +283,27 @@ def resolve_version_file_download_url(
         return generate_download_url(obj, force_attachment=attachment)
 
 
+@dataset_version_file_object.field("preview")
+def resolve_version_file_preview(
+    obj: DatasetVersionFile,
+    info,
+    offset: int = 0,
+    limit: int = 100,
+    columns: list[str] | None = None,
+    **kwargs,
+):
+    request: HttpRequest = info.context["request"]
+    if not request.user.has_perm(
+        "datasets.download_dataset_version", obj.dataset_version
+    ):
+        return None
+    try:
+        return get_preview(obj, offset=offset, limit=limit, columns=columns)
+    except Exception as e:
+        logging.exception(f"Preview of file {obj.id} failed", exc_info=e)
+        return None
+
+
 bindables = [
     dataset_object,
     dataset_permissions,
@@ -261,6 +311,7 @@ bindables = [
     dataset_version_permissions,
     dataset_link_permissions,
     dataset_version_file_object,
+    dataset_file_sample_object,
     dataset_version_file_result_object,
     dataset_link_object,
 ]
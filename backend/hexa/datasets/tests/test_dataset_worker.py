@@ -0,0 +1,167 @@
+import os
+import signal
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.utils import timezone
+
+from hexa.core.test import TestCase
+from hexa.datasets.management.commands.dataset_worker import Command, JobPool
+from hexa.datasets.models import (
+    Dataset,
+    DatasetFileMetadataJob,
+    DatasetFileSample,
+    DatasetVersionFile,
+)
+from hexa.datasets.queue import dataset_file_metadata_queue
+from hexa.user_management.models import User
+from hexa.workspaces.tests.testutils import create_workspace
+
+
+def run_fake_job(job):
+    if job.task == "fail":
+        raise ValueError("Failed")
+    if job.task == "crash":
+        os._exit(3)
+    if job.task == "sleep":
+        time.sleep(10)
+
+
+class JobPoolTest(TestCase):
+    def setUp(self):
+        # The pool closes the connection of the worker before forking, which would end the test transaction
+        close_all_patch = patch(
+            "hexa.datasets.management.commands.dataset_worker.db.connections.close_all"
+        )
+        close_all_patch.start()
+        self.addCleanup(close_all_patch.stop)
+
+    def run_pool(self, tasks, **kwargs):
+        jobs = [SimpleNamespace(id=i, task=task) for i, task in enumerate(tasks)]
+        queue = MagicMock()
+        queue.claim.side_effect = jobs + [None] * len(jobs)
+        queue.run_job.side_effect = run_fake_job
+        pool = JobPool(queue, **kwargs)
+        started_at = time.monotonic()
+        while pool.fill() or pool.running:
+            pool.reap()
+            time.sleep(0.1)
+        return queue, time.monotonic() - started_at
+
+    def test_runs_jobs_concurrently(self):
+        queue, duration = self.run_pool(["sleep"] * 3, workers=3, time_limit=1)
+
+        self.assertLess(duration, 3)
+        self.assertEqual(queue.handle_job_failure.call_count, 3)
+        for call in queue.handle_job_failure.call_args_list:
+            self.assertEqual(str(call.args[1]), "Time limit of 1s exceeded")
+
+    def test_failed_jobs_are_handed_back_to_the_queue(self):
+        queue, _ = self.run_pool(["ok", "fail", "crash", "ok"], workers=2)
+
+        self.assertEqual(
+            {
+                call.args[0].id: str(call.args[1])
+                for call in queue.handle_job_failure.call_args_list
+            },
+            {1: "Process exited with code 1", 2: "Process exited with code 3"},
+        )
+
+    def test_memory_limit(self):
+        queue, _ = self.run_pool(["sleep"], workers=1, memory_limit=1024)
+
+        (call,) = queue.handle_job_failure.call_args_list
+        self.assertIn("Memory limit of 1024 bytes exceeded", str(call.args[1]))
+
+    def test_job_not_started_is_released(self):
+        job = SimpleNamespace(id=1, task="ok")
+        queue = MagicMock()
+        queue.claim.side_effect = [job, None]
+        pool = JobPool(queue, workers=1)
+
+        with patch.object(pool.context, "Process") as process:
+            process.return_value.start.side_effect = OSError("Cannot fork")
+            with self.assertRaises(OSError):
+                pool.fill()
+
+        queue.release.assert_called_once_with(job)
+        self.assertEqual(pool.running, {})
+
+    def test_shutdown_signal_after_claim(self):
+        job = SimpleNamespace(id=1, task="ok")
+        queue = MagicMock()
+        queue.run_job.side_effect = run_fake_job
+
+        def claim():
+            if queue.claim.call_count > 1:
+                return None
+            os.kill(os.getpid(), signal.SIGTERM)
+            return job
+
+        queue.claim.side_effect = claim
+        command = Command()
+        command._shutdown = command._in_task = False
+        command.pool = JobPool(queue, workers=1)
+        previous_handler = signal.signal(signal.SIGTERM, command.handle_shutdown)
+        self.addCleanup(signal.signal, signal.SIGTERM, previous_handler)
+
+        with self.assertRaises(InterruptedError):
+            command.run_available_tasks()
+
+        # The claimed job was started before the worker stopped
+        self.assertEqual(list(command.pool.running), [job.id])
+        command.pool.shutdown()
+        queue.release.assert_not_called()
+        queue.handle_job_failure.assert_not_called()
+
+
+class DatasetsFileMetadataQueueTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER = User.objects.create_user(
+            "serena@bluesquarehub.com", "serena's password", is_superuser=True
+        )
+        workspace = create_workspace(cls.USER, name="My Workspace", description="")
+        dataset = Dataset.objects.create_if_has_perm(
+            cls.USER, workspace, name="Dataset", description=""
+        )
+        version = dataset.create_version(principal=cls.USER, name="v1")
+        cls.FILE = DatasetVersionFile.objects.create_if_has_perm(
+            cls.USER, version, uri="example.csv", content_type="text/csv"
+        )
+
+    def test_failed_job_is_retried_with_backoff(self):
+        self.FILE.generate_metadata()
+        job = dataset_file_metadata_queue.claim()
+        self.assertFalse(DatasetFileMetadataJob.objects.exists())
+
+        dataset_file_metadata_queue.handle_job_failure(job, Exception("Crashed"))
+
+        retried = DatasetFileMetadataJob.objects.get()
+        self.assertEqual(retried.id, job.id)
+        self.assertEqual(retried.retry_count, 1)
+        self.assertGreater(retried.execute_at, timezone.now())
+        self.assertIsNone(dataset_file_metadata_queue.claim())
+
+    def test_released_job_is_claimed_again(self):
+        self.FILE.generate_metadata()
+        job = dataset_file_metadata_queue.claim()
+
+        dataset_file_metadata_queue.release(job)
+
+        claimed = dataset_file_metadata_queue.claim()
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.retry_count, 0)
+
+    def test_sample_fails_after_max_retries(self):
+        self.FILE.generate_metadata()
+        job = dataset_file_metadata_queue.claim()
+        job.retry_count = job.max_retries - 1
+
+        dataset_file_metadata_queue.handle_job_failure(job, Exception("Crashed"))
+
+        self.assertFalse(DatasetFileMetadataJob.objects.exists())
+        sample = DatasetFileSample.objects.get(dataset_version_file=self.FILE)
+        self.assertEqual(sample.status, DatasetFileSample.STATUS_FAILED)
+        self.assertEqual(sample.status_reason, "Crashed")
@@ -1,9 +1,11 @@
 import hashlib
+import io
 import os
 from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.test import override_settings
 from pandas.errors import EmptyDataError
@@ -17,11 +19,16 @@ from hexa.datasets.models import (
 )
 from hexa.datasets.queue import (
     add_system_attributes,
+    enqueue_file_metadata,
+    generate_file_metadata_task,
     generate_profile,
     generate_sample,
     get_previous_version_file,
+    iter_df,
     load_df,
+    read_csv_metadata,
 )
+from hexa.datasets.samples import encode_sample
 from hexa.datasets.tests.fixtures.wkb_geometry_encoded import wkb_geometry
 from hexa.datasets.tests.testutils import DatasetTestMixin
 from hexa.files import storage
@@ -37,6 +44,14 @@ class TestDataframeJsonEncoder(TestCase):
         self.assertEqual(encoder.encode({"a": float("nan")}), '{"a": null}')
 
 
+def open_dummy_file(download_url: str):
+    """Open a file of the dummy storage from its mock download url."""
+    bucket_name, _, file_path = download_url.removeprefix(
+        "http://mockstorage.com/"
+    ).partition("/")
+    return storage.open_object(bucket_name, file_path)
+
+
 class TestCreateDatasetFileSampleTask(TestCase, DatasetTestMixin):
     @classmethod
     def setUpTestData(cls):
@@ -200,7 +215,7 @@ class TestCreateDatasetFileSampleTask(TestCase, DatasetTestMixin):
                     sample_entry = version_file.sample_entry
                     sample_entry.refresh_from_db()
                     self.assertEqual(sample_entry.status, expected_status)
-                    self.assertEqual(sample_entry.sample, expected_sample)
+                    self.assertEqual(sample_entry.get_records(), expected_sample)
 
                     if expected_status_reason:
                         self.assertEqual(
@@ -245,7 +260,7 @@ class TestCreateDatasetFileSampleTask(TestCase, DatasetTestMixin):
                     sample_entry = version_file.sample_entry
                     sample_entry.refresh_from_db()
                     self.assertEqual(sample_entry.status, expected_status)
-                    self.assertEqual(sample_entry.sample, expected_sample)
+                    self.assertEqual(sample_entry.get_records(), expected_sample)
 
                     if expected_status_reason:
                         self.assertEqual(
@@ -272,6 +287,242 @@ class TestCreateDatasetFileSampleTask(TestCase, DatasetTestMixin):
             with self.assertRaises(EmptyDataError):
                 load_df(version_file)
 
+    def test_iter_df(self):
+        for fixture_name in [
+            "example_names_with_age.csv",
+            "example_with_wkb_geometry.parquet",
+        ]:
+            with self.subTest(fixture_name=fixture_name):
+                fixture_file_path = os.path.join(
+                    os.path.dirname(__file__), "fixtures", fixture_name
+                )
+                version_file = DatasetVersionFile.objects.create_if_has_perm(
+                    self.USER_SERENA,
+                    self.DATASET_VERSION,
+                    uri=fixture_file_path,
+                    content_type="application/octet-stream",
+                )
+
+                with (
+                    patch(
+                        "hexa.datasets.queue.generate_download_url",
+                        return_value=fixture_file_path,
+                    ),
+                    patch("hexa.datasets.queue.PROBE_ROWS", 2),
+                ):
+                    df = load_df(version_file)
+                    chunks = list(iter_df(version_file, memory_limit=1))
+
+                self.assertGreater(len(chunks), 1)
+                pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+
+    @override_settings(
+        WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE=2,
+        WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT=1,
+    )
+    def test_generate_file_metadata_task_by_chunks(self):
+        fixture_file_path = os.path.join(
+            os.path.dirname(__file__), "fixtures", "example_names_with_age.csv"
+        )
+        version_file = DatasetVersionFile.objects.create_if_has_perm(
+            self.USER_SERENA,
+            self.DATASET_VERSION,
+            uri=fixture_file_path,
+            content_type="text/csv",
+        )
+
+        with (
+            patch(
+                "hexa.datasets.queue.generate_download_url",
+                return_value=fixture_file_path,
+            ),
+            patch("hexa.datasets.queue.PROBE_ROWS", 2),
+        ):
+            generate_file_metadata_task(version_file.id)
+
+        df = pd.read_csv(fixture_file_path)
+        version_file.refresh_from_db()
+        self.assertEqual(version_file.rows, len(df.index))
+        self.assertEqual(
+            version_file.sample_entry.get_records(),
+            df.head(2).to_dict(orient="records"),
+        )
+        self.assertEqual(
+            list(version_file.properties["columns"].values()), list(df.columns)
+        )
+        for column_name in df.columns:
+            hashed_column_name = hashlib.md5(column_name.encode()).hexdigest()
+            self.assertEqual(
+                version_file.attributes.get(key=f"{hashed_column_name}.count").value,
+                df[column_name].count(),
+            )
+
+    @override_settings(WORKSPACE_DATASETS_METADATA_MEMORY_LIMIT=1)
+    def test_generate_file_metadata_task_falls_back_to_pandas(self):
+        storage.create_bucket(settings.WORKSPACE_DATASETS_BUCKET)
+        # The values of the last block do not match the type inferred from the first one
+        content = b"value\n" + b"1\n" * 100 + b"a\n"
+        storage.save_object(
+            settings.WORKSPACE_DATASETS_BUCKET, "values.csv", io.BytesIO(content)
+        )
+        version_file = DatasetVersionFile.objects.create_if_has_perm(
+            self.USER_SERENA,
+            self.DATASET_VERSION,
+            uri="values.csv",
+            content_type="text/csv",
+        )
+
+        with (
+            patch("hexa.datasets.queue.open_file", open_dummy_file),
+            patch("hexa.datasets.queue.CSV_MIN_BLOCK_SIZE", 64),
+            patch(
+                "hexa.datasets.queue.read_csv_metadata",
+                wraps=read_csv_metadata,
+            ) as mock_read_csv_metadata,
+        ):
+            generate_file_metadata_task(version_file.id)
+
+        mock_read_csv_metadata.assert_called_once()
+        version_file.refresh_from_db()
+        self.assertEqual(version_file.rows, 101)
+        hashed_column_name = hashlib.md5(b"value").hexdigest()
+        self.assertEqual(
+            version_file.attributes.get(key=f"{hashed_column_name}.data_type").value,
+            "string",
+        )
+        self.assertEqual(
+            version_file.attributes.get(
+                key=f"{hashed_column_name}.unique_values"
+            ).value,
+            2,
+        )
+
+    @override_settings(
+        WORKSPACE_DATASETS_FILE_SNAPSHOT_SIZE=2,
+        WORKSPACE_DATASETS_PARQUET_FOOTER_PROFILING_MIN_ROWS=0,
+    )
+    def test_generate_file_metadata_task_from_parquet_footer(self):
+        fixture_file_path = os.path.join(
+            os.path.dirname(__file__), "fixtures", "example_with_wkb_geometry.parquet"
+        )
+        storage.create_bucket(settings.WORKSPACE_DATASETS_BUCKET)
+        with open(fixture_file_path, "rb") as file:
+            storage.save_object(
+                settings.WORKSPACE_DATASETS_BUCKET, "countries.parquet", file
+            )
+        version_file = DatasetVersionFile.objects.create_if_has_perm(
+            self.USER_SERENA,
+            self.DATASET_VERSION,
+            uri="countries.parquet",
+            content_type="application/vnd.apache.parquet",
+        )
+
+        with patch(
+            "hexa.datasets.queue.generate_download_url"
+        ) as mock_generate_download_url:
+            generate_file_metadata_task(version_file.id)
+        mock_generate_download_url.assert_not_called()
+
+        df = pd.read_parquet(fixture_file_path)
+        version_file.refresh_from_db()
+        self.assertEqual(version_file.rows, len(df.index))
+        self.assertEqual(
+            version_file.sample_entry.status, DatasetFileSample.STATUS_FINISHED
+        )
+        self.assertEqual(len(version_file.sample_entry.get_records()), 2)
+        hashed_column_name = hashlib.md5(b"pop_est").hexdigest()
+        self.assertEqual(
+            version_file.attributes.get(key=f"{hashed_column_name}.maximum").value,
+            df["pop_est"].max(),
+        )
+        self.assertFalse(
+            version_file.attributes.filter(
+                key=f"{hashed_column_name}.unique_values"
+            ).exists()
+        )
+
+    def test_generate_file_metadata_task_copies_unchanged_file(self):
+        storage.create_bucket(settings.WORKSPACE_DATASETS_BUCKET)
+        content = b"name,surname\nJoe,Doe\nLiam,Smith\n"
+        files = []
+        for version in [
+            self.DATASET_VERSION,
+            self.DATASET.create_version(principal=self.USER_SERENA, name="v2"),
+        ]:
+            uri = version.get_full_uri("names.csv")
+            storage.save_object(
+                settings.WORKSPACE_DATASETS_BUCKET, uri, io.BytesIO(content)
+            )
+            files.append(
+                DatasetVersionFile.objects.create_if_has_perm(
+                    self.USER_SERENA, version, uri=uri, content_type="text/csv"
+                )
+            )
+        prev_file, version_file = files
+        with patch("hexa.datasets.queue.open_file", open_dummy_file):
+            generate_file_metadata_task(prev_file.id)
+        prev_file.update_or_create_attribute(key="owner", value="Serena")
+
+        with patch("hexa.datasets.queue.read_metadata") as mock_read_metadata:
+            generate_file_metadata_task(version_file.id)
+        mock_read_metadata.assert_not_called()
+
+        prev_file.refresh_from_db()
+        version_file.refresh_from_db()
+        self.assertEqual(version_file.checksum, prev_file.checksum)
+        self.assertEqual(version_file.rows, 2)
+        self.assertEqual(version_file.properties, prev_file.properties)
+        self.assertEqual(
+            version_file.sample_entry.status, DatasetFileSample.STATUS_FINISHED
+        )
+        self.assertEqual(
+            version_file.sample_entry.get_records(),
+            prev_file.sample_entry.get_records(),
+        )
+        self.assertEqual(
+            sorted(version_file.attributes.values_list("key", "value", "system")),
+            sorted(prev_file.attributes.values_list("key", "value", "system")),
+        )
+
+    def test_generate_file_metadata_task_profiles_changed_file(self):
+        storage.create_bucket(settings.WORKSPACE_DATASETS_BUCKET)
+        files = []
+        for version, content in [
+            (self.DATASET_VERSION, b"name,surname\nJoe,Doe\nLiam,Smith\n"),
+            (
+                self.DATASET.create_version(principal=self.USER_SERENA, name="v2"),
+                b"name,surname\nJoe,Doe\nEmma,Smith\n",
+            ),
+        ]:
+            uri = version.get_full_uri("names.csv")
+            storage.save_object(
+                settings.WORKSPACE_DATASETS_BUCKET, uri, io.BytesIO(content)
+            )
+            files.append(
+                DatasetVersionFile.objects.create_if_has_perm(
+                    self.USER_SERENA, version, uri=uri, content_type="text/csv"
+                )
+            )
+        prev_file, version_file = files
+        # Files of the same size are compared by checksum, computed when the storage does not provide it
+        DatasetVersionFile.objects.filter(id=prev_file.id).update(checksum=None)
+        with patch("hexa.datasets.queue.open_file", open_dummy_file):
+            generate_file_metadata_task(prev_file.id)
+            generate_file_metadata_task(version_file.id)
+
+        prev_file.refresh_from_db()
+        version_file.refresh_from_db()
+        self.assertEqual(version_file.size, prev_file.size)
+        self.assertEqual(
+            prev_file.checksum,
+            hashlib.md5(b"name,surname\nJoe,Doe\nLiam,Smith\n").hexdigest(),
+        )
+        self.assertNotEqual(version_file.checksum, prev_file.checksum)
+        self.assertEqual(
+            version_file.sample_entry.get_records(),
+            [{"name": "Joe", "surname": "Doe"}, {"name": "Emma", "surname": "Smith"}],
+        )
+
     def test_generate_metadata_pre_creates_processing_row_for_supported_file(self):
         version_file = DatasetVersionFile.objects.create_if_has_perm(
             self.USER_SERENA,
@@ -291,6 +542,47 @@ class TestCreateDatasetFileSampleTask(TestCase, DatasetTestMixin):
         self.assertEqual(sample.sample, [])
         self.assertIsNone(sample.status_reason)
 
+    def test_generate_metadata_clears_previous_sample(self):
+        version_file = DatasetVersionFile.objects.create_if_has_perm(
+            self.USER_SERENA,
+            self.DATASET_VERSION,
+            uri="example.csv",
+            content_type="text/csv",
+        )
+        DatasetFileSample.objects.create(
+            dataset_version_file=version_file,
+            columnar_sample=encode_sample(pd.DataFrame({"name": ["Joe"]})),
+            status=DatasetFileSample.STATUS_FINISHED,
+        )
+
+        with patch("hexa.datasets.queue.dataset_file_metadata_queue.enqueue"):
+            version_file.generate_metadata()
+
+        sample = DatasetFileSample.objects.get(dataset_version_file=version_file)
+        self.assertEqual(sample.status, DatasetFileSample.STATUS_PROCESSING)
+        self.assertIsNone(sample.columnar_sample)
+        self.assertEqual(sample.get_records(), [])
+
+    def test_enqueue_file_metadata_clears_previous_sample(self):
+        version_file = DatasetVersionFile.objects.create_if_has_perm(
+            self.USER_SERENA,
+            self.DATASET_VERSION,
+            uri="example.csv",
+            content_type="text/csv",
+        )
+        DatasetFileSample.objects.create(
+            dataset_version_file=version_file,
+            columnar_sample=encode_sample(pd.DataFrame({"name": ["Joe"]})),
+            status=DatasetFileSample.STATUS_FINISHED,
+        )
+
+        enqueue_file_metadata([version_file])
+
+        sample = DatasetFileSample.objects.get(dataset_version_file=version_file)
+        self.assertEqual(sample.status, DatasetFileSample.STATUS_PROCESSING)
+        self.assertIsNone(sample.columnar_sample)
+        self.assertEqual(sample.get_records(), [])
+
     def test_generate_metadata_skips_row_for_unsupported_file(self):
         version_file = DatasetVersionFile.objects.create_if_has_perm(
             self.USER_SERENA,
@@ -1,17 +1,23 @@
+import hashlib
+import io
 from unittest.mock import MagicMock, patch
 
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
+from django.core.management import call_command
 from django.test import override_settings
 from django.utils.crypto import get_random_string
 
 from hexa.core.test import TestCase
 from hexa.datasets.models import (
     Dataset,
+    DatasetFileMetadataJob,
+    DatasetFileSample,
     DatasetLink,
     DatasetVersion,
     DatasetVersionFile,
 )
+from hexa.datasets.queue import BACKFILL_PRIORITY
 from hexa.files import storage
 from hexa.pipelines.authentication import PipelineRunUser
 from hexa.pipelines.models import Pipeline, PipelineRun
@@ -264,6 +270,90 @@ class DatasetVersionTest(BaseTestMixin, TestCase):
             f"{version.dataset.id}/{version.id}/file.txt",
         )
 
+    def test_update_storage_properties(self):
+        version = self.test_create_dataset_version()
+        file = DatasetVersionFile.objects.create(
+            dataset_version=version,
+            uri=version.get_full_uri("file.txt"),
+            created_by=self.USER_ADMIN,
+            content_type="text/plain",
+        )
+        self.assertFalse(file.update_storage_properties())
+
+        storage.save_object(
+            settings.WORKSPACE_DATASETS_BUCKET, file.uri, io.BytesIO(b"content")
+        )
+        self.assertTrue(file.update_storage_properties())
+        file.refresh_from_db()
+        self.assertEqual(file.size, 7)
+        self.assertEqual(file.checksum, hashlib.md5(b"content").hexdigest())
+
+    def test_backfill_dataset_files(self):
+        version = self.test_create_dataset_version()
+        uploaded, missing = (
+            DatasetVersionFile.objects.create(
+                dataset_version=version,
+                uri=version.get_full_uri(name),
+                created_by=self.USER_ADMIN,
+                content_type="text/plain",
+            )
+            for name in ["uploaded.txt", "missing.txt"]
+        )
+        storage.save_object(
+            settings.WORKSPACE_DATASETS_BUCKET, uploaded.uri, io.BytesIO(b"content")
+        )
+
+        out = io.StringIO()
+        call_command("backfill_dataset_files", stdout=out)
+
+        self.assertIn("1 files updated, 1 files not found", out.getvalue())
+        uploaded.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertEqual(uploaded.size, 7)
+        self.assertIsNone(missing.size)
+
+    def test_update_dataset_samples(self):
+        version = self.test_create_dataset_version()
+        processed, missing, unsupported = (
+            DatasetVersionFile.objects.create(
+                dataset_version=version,
+                uri=version.get_full_uri(name),
+                created_by=self.USER_ADMIN,
+                content_type="text/csv",
+            )
+            for name in ["processed.csv", "missing.csv", "unsupported.txt"]
+        )
+        DatasetFileSample.objects.create(
+            dataset_version_file=processed, status=DatasetFileSample.STATUS_FINISHED
+        )
+
+        out = io.StringIO()
+        call_command(
+            "update_dataset_samples",
+            "--only-missing",
+            "--workspace",
+            self.WORKSPACE.slug,
+            "--batch-size",
+            "1",
+            stdout=out,
+        )
+
+        self.assertIn("2/2 files read, 1 enqueued", out.getvalue())
+        job = DatasetFileMetadataJob.objects.get()
+        self.assertEqual(job.args, {"file_id": str(missing.id)})
+        self.assertEqual(job.priority, BACKFILL_PRIORITY)
+        self.assertEqual(
+            DatasetFileSample.objects.get(dataset_version_file=missing).status,
+            DatasetFileSample.STATUS_PROCESSING,
+        )
+
+        call_command("update_dataset_samples", "--workspace", "other", stdout=out)
+        call_command("update_dataset_samples", "--since", "2100-01-01", stdout=out)
+        self.assertEqual(DatasetFileMetadataJob.objects.count(), 1)
+
+        call_command("update_dataset_samples", stdout=out)
+        self.assertEqual(DatasetFileMetadataJob.objects.count(), 4)
+
 
 @override_settings(WORKSPACE_DATASETS_BUCKET="hexa-datasets-bucket")
 class DatasetLinkTest(BaseTestMixin, TestCase):
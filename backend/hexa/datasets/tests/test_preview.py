@@ -0,0 +1,85 @@
+import io
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from hexa.datasets.preview import (
+    PREVIEW_MAX_CSV_OFFSET,
+    get_preview,
+    read_csv_window,
+)
+
+
+class CsvStream(io.RawIOBase):
+    """CSV file of `rows` rows generated while it is read, so that only the reader holds rows in memory."""
+
+    def __init__(self, rows: int):
+        self.blocks = (
+            "".join(
+                f"{i},name {i}\n" for i in range(start, min(start + 1000, rows))
+            ).encode()
+            for start in range(0, rows, 1000)
+        )
+        self.buffer = b"id,name\n"
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.buffer:
+            self.buffer = next(self.blocks, b"")
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+class ReadCsvWindowTest(SimpleTestCase):
+    def test_large_offset_memory_is_bounded(self):
+        offset = 200_000
+        file = io.BufferedReader(CsvStream(offset + 10))
+
+        tracemalloc.start()
+        try:
+            table = read_csv_window(file, None, offset, 3)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(table.column("id").to_pylist(), [200_000, 200_001, 200_002])
+        # The skipped rows are not held in memory (a set of their numbers alone takes more than 10MB)
+        self.assertLess(peak, 5 * 1024 * 1024)
+
+
+class GetCsvPreviewTest(SimpleTestCase):
+    def get_preview(self, rows: int | None, **kwargs):
+        version_file = SimpleNamespace(filename="data.csv", rows=rows)
+        with patch(
+            "hexa.datasets.preview.open_version_file",
+            side_effect=lambda _: io.BufferedReader(CsvStream(250)),
+        ):
+            return get_preview(version_file, **kwargs)
+
+    def test_offset_past_known_rows(self):
+        preview = self.get_preview(250, offset=10_000_000, limit=10)
+
+        self.assertEqual(preview["total_rows"], 250)
+        self.assertEqual(
+            [(column["name"], column["values"]) for column in preview["columns"]],
+            [("id", []), ("name", [])],
+        )
+
+    def test_offset_over_maximum(self):
+        with self.assertRaises(ValueError):
+            self.get_preview(None, offset=PREVIEW_MAX_CSV_OFFSET + 1)
+
+    def test_window(self):
+        preview = self.get_preview(None, offset=248, limit=10, columns=["name"])
+
+        self.assertEqual(preview["total_rows"], None)
+        self.assertEqual(
+            [(column["name"], column["values"]) for column in preview["columns"]],
+            [("name", ["name 248", "name 249"])],
+        )
@@ -0,0 +1,237 @@
+import io
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from hexa.datasets.profiling import (
+    ArrowProfiler,
+    DataFrameProfiler,
+    HyperLogLog,
+    TDigest,
+    hash_values,
+    profile_dataframe,
+    profile_parquet_metadata,
+    profile_table,
+)
+
+
+class ProfilingTest(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.df = pd.DataFrame(
+            {
+                "id": np.arange(100_000),
+                "category": rng.integers(0, 500, 100_000).astype(str).astype(object),
+                "value": rng.normal(10, 2, 100_000),
+            }
+        )
+
+    def test_hyperloglog(self):
+        for cardinality in [0, 10, 1_000, 100_000]:
+            with self.subTest(cardinality=cardinality):
+                hashes = hash_values(pd.Series(np.arange(cardinality)))
+                estimate = HyperLogLog().update(hashes).count()
+                self.assertAlmostEqual(estimate, cardinality, delta=cardinality * 0.03)
+
+    def test_hyperloglog_merge(self):
+        left = HyperLogLog().update(hash_values(pd.Series(np.arange(0, 6_000))))
+        right = HyperLogLog().update(hash_values(pd.Series(np.arange(4_000, 10_000))))
+        self.assertAlmostEqual(left.merge(right).count(), 10_000, delta=300)
+
+    def test_tdigest(self):
+        values = self.df["value"].to_numpy()
+        digest = TDigest()
+        for chunk in np.array_split(values, 10):
+            digest.update(chunk)
+        self.assertLessEqual(len(digest.means), 200)
+        np.testing.assert_allclose(
+            digest.quantile([0, 0.25, 0.5, 0.75, 1]),
+            np.quantile(values, [0, 0.25, 0.5, 0.75, 1]),
+            atol=0.01,
+        )
+
+    def test_approximate_profile(self):
+        exact = profile_dataframe(self.df)
+        approximate = profile_dataframe(self.df, approximate=True)
+
+        for exact_column, approximate_column in zip(exact, approximate):
+            for key, value in exact_column.items():
+                with self.subTest(column=exact_column["column_name"], key=key):
+                    if key in ["unique_values", "distinct_values"]:
+                        self.assertAlmostEqual(
+                            approximate_column[key], value, delta=value * 0.03
+                        )
+                    elif key in ["quantiles25", "median", "quantiles75"]:
+                        self.assertAlmostEqual(
+                            approximate_column[key], value, delta=abs(value) * 0.01
+                        )
+                    else:
+                        self.assertEqual(approximate_column[key], value)
+
+    def test_profile_keeps_unhashable_columns(self):
+        df = pd.DataFrame(
+            {"tags": [["a"], ["b"], ["a"], None], "raw": [b"x", b"y", b"x", b"x"]}
+        )
+        self.assertEqual(
+            [
+                (column["column_name"], column["count"], column["unique_values"])
+                for column in profile_dataframe(df)
+            ],
+            [("tags", 3, 2), ("raw", 4, 2)],
+        )
+
+    def test_chunked_profile(self):
+        profiler = DataFrameProfiler()
+        for start in range(0, 100_000, 15_000):
+            profiler.update(self.df.iloc[start : start + 15_000])
+        exact = profile_dataframe(self.df)
+        chunked = profiler.profile()
+
+        self.assertEqual(profiler.rows, 100_000)
+        for exact_column, chunked_column in zip(exact, chunked):
+            for key, value in exact_column.items():
+                with self.subTest(column=exact_column["column_name"], key=key):
+                    if key in ["unique_values", "distinct_values"]:
+                        self.assertAlmostEqual(
+                            chunked_column[key], value, delta=value * 0.03
+                        )
+                    elif isinstance(value, float):
+                        self.assertAlmostEqual(
+                            chunked_column[key], value, delta=abs(value) * 0.01
+                        )
+                    else:
+                        self.assertEqual(chunked_column[key], value)
+
+    def test_chunked_profile_with_changing_types(self):
+        profiler = DataFrameProfiler()
+        profiler.update(pd.DataFrame({"value": [1, 2, 3], "label": [1, 2, 2]}))
+        profiler.update(pd.DataFrame({"value": [4.5, None], "label": ["a", "b"]}))
+        value, label = profiler.profile()
+
+        self.assertEqual(
+            {key: value[key] for key in ["data_type", "count", "unique_values"]},
+            {"data_type": "float64", "count": 4, "unique_values": 4},
+        )
+        self.assertEqual(value["maximum"], 4.5)
+        self.assertEqual(label["data_type"], "string")
+        self.assertNotIn("mean", label)
+
+    def test_chunked_profile_of_large_integers(self):
+        values = 2**60 + np.arange(200_000, dtype=np.int64) * 7
+        profiler = DataFrameProfiler()
+        for chunk in np.array_split(values, 4):
+            profiler.update(pd.DataFrame({"id": chunk}))
+        (profile,) = profiler.profile()
+
+        self.assertAlmostEqual(profile["unique_values"], 200_000, delta=200_000 * 0.03)
+        self.assertFalse(profile["constant_values"])
+        self.assertEqual(profile["minimum"], int(values[0]))
+        self.assertEqual(profile["maximum"], int(values[-1]))
+
+    def test_single_chunk_profile(self):
+        profiler = DataFrameProfiler()
+        profiler.update(self.df)
+        self.assertEqual(profiler.profile(), profile_dataframe(self.df))
+        self.assertEqual(DataFrameProfiler().profile(), [])
+
+    def test_arrow_profile(self):
+        df = self.df.assign(
+            value=self.df["value"].where(self.df["id"] % 10 > 0),
+            extremum=np.where(self.df["id"] % 2, np.inf, 1.5),
+        )
+        df.loc[3, "category"] = None
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        exact = profile_dataframe(df)
+        arrow = profile_table(table)
+
+        self.assertEqual(
+            [column.keys() for column in arrow], [column.keys() for column in exact]
+        )
+        for exact_column, arrow_column in zip(exact, arrow):
+            for key, value in exact_column.items():
+                with self.subTest(column=exact_column["column_name"], key=key):
+                    # Sums are not computed in the same order
+                    self.assertAlmostEqual(arrow_column[key], value, places=9)
+
+    def test_chunked_arrow_profile(self):
+        table = pa.Table.from_pandas(self.df, preserve_index=False)
+        profiler = ArrowProfiler()
+        for batch in table.to_batches(max_chunksize=15_000):
+            profiler.update(batch)
+        exact = profile_dataframe(self.df)
+        chunked = profiler.profile()
+
+        self.assertEqual(profiler.rows, 100_000)
+        for exact_column, chunked_column in zip(exact, chunked):
+            for key, value in exact_column.items():
+                with self.subTest(column=exact_column["column_name"], key=key):
+                    if key in ["unique_values", "distinct_values"]:
+                        self.assertAlmostEqual(
+                            chunked_column[key], value, delta=value * 0.03
+                        )
+                    elif isinstance(value, float):
+                        self.assertAlmostEqual(
+                            chunked_column[key], value, delta=abs(value) * 0.01
+                        )
+                    else:
+                        self.assertEqual(chunked_column[key], value)
+
+    def test_arrow_profile_of_large_integers(self):
+        df = pd.DataFrame({"id": 2**60 + np.arange(200_000, dtype=np.int64) * 7})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        profiler = ArrowProfiler()
+        for batch in table.to_batches(max_chunksize=50_000):
+            profiler.update(batch)
+        exact = profile_dataframe(df)
+
+        for profile in [profile_table(table, approximate=True), profiler.profile()]:
+            (column,) = profile
+            self.assertAlmostEqual(
+                column["unique_values"], 200_000, delta=200_000 * 0.03
+            )
+            self.assertFalse(column["constant_values"])
+            self.assertEqual(column["minimum"], exact[0]["minimum"])
+            self.assertEqual(column["maximum"], exact[0]["maximum"])
+            self.assertAlmostEqual(
+                column["median"], exact[0]["median"], delta=exact[0]["median"] * 0.01
+            )
+
+    def test_arrow_profile_of_nested_and_dictionary_columns(self):
+        table = pa.table(
+            {
+                "tags": [["a"], ["b"], ["a"], None],
+                "label": pa.array(["x", "y", "x", None]).dictionary_encode(),
+            }
+        )
+        self.assertEqual(profile_table(table), profile_dataframe(table.to_pandas()))
+
+    def test_parquet_metadata_profile(self):
+        df = self.df.assign(
+            value=self.df["value"].where(self.df["id"] % 10 > 0),
+            tags=[["a"]] * len(self.df.index),
+        )
+        file = io.BytesIO()
+        df.to_parquet(file, row_group_size=30_000)
+        profiles = profile_parquet_metadata(pq.ParquetFile(file).metadata)
+        exact = {profile["column_name"]: profile for profile in profile_dataframe(df)}
+
+        self.assertEqual(
+            [profile["column_name"] for profile in profiles],
+            ["id", "category", "value", "tags"],
+        )
+        for profile in profiles:
+            with self.subTest(column=profile["column_name"]):
+                self.assertLessEqual(
+                    profile.keys(), exact[profile["column_name"]].keys()
+                )
+                for key, value in profile.items():
+                    self.assertEqual(value, exact[profile["column_name"]][key])
+        id_column, category, value, tags = profiles
+        self.assertEqual(id_column["maximum"], 99_999)
+        self.assertEqual(value["missing_values"], 10_000)
+        self.assertNotIn("minimum", category)
+        # List columns have no statistics of their own
+        self.assertEqual(tags, {"column_name": "tags", "data_type": "string"})
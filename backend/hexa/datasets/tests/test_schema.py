@@ -3,6 +3,7 @@ from datetime import timedelta
 from io import BytesIO
 from unittest.mock import patch
 
+import pandas as pd
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError
@@ -29,6 +30,7 @@ from ..models import (
     DatasetVersion,
     DatasetVersionFile,
 )
+from ..samples import encode_sample
 from .testutils import DatasetTestMixin
 
 
@@ -224,6 +226,9 @@ class DatasetTest(GraphQLTestCase, DatasetTestMixin):
         full_uri = version.get_full_uri("data.csv")
         blob = storage.get_bucket_object(settings.WORKSPACE_DATASETS_BUCKET, full_uri)
         self.assertIsNotNone(blob)
+        file = version.get_file_by_name("data.csv")
+        self.assertEqual(file.size, 7)
+        self.assertEqual(file.checksum, blob.checksum)
 
     def test_update_dataset(self):
         superuser = self.create_user("superuser@blsq.com", is_superuser=True)
@@ -749,6 +754,149 @@ class DatasetVersionTest(GraphQLTestCase, DatasetTestMixin):
             r["data"],
         )
 
+    def test_get_file_sample_columns(self):
+        self.test_create_dataset_version()
+        superuser = User.objects.get(email="superuser@blsq.com")
+        dataset = Dataset.objects.get(name="Dataset")
+        self.client.force_login(superuser)
+        file = DatasetVersionFile.objects.create(
+            dataset_version=dataset.latest_version,
+            uri=dataset.latest_version.get_full_uri("file.csv"),
+            created_by=superuser,
+        )
+        DatasetFileSample.objects.create(
+            dataset_version_file=file,
+            columnar_sample=encode_sample(
+                pd.DataFrame(
+                    {
+                        "name": ["Joe", "Liam", "Emma"],
+                        "age": [10.0, float("nan"), float("inf")],
+                        "geometry": [b"\x01", b"\x02", None],
+                    }
+                )
+            ),
+            status=DatasetFileSample.STATUS_FINISHED,
+        )
+        query = """
+            query GetDatasetVersionFile($id: ID!, $offset: Int, $limit: Int, $names: [String!]) {
+              datasetVersionFile(id: $id) {
+                fileSample {
+                  sample
+                  columns(offset: $offset, limit: $limit, names: $names) {
+                    name
+                    type
+                    values
+                  }
+                }
+              }
+            }
+        """
+
+        r = self.run_query(query, {"id": str(file.id)})
+        self.assertEqual(
+            r["data"]["datasetVersionFile"]["fileSample"],
+            {
+                "sample": [
+                    {"name": "Joe", "age": 10.0, "geometry": "<SKIPPED_BYTES>"},
+                    {"name": "Liam", "age": None, "geometry": "<SKIPPED_BYTES>"},
+                    {"name": "Emma", "age": "inf", "geometry": None},
+                ],
+                "columns": [
+                    {
+                        "name": "name",
+                        "type": "string",
+                        "values": ["Joe", "Liam", "Emma"],
+                    },
+                    {"name": "age", "type": "double", "values": [10.0, None, "inf"]},
+                    {
+                        "name": "geometry",
+                        "type": "binary",
+                        "values": ["<SKIPPED_BYTES>", "<SKIPPED_BYTES>", None],
+                    },
+                ],
+            },
+        )
+
+        r = self.run_query(
+            query,
+            {"id": str(file.id), "offset": 1, "limit": 1, "names": ["age", "name"]},
+        )
+        self.assertEqual(
+            r["data"]["datasetVersionFile"]["fileSample"]["columns"],
+            [
+                {"name": "age", "type": "double", "values": [None]},
+                {"name": "name", "type": "string", "values": ["Liam"]},
+            ],
+        )
+
+    def test_get_file_preview(self):
+        self.test_create_dataset_version()
+        superuser = User.objects.get(email="superuser@blsq.com")
+        dataset = Dataset.objects.get(name="Dataset")
+        self.client.force_login(superuser)
+        df = pd.DataFrame({"id": range(250), "name": [f"name {i}" for i in range(250)]})
+        parquet = BytesIO()
+        df.to_parquet(parquet, row_group_size=100)
+        files = {}
+        for filename, content in [
+            ("data.parquet", parquet.getvalue()),
+            ("data.csv", df.to_csv(index=False).encode()),
+        ]:
+            files[filename] = DatasetVersionFile.objects.create(
+                dataset_version=dataset.latest_version,
+                uri=dataset.latest_version.get_full_uri(filename),
+                created_by=superuser,
+            )
+            storage.save_object(
+                settings.WORKSPACE_DATASETS_BUCKET,
+                files[filename].uri,
+                BytesIO(content),
+            )
+        query = """
+            query GetDatasetVersionFilePreview($id: ID!, $offset: Int, $limit: Int, $columns: [String!]) {
+              datasetVersionFile(id: $id) {
+                preview(offset: $offset, limit: $limit, columns: $columns) {
+                  totalRows
+                  columns {
+                    name
+                    values
+                  }
+                }
+              }
+            }
+        """
+
+        r = self.run_query(
+            query, {"id": str(files["data.parquet"].id), "offset": 98, "limit": 3}
+        )
+        self.assertEqual(
+            r["data"]["datasetVersionFile"]["preview"],
+            {
+                "totalRows": 250,
+                "columns": [
+                    {"name": "id", "values": [98, 99, 100]},
+                    {"name": "name", "values": ["name 98", "name 99", "name 100"]},
+                ],
+            },
+        )
+
+        r = self.run_query(
+            query,
+            {
+                "id": str(files["data.csv"].id),
+                "offset": 248,
+                "limit": 10,
+                "columns": ["name"],
+            },
+        )
+        self.assertEqual(
+            r["data"]["datasetVersionFile"]["preview"],
+            {
+                "totalRows": None,
+                "columns": [{"name": "name", "values": ["name 248", "name 249"]}],
+            },
+        )
+
     def test_get_file_sample_no_row_unsupported_file(self):
         self.test_create_dataset_version()
         superuser = User.objects.get(email="superuser@blsq.com")
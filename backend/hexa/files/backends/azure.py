@@ -16,7 +16,13 @@ from azure.storage.blob import (
     generate_container_sas,
 )
 
-from .base import ObjectsPage, Storage, StorageObject, load_bucket_sample_data_with
+from .base import (
+    ObjectsPage,
+    Storage,
+    StorageObject,
+    load_bucket_sample_data_with,
+    paginate_objects,
+)
 
 
 def _is_dir(blob_properties: BlobProperties | BlobPrefix) -> bool:
@@ -35,6 +41,8 @@ def _blob_to_obj(blob_properties, container_name):
             type="directory",
         )
     else:
+        # Only set for blobs uploaded in a single request
+        content_md5 = blob_properties.content_settings.content_md5
         updated_at = (
             blob_properties.last_modified.isoformat()
             if blob_properties.last_modified
@@ -48,6 +56,7 @@ def _blob_to_obj(blob_properties, container_name):
             updated_at=updated_at,
             size=blob_properties.size,
             type="file",
+            checksum=content_md5.hex() if content_md5 else None,
         )
 
 
@@ -191,6 +200,17 @@ class AzureBlobStorage(Storage):
                 f"Object {file_path} not found in bucket {bucket_name}"
             )
 
+    def read_object_range(
+        self, bucket_name: str, file_path: str, offset: int, length: int
+    ) -> bytes:
+        blob_client = self.client.get_blob_client(container=bucket_name, blob=file_path)
+        try:
+            return blob_client.download_blob(offset=offset, length=length).readall()
+        except ResourceNotFoundError:
+            raise self.exceptions.NotFound(
+                f"Object {file_path} not found in bucket {bucket_name}"
+            )
+
     def get_bucket_object(self, bucket_name, object_key):
         blob_client = self.client.get_blob_client(
             container=bucket_name, blob=object_key
@@ -212,6 +232,7 @@ class AzureBlobStorage(Storage):
         per_page=30,
         query=None,
         ignore_hidden_files=True,
+        cursor=None,
     ) -> ObjectsPage:
         """List objects in a Azure Blob Container
 
@@ -234,12 +255,6 @@ class AzureBlobStorage(Storage):
                 name_starts_with=prefix, delimiter="/", results_per_page=per_page * 2
             )
 
-        max_items = (page * per_page) + 1
-        start_offset = (page - 1) * per_page
-        end_offset = page * per_page
-
-        objects = []
-
         lower_match_glob = match_glob.lower() if match_glob else None
 
         def is_object_match_query(obj):
@@ -257,30 +272,20 @@ class AzureBlobStorage(Storage):
                 return False
             return True
 
-        while True:
-            try:
-                obj = next(iter_blobs)
-                if is_object_match_query(obj):
-                    objects.append(_blob_to_obj(obj, bucket_name))
-
-                if len(objects) >= max_items:
-                    break
-            except StopIteration:
-                # We reached the end of the list of pages. Let's return what we have and set the
-                # has_next_page to false
-                return ObjectsPage(
-                    items=objects[start_offset:end_offset],
-                    page_number=page,
-                    has_previous_page=page > 1,
-                    has_next_page=False,
+        def pages(token):
+            page_iterator = iter_blobs.by_page(continuation_token=token)
+            for azure_page in page_iterator:
+                yield (
+                    token,
+                    [
+                        _blob_to_obj(obj, bucket_name)
+                        for obj in azure_page
+                        if is_object_match_query(obj)
+                    ],
                 )
+                token = page_iterator.continuation_token
 
-        return ObjectsPage(
-            items=objects[start_offset:end_offset],
-            page_number=page,
-            has_previous_page=page > 1,
-            has_next_page=len(objects) > end_offset,
-        )
+        return paginate_objects(pages, page=page, per_page=per_page, cursor=cursor)
 
     def delete_object(self, bucket_name, file_name):
         container_client = self.client.get_container_client(container=bucket_name)
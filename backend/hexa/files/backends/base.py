@@ -1,5 +1,9 @@
+import base64
+import binascii
 import io
+import json
 import os
+import typing
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from os.path import dirname, isfile, join
@@ -17,6 +21,77 @@ class ObjectsPage:
     has_next_page: bool
     has_previous_page: bool
     page_number: int
+    # Opaque position of the first object of the next page, to pass as `cursor` to fetch it
+    next_cursor: str | None = None
+
+
+def encode_cursor(token: str | None, offset: int) -> str:
+    """Encode the position of an object in a listing: the token of the backend page it is part of (None for the
+    first page) and its offset among the matching objects of this page.
+    """
+    data = json.dumps({"token": token, "offset": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str | None, int]:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        token, offset = position["token"], position["offset"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise BadRequest("Invalid cursor")
+    if (token is not None and not isinstance(token, str)) or not (
+        isinstance(offset, int) and offset >= 0
+    ):
+        raise BadRequest("Invalid cursor")
+    return token, offset
+
+
+def paginate_objects(
+    pages: typing.Callable[
+        [str | None], typing.Iterable[tuple[str | None, typing.Iterable]]
+    ],
+    page: int = 1,
+    per_page: int = 30,
+    cursor: str | None = None,
+    to_object: typing.Callable[[typing.Any], "StorageObject"] = lambda entry: entry,
+) -> ObjectsPage:
+    """Return a page of objects from the pages of a backend listing.
+
+    `pages(token)` iterates over the `(token, entries)` of the pages of the listing, starting from the page of the
+    given token (the first one when None): `entries` are the objects of the page matching the filters of the
+    listing, converted with `to_object` only when they are returned.
+
+    When a cursor is given, the listing resumes from the page of its token and only the objects of this page
+    before its offset are skipped: deep pages cost the same as the first one. Otherwise the listing starts from its
+    first page and `(page - 1) * per_page` objects are skipped.
+    """
+    if cursor:
+        token, skip = decode_cursor(cursor)
+    else:
+        token, skip = None, (page - 1) * per_page
+
+    objects = []
+    for page_token, entries in pages(token):
+        for offset, entry in enumerate(entries):
+            if skip:
+                skip -= 1
+                continue
+            if len(objects) == per_page:
+                return ObjectsPage(
+                    items=objects,
+                    page_number=page,
+                    has_previous_page=bool(cursor) or page > 1,
+                    has_next_page=True,
+                    next_cursor=encode_cursor(page_token, offset),
+                )
+            objects.append(to_object(entry))
+
+    return ObjectsPage(
+        items=objects,
+        page_number=page,
+        has_previous_page=bool(cursor) or page > 1,
+        has_next_page=False,
+    )
 
 
 def load_bucket_sample_data_with(bucket_name: str, client_storage: "Storage"):
@@ -43,6 +118,8 @@ class StorageObject:
     updated_at: str | None = None
     size: int = 0
     content_type: str | None = None
+    # Hex MD5 digest of the content, when the storage knows it without reading the object
+    checksum: str | None = None
 
 
 class Storage(ABC):
@@ -106,7 +183,11 @@ class Storage(ABC):
         per_page=30,
         query=None,
         ignore_hidden_files=True,
+        cursor: str | None = None,
     ) -> ObjectsPage:
+        """Return a page of the objects of a bucket, selected with `page` or with the `next_cursor` of the previous
+        page (`page` is then only used as the page number).
+        """
         pass
 
     @abstractmethod
@@ -125,6 +206,64 @@ class Storage(ABC):
     def read_object(self, bucket_name: str, file_path: str) -> bytes:
         pass
 
+    @abstractmethod
+    def read_object_range(
+        self, bucket_name: str, file_path: str, offset: int, length: int
+    ) -> bytes:
+        """Read `length` bytes of an object (or less at its end), starting at `offset`."""
+        pass
+
+    def open_object(self, bucket_name: str, file_path: str) -> io.BufferedReader:
+        """Open an object as a seekable file, whose content is fetched with ranged reads when it is read."""
+        size = self.get_bucket_object(bucket_name, file_path).size
+        return io.BufferedReader(
+            StorageObjectReader(self, bucket_name, file_path, size)
+        )
+
     @abstractmethod
     def get_bucket_mount_config(self, bucket_name) -> dict:
         pass
+
+
+class StorageObjectReader(io.RawIOBase):
+    """Read-only file over a storage object: each read is a ranged read on the storage backend.
+
+    Readers of formats such as Parquet can then fetch only the parts of the file they need.
+    """
+
+    def __init__(self, storage: Storage, bucket_name: str, file_path: str, size: int):
+        self.storage = storage
+        self.bucket_name = bucket_name
+        self.file_path = file_path
+        self.size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self._position)
+        if length <= 0:
+            return 0
+        data = self.storage.read_object_range(
+            self.bucket_name, self.file_path, self._position, length
+        )
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
@@ -1,7 +1,8 @@
 import fnmatch
+import hashlib
 import io
 
-from .base import ObjectsPage, Storage, StorageObject
+from .base import ObjectsPage, Storage, StorageObject, paginate_objects
 
 
 class DummyStorageClient(Storage):
@@ -105,6 +106,7 @@ class DummyStorageClient(Storage):
                 updated_at="",
                 type="file",
                 size=len(obj),
+                checksum=hashlib.md5(obj).hexdigest(),
             )
 
     def read_object(self, bucket_name: str, file_path: str) -> bytes:
@@ -120,6 +122,11 @@ class DummyStorageClient(Storage):
             return data
         raise self.exceptions.NotFound(f"'{file_path}' is not a file.")
 
+    def read_object_range(
+        self, bucket_name: str, file_path: str, offset: int, length: int
+    ) -> bytes:
+        return self.read_object(bucket_name, file_path)[offset : offset + length]
+
     def get_bucket_object(self, bucket_name: str, object_key: str):
         # Mock retrieving an object from a bucket
         if (
@@ -140,6 +147,7 @@ class DummyStorageClient(Storage):
         per_page=30,
         query=None,
         ignore_hidden_files=True,
+        cursor=None,
     ) -> ObjectsPage:
         # Mock listing objects in a bucket
         if bucket_name not in self._buckets:
@@ -151,16 +159,12 @@ class DummyStorageClient(Storage):
                     continue
                 object_keys.append(key)
 
-        start = (page - 1) * per_page
-        end = start + per_page
-        objects = [
-            self._to_storage_object(bucket_name, key) for key in object_keys[start:end]
-        ]
-        return ObjectsPage(
-            items=objects,
-            page_number=page,
-            has_previous_page=page > 1,
-            has_next_page=end < len(objects),
+        return paginate_objects(
+            lambda token: [(None, object_keys)],
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            to_object=lambda key: self._to_storage_object(bucket_name, key),
         )
 
     def generate_upload_url(
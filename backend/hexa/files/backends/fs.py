@@ -15,7 +15,13 @@ from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.text import get_valid_filename
 
-from .base import ObjectsPage, Storage, StorageObject, load_bucket_sample_data_with
+from .base import (
+    ObjectsPage,
+    Storage,
+    StorageObject,
+    load_bucket_sample_data_with,
+    paginate_objects,
+)
 
 
 def safe_join(base, *paths):
@@ -223,6 +229,7 @@ class FileSystemStorage(Storage):
         per_page=30,
         query: str = None,
         ignore_hidden_files=True,
+        cursor: str | None = None,
     ) -> ObjectsPage:
         if prefix is None:
             prefix = ""
@@ -246,33 +253,36 @@ class FileSystemStorage(Storage):
                 return False
             return True
 
-        objects = []
-
         def walk(path, relative_prefix, recursive=True):
-            for entry in os.scandir(path):
+            # Entries are sorted (directories first, then files) so that the offsets of the cursors are stable, and
+            # only their keys are listed: the objects are only built (and stat-ed) for the returned page
+            with os.scandir(path) as iterator:
+                entries = sorted(
+                    (entry for entry in iterator if entry.is_dir() or entry.is_file()),
+                    key=lambda entry: (not entry.is_dir(), entry.name),
+                )
+            for entry in entries:
                 if ignore_hidden_files and any(
                     part.startswith(".") for part in entry.name.split("/")
                 ):
                     continue
 
                 entry_key = Path(relative_prefix) / entry.name
-
-                if entry.is_dir():
-                    if does_object_match(entry.name):
-                        objects.append(self.to_storage_object(bucket_name, entry_key))
-                    if recursive:
-                        walk(entry.path, entry_key)
-                elif entry.is_file() and does_object_match(entry.name):
-                    objects.append(self.to_storage_object(bucket_name, entry_key))
-
-        walk(full_path, Path(prefix), recursive=bool(match_glob))
-
-        offset = (page - 1) * per_page
-        return ObjectsPage(
-            items=objects[offset : offset + per_page],
-            page_number=page,
-            has_previous_page=page > 1,
-            has_next_page=len(objects) > page * per_page,
+                if does_object_match(entry.name):
+                    yield entry_key
+                if recursive and entry.is_dir():
+                    yield from walk(entry.path, entry_key)
+
+        def pages(token):
+            # The whole directory is a single page, cursors hold the offset of the next object in it
+            yield None, walk(full_path, Path(prefix), recursive=bool(match_glob))
+
+        return paginate_objects(
+            pages,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            to_object=lambda key: self.to_storage_object(bucket_name, key),
         )
 
     def delete_object(self, bucket_name: str, object_key: str):
@@ -349,6 +359,16 @@ class FileSystemStorage(Storage):
         with open(full_path, "rb") as f:
             return f.read()
 
+    def read_object_range(
+        self, bucket_name: str, file_path: str, offset: int, length: int
+    ) -> bytes:
+        full_path = self.path(bucket_name, file_path)
+        if not self.exists(full_path):
+            raise self.exceptions.NotFound(f"Object {file_path} not found")
+        with open(full_path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
     def get_bucket_mount_config(self, bucket_name):
         return {
             "WORKSPACE_STORAGE_MOUNT_PATH": str(
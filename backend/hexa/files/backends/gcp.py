@@ -4,7 +4,6 @@ import io
 import json
 
 import requests
-import sentry_sdk
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from google.cloud import storage
@@ -14,7 +13,14 @@ from google.cloud.storage.blob import Blob
 from google.oauth2 import service_account
 from google.protobuf import duration_pb2
 
-from .base import ObjectsPage, Storage, StorageObject, load_bucket_sample_data_with
+from .base import (
+    BadRequest,
+    ObjectsPage,
+    Storage,
+    StorageObject,
+    load_bucket_sample_data_with,
+    paginate_objects,
+)
 
 
 def get_credentials(service_account_key: str):
@@ -41,6 +47,8 @@ def _blob_to_obj(blob: Blob):
         updated_at=blob.updated,
         size=blob.size,
         type="directory" if _is_dir(blob) else "file",
+        # Composite objects have no MD5 hash
+        checksum=base64.b64decode(blob.md5_hash).hex() if blob.md5_hash else None,
     )
 
 
@@ -53,34 +61,32 @@ def _prefix_to_obj(bucket_name, name: str):
     )
 
 
-LARGE_DIRECTORY_THRESHOLD = 500
+# Phases of a listing, encoded in its page tokens: the folders of a directory (the prefixes of all the pages of a
+# delimited listing) are listed before its files, as the prefixes are only returned with the page they are found on
+PREFIXES_PHASE = "prefixes"
+BLOBS_PHASE = "blobs"
+# Pages of prefixes only are small, they are listed with the maximum page size of the API
+PREFIXES_PAGE_SIZE = 1000
 
 
-def iter_request_results(bucket_name, request, include_directories=False):
-    # Consume all pages first so that request.prefixes is fully populated.
-    # The GCP client discovers prefixes lazily as pages are iterated, so reading
-    # prefixes after only the first page would silently drop later ones.
-    blobs = []
-    for page in request.pages:
-        for blob in page:
-            blobs.append(blob)
-
-    # Notify us in case a bucket is very large and this prefix discovery becomes
-    # a potential performance issue.
-    if len(blobs) > LARGE_DIRECTORY_THRESHOLD:
-        sentry_sdk.capture_message(
-            f"Large directory listing: bucket '{bucket_name}' returned {len(blobs)} items",
-            level="warning",
-        )
+def encode_page_token(phase: str, page_token: str | None) -> str:
+    return f"{phase}:{page_token or ''}"
 
-    for prefix in sorted(request.prefixes):
-        yield _prefix_to_obj(bucket_name, prefix)
 
-    for blob in blobs:
-        if not _is_dir(blob) or include_directories:
-            # We ignore objects that are directories (object with a size = 0 and ending with a /)
-            # because they are already listed in the prefixes
-            yield _blob_to_obj(blob)
+def decode_page_token(token: str | None, first_phase: str) -> tuple[str, str | None]:
+    if token is None:
+        return first_phase, None
+    phase, separator, page_token = token.partition(":")
+    if not separator or phase not in (PREFIXES_PHASE, BLOBS_PHASE):
+        raise BadRequest("Invalid cursor")
+    return phase, page_token or None
+
+
+def iter_request_pages(request, phase: str, page_token: str | None = None):
+    """Iterate over the (token, page) of the pages of a listing requested from `page_token`."""
+    for page in request.pages:
+        yield encode_page_token(phase, page_token), page
+        page_token = request.next_page_token
 
 
 def ensure_is_folder(object_key: str):
@@ -232,6 +238,16 @@ class GoogleCloudStorage(Storage):
         except NotFound:
             raise self.exceptions.NotFound(f"Object {file_path} not found")
 
+    def read_object_range(
+        self, bucket_name: str, file_path: str, offset: int, length: int
+    ) -> bytes:
+        blob = self.client.bucket(bucket_name).blob(file_path)
+        try:
+            # The end of the range is inclusive
+            return blob.download_as_bytes(start=offset, end=offset + length - 1)
+        except NotFound:
+            raise self.exceptions.NotFound(f"Object {file_path} not found")
+
     def get_bucket_object(self, bucket_name: str, object_key: str):
         bucket = self.client.get_bucket(bucket_name)
         object = bucket.get_blob(object_key)
@@ -249,8 +265,9 @@ class GoogleCloudStorage(Storage):
         per_page=30,
         query=None,
         ignore_hidden_files=True,
+        cursor=None,
     ) -> ObjectsPage:
-        """Returns the list of objects in a bucket with pagination support.
+        """Returns the list of objects in a bucket with pagination support, the folders before the files.
         Objects starting with a dot can be ignored using `ignore_hidden_files`.
 
         Args:
@@ -261,31 +278,10 @@ class GoogleCloudStorage(Storage):
             per_page (int, optional): Items per page. Defaults to 30.
             query (str, optional): Query to filter the objects. Defaults to None.
             ignore_hidden_files (bool, optional): Returns the hidden files and directories if `False`. Defaults to True.
+            cursor (str, optional): The `next_cursor` of the previous page, to resume the listing from its page token
+                instead of listing the objects of the previous pages again. Defaults to None.
 
         """
-        request = (
-            self.client.list_blobs(
-                bucket_name,
-                prefix=prefix,
-                # We take twice the number of items to be sure to have enough
-                page_size=per_page * 2,
-                delimiter="/",
-                include_trailing_delimiter=True,
-            )
-            if not match_glob
-            else self.client.list_blobs(
-                bucket_name,
-                prefix=prefix,
-                match_glob=f"**/*{match_glob}*",
-                page_size=per_page * 2,
-            )
-        )
-        max_items = (page * per_page) + 1
-        start_offset = (page - 1) * per_page
-        end_offset = page * per_page
-
-        objects = []
-
         lower_match_glob = match_glob.lower() if match_glob else None
 
         def is_object_match_query(obj):
@@ -300,34 +296,68 @@ class GoogleCloudStorage(Storage):
                 return False
             return True
 
-        iterator = iter_request_results(
-            bucket_name, request, include_directories=match_glob
-        )
-        while True:
-            try:
-                obj = next(iterator)
-                if is_object_match_query(obj):
-                    objects.append(obj)
-
-                if len(objects) >= max_items:
-                    # We have enough items, let's stop the loop
-                    break
-            except StopIteration:
-                # We reached the end of the list of pages. Let's return what we have and set the
-                # has_next_page to false
-                return ObjectsPage(
-                    items=objects[start_offset:end_offset],
-                    page_number=page,
-                    has_previous_page=page > 1,
-                    has_next_page=False,
+        def list_pages(phase, page_token, **kwargs):
+            request = self.client.list_blobs(
+                bucket_name, prefix=prefix, page_token=page_token, **kwargs
+            )
+            return iter_request_pages(request, phase, page_token)
+
+        def pages(token):
+            if match_glob:
+                phase, page_token = decode_page_token(token, BLOBS_PHASE)
+                if phase != BLOBS_PHASE:
+                    raise BadRequest("Invalid cursor")
+                for page_token, page in list_pages(
+                    BLOBS_PHASE,
+                    page_token,
+                    match_glob=f"**/*{match_glob}*",
+                    # We take twice the number of items to be sure to have enough
+                    page_size=per_page * 2,
+                ):
+                    yield (
+                        page_token,
+                        filter(is_object_match_query, map(_blob_to_obj, page)),
+                    )
+                return
+
+            phase, page_token = decode_page_token(token, PREFIXES_PHASE)
+            if phase == PREFIXES_PHASE:
+                for prefixes_token, page in list_pages(
+                    PREFIXES_PHASE,
+                    page_token,
+                    delimiter="/",
+                    page_size=PREFIXES_PAGE_SIZE,
+                    fields="prefixes,nextPageToken",
+                ):
+                    yield (
+                        prefixes_token,
+                        filter(
+                            is_object_match_query,
+                            [
+                                _prefix_to_obj(bucket_name, prefix)
+                                for prefix in sorted(page.prefixes)
+                            ],
+                        ),
+                    )
+                page_token = None
+            for blobs_token, page in list_pages(
+                BLOBS_PHASE,
+                page_token,
+                delimiter="/",
+                include_trailing_delimiter=True,
+                page_size=per_page * 2,
+            ):
+                yield (
+                    blobs_token,
+                    filter(
+                        is_object_match_query,
+                        # We ignore objects that are directories (object with a size = 0 and ending with a /)
+                        # because they are already listed in the prefixes
+                        [_blob_to_obj(blob) for blob in page if not _is_dir(blob)],
+                    ),
                 )
 
-        return ObjectsPage(
-            items=objects[start_offset:end_offset],
-            page_number=page,
-            has_previous_page=page > 1,
-            has_next_page=len(objects) > page * per_page,
-        )
+        return paginate_objects(pages, page=page, per_page=per_page, cursor=cursor)
 
     # TODO handle read-only mode.
     def get_short_lived_downscoped_access_token(self, bucket_name):
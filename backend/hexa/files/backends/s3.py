@@ -16,6 +16,7 @@ from .base import (
     Storage,
     StorageObject,
     load_bucket_sample_data_with,
+    paginate_objects,
 )
 
 LARGE_DIRECTORY_THRESHOLD = 500
@@ -35,6 +36,7 @@ def _s3_object_to_storage_obj(obj: dict, bucket_name: str) -> StorageObject:
             type="directory",
         )
     last_modified = obj.get("LastModified")
+    etag = (obj.get("ETag") or "").strip('"')
     return StorageObject(
         name=key.split("/")[-1],
         key=key,
@@ -43,6 +45,8 @@ def _s3_object_to_storage_obj(obj: dict, bucket_name: str) -> StorageObject:
         size=obj.get("Size", 0),
         updated_at=last_modified.isoformat() if last_modified else None,
         content_type=guess_type(key)[0] or "application/octet-stream",
+        # The ETag of multipart uploads is not the MD5 of the content
+        checksum=etag if etag and "-" not in etag else None,
     )
 
 
@@ -294,6 +298,7 @@ class S3Storage(Storage):
                 "Key": object_key,
                 "Size": response["ContentLength"],
                 "LastModified": response["LastModified"],
+                "ETag": response.get("ETag"),
             }
             return _s3_object_to_storage_obj(obj, bucket_name)
         except ClientError as e:
@@ -324,11 +329,8 @@ class S3Storage(Storage):
         per_page: int = 30,
         query: str | None = None,
         ignore_hidden_files: bool = True,
+        cursor: str | None = None,
     ) -> ObjectsPage:
-        max_items = (page * per_page) + 1
-        start_offset = (page - 1) * per_page
-        end_offset = page * per_page
-
         lower_match_glob = match_glob.lower() if match_glob else None
 
         def is_match(name: str) -> bool:
@@ -341,54 +343,53 @@ class S3Storage(Storage):
                 return False
             return True
 
-        objects = []
-        paginator = self.client.get_paginator("list_objects_v2")
-        paginate_kwargs = {"Bucket": bucket_name}
+        list_kwargs = {"Bucket": bucket_name}
         if prefix:
-            paginate_kwargs["Prefix"] = prefix
+            list_kwargs["Prefix"] = prefix
+        if not match_glob:
+            # Hierarchical listing: directories (CommonPrefixes) before files within each page
+            list_kwargs["Delimiter"] = "/"
 
-        if match_glob:
-            # Flat recursive listing for glob — client-side fnmatch filtering
+        def pages(token: str | None):
+            # Pages are fetched one at a time from the continuation token of the cursor, the objects before it are
+            # not listed again
             total_seen = 0
-            large_dir_reported = False
-            for s3_page in paginator.paginate(**paginate_kwargs):
-                contents = s3_page.get("Contents", [])
-                total_seen += len(contents)
-                if total_seen > LARGE_DIRECTORY_THRESHOLD and not large_dir_reported:
-                    large_dir_reported = True
-                    sentry_sdk.capture_message(
-                        f"Large directory listing: bucket '{bucket_name}' returned {total_seen}+ items",
-                        level="warning",
-                    )
-                for obj in contents:
-                    if is_match(obj["Key"].rstrip("/").split("/")[-1]):
-                        objects.append(_s3_object_to_storage_obj(obj, bucket_name))
-                if len(objects) >= max_items:
-                    break
-        else:
-            # Hierarchical listing: directories (CommonPrefixes) before files within each page
-            paginate_kwargs["Delimiter"] = "/"
-            for s3_page in paginator.paginate(**paginate_kwargs):
+            while True:
+                s3_page = self.client.list_objects_v2(
+                    **list_kwargs, **({"ContinuationToken": token} if token else {})
+                )
+                objects = []
                 for common_prefix in s3_page.get("CommonPrefixes", []):
                     name = common_prefix["Prefix"].rstrip("/").split("/")[-1]
                     if is_match(name):
                         objects.append(
                             _prefix_to_storage_obj(common_prefix["Prefix"], bucket_name)
                         )
-                for obj in s3_page.get("Contents", []):
-                    if not _is_dir(obj):
-                        name = obj["Key"].split("/")[-1]
-                        if is_match(name):
+                contents = s3_page.get("Contents", [])
+                for obj in contents:
+                    if match_glob:
+                        # Flat recursive listing for glob — client-side fnmatch filtering
+                        if is_match(obj["Key"].rstrip("/").split("/")[-1]):
                             objects.append(_s3_object_to_storage_obj(obj, bucket_name))
-                if len(objects) >= max_items:
-                    break
-
-        return ObjectsPage(
-            items=objects[start_offset:end_offset],
-            page_number=page,
-            has_previous_page=page > 1,
-            has_next_page=len(objects) > end_offset,
-        )
+                    elif not _is_dir(obj) and is_match(obj["Key"].split("/")[-1]):
+                        objects.append(_s3_object_to_storage_obj(obj, bucket_name))
+
+                total_seen += len(contents)
+                if (
+                    match_glob
+                    and total_seen > LARGE_DIRECTORY_THRESHOLD
+                    and total_seen - len(contents) <= LARGE_DIRECTORY_THRESHOLD
+                ):
+                    sentry_sdk.capture_message(
+                        f"Large directory listing: bucket '{bucket_name}' returned {total_seen}+ items",
+                        level="warning",
+                    )
+                yield token, objects
+                if not s3_page.get("IsTruncated"):
+                    return
+                token = s3_page["NextContinuationToken"]
+
+        return paginate_objects(pages, page=page, per_page=per_page, cursor=cursor)
 
     def delete_object(self, bucket_name: str, object_key: str) -> None:
         try:
@@ -468,6 +469,21 @@ class S3Storage(Storage):
                 raise self.exceptions.NotFound(f"Object {file_path} not found")
             raise
 
+    def read_object_range(
+        self, bucket_name: str, file_path: str, offset: int, length: int
+    ) -> bytes:
+        try:
+            response = self.client.get_object(
+                Bucket=bucket_name,
+                Key=file_path,
+                Range=f"bytes={offset}-{offset + length - 1}",
+            )
+            return response["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise self.exceptions.NotFound(f"Object {file_path} not found")
+            raise
+
     def load_bucket_sample_data(self, bucket_name: str) -> None:
         load_bucket_sample_data_with(bucket_name, self)
 
@@ -0,0 +1,170 @@
+"""Index of the objects of the workspace buckets, used to search files without listing the buckets.
+
+The index is refreshed by crawling the buckets (see the `files_index_crawler` command). A crawl lists the directories
+of a bucket one page at a time and saves its progress (the directories left to list and the cursor of the next page)
+after each step: large buckets are crawled over several steps, in turn with the other buckets. The objects that were
+not seen by a complete crawl are removed from the index. The mutations creating and deleting objects also update the
+index, so that the changes are searchable before the next crawl.
+"""
+
+from datetime import datetime, timedelta
+from logging import getLogger
+
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from hexa.files import storage
+from hexa.files.backends.base import StorageObject
+from hexa.files.models import BucketCrawl, BucketObject
+from hexa.workspaces.models import Workspace
+
+logger = getLogger(__name__)
+
+# Number of objects listed per request to the storage
+CRAWL_PAGE_SIZE = 1000
+# Number of objects listed in a step of a crawl, before its progress is saved
+CRAWL_STEP_SIZE = 10_000
+
+
+def to_datetime(value: datetime | str | None) -> datetime | None:
+    if isinstance(value, str):
+        value = parse_datetime(value) if value else None
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def index_objects(
+    workspace: Workspace,
+    objects: list[StorageObject],
+    indexed_at: datetime | None = None,
+):
+    """Add the objects to the index of the workspace, or update them."""
+    indexed_at = indexed_at or timezone.now()
+    # An object can only be updated once per statement
+    entries = {
+        str(obj.key): BucketObject(
+            workspace=workspace,
+            key=str(obj.key),
+            name=obj.name,
+            type=obj.type,
+            size=obj.size if obj.type == BucketObject.TYPE_FILE else None,
+            updated_at=to_datetime(obj.updated_at),
+            indexed_at=indexed_at,
+        )
+        for obj in objects
+    }
+    BucketObject.objects.bulk_create(
+        entries.values(),
+        update_conflicts=True,
+        unique_fields=["workspace", "key"],
+        update_fields=["name", "type", "size", "updated_at", "indexed_at"],
+    )
+
+
+def index_object_key(
+    workspace: Workspace,
+    key: str,
+    type: str = BucketObject.TYPE_FILE,
+    size: int | None = None,
+):
+    """Add an object that is being created to the index, before the storage can tell its properties."""
+    index_objects(
+        workspace,
+        [
+            StorageObject(
+                name=key.rstrip("/").split("/")[-1],
+                key=key,
+                path=f"{workspace.bucket_name}/{key}",
+                type=type,
+                size=size,
+                updated_at=timezone.now(),
+            )
+        ],
+    )
+
+
+def remove_object_key(workspace: Workspace, key: str):
+    """Remove an object from the index, with the objects it holds when it is a directory."""
+    key = key.rstrip("/")
+    BucketObject.objects.filter(workspace=workspace).filter(
+        Q(key=key) | Q(key__startswith=f"{key}/")
+    ).delete()
+
+
+def get_workspaces_to_crawl(interval: timedelta) -> QuerySet:
+    """Return the workspaces whose crawl is in progress or whose last crawl finished more than `interval` ago,
+    the least recently crawled first.
+    """
+    return (
+        Workspace.objects.filter(archived=False, bucket_name__isnull=False)
+        .filter(
+            Q(bucket_crawl__isnull=True)
+            | Q(bucket_crawl__finished_at__isnull=True)
+            | ~Q(bucket_crawl__pending_prefixes=[])
+            | Q(bucket_crawl__finished_at__lt=timezone.now() - interval)
+        )
+        .order_by(F("bucket_crawl__finished_at").asc(nulls_first=True))
+    )
+
+
+def crawl_bucket(workspace: Workspace, max_objects: int = CRAWL_STEP_SIZE) -> bool:
+    """Run a step of the crawl of the bucket of the workspace, starting a new crawl when none is in progress.
+
+    Returns True when the crawl is complete. Only one crawler is expected to run at a time.
+    """
+    crawl, _ = BucketCrawl.objects.get_or_create(workspace=workspace)
+    if not crawl.in_progress:
+        crawl.started_at = timezone.now()
+        crawl.pending_prefixes = [""]
+        crawl.cursor = None
+
+    listed = 0
+    while crawl.pending_prefixes and listed < max_objects:
+        prefix = crawl.pending_prefixes[0]
+        try:
+            page = storage.list_bucket_objects(
+                workspace.bucket_name,
+                prefix=prefix or None,
+                per_page=CRAWL_PAGE_SIZE,
+                cursor=crawl.cursor,
+            )
+        except storage.exceptions.BadRequest:
+            if crawl.cursor is not None:
+                # The cursor can not be used anymore, the directory is listed again
+                crawl.cursor = None
+                continue
+            # The directory can not be listed at all, it is left out of the crawl
+            logger.warning(
+                "Could not list %s in bucket %s", prefix, workspace.bucket_name
+            )
+            crawl.pending_prefixes.pop(0)
+            continue
+        except storage.exceptions.NotFound:
+            # The directory was deleted since it was listed
+            crawl.pending_prefixes.pop(0)
+            crawl.cursor = None
+            continue
+
+        index_objects(workspace, page.items)
+        listed += len(page.items)
+        crawl.pending_prefixes += [
+            str(obj.key)
+            for obj in page.items
+            if obj.type == BucketObject.TYPE_DIRECTORY
+            and str(obj.key).rstrip("/") != prefix.rstrip("/")
+        ]
+        if page.has_next_page:
+            crawl.cursor = page.next_cursor
+        else:
+            crawl.pending_prefixes.pop(0)
+            crawl.cursor = None
+
+    if not crawl.pending_prefixes:
+        BucketObject.objects.filter(
+            workspace=workspace, indexed_at__lt=crawl.started_at
+        ).delete()
+        crawl.finished_at = timezone.now()
+    crawl.save()
+    return not crawl.pending_prefixes
@@ -0,0 +1,81 @@
+"""Crawl the workspace buckets to refresh the index of their objects (see hexa.files.index).
+
+The crawls progress one step at a time, in turn for each workspace to crawl, so that a large bucket does not delay the
+refresh of the others. Only one crawler is expected to run at a time.
+"""
+
+import time
+from datetime import timedelta
+from logging import getLogger
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hexa.files.index import CRAWL_STEP_SIZE, crawl_bucket, get_workspaces_to_crawl
+from hexa.workspaces.models import Workspace
+
+logger = getLogger(__name__)
+
+# Seconds to wait before looking for workspaces to crawl when none is due
+POLL_INTERVAL = 60
+# Number of workspaces whose crawl progresses in a round
+ROUND_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = "Crawl the workspace buckets to refresh the index of their objects used by the file search"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workspace",
+            action="append",
+            dest="workspaces",
+            metavar="SLUG",
+            help="Only crawl the bucket of this workspace (can be repeated)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Completely crawl the due buckets (or the buckets of the given workspaces, even if they are not due) "
+            "and exit",
+        )
+        parser.add_argument(
+            "--step-size",
+            type=int,
+            default=CRAWL_STEP_SIZE,
+            help="Number of objects listed in a step of a crawl",
+        )
+
+    def handle(self, *args, workspaces, once, step_size, **options):
+        interval = timedelta(seconds=settings.WORKSPACE_FILES_INDEX_CRAWL_INTERVAL)
+        if once:
+            if workspaces:
+                due = Workspace.objects.filter(
+                    slug__in=workspaces, bucket_name__isnull=False
+                )
+            else:
+                due = get_workspaces_to_crawl(interval)
+            for workspace in due:
+                started_at = time.monotonic()
+                while not crawl_bucket(workspace, step_size):
+                    pass
+                self.stdout.write(
+                    f"{workspace.slug}: {workspace.bucket_objects.count()} objects indexed "
+                    f"in {time.monotonic() - started_at:.1f}s"
+                )
+            return
+
+        while True:
+            due = get_workspaces_to_crawl(interval)
+            if workspaces:
+                due = due.filter(slug__in=workspaces)
+            due = list(due[:ROUND_SIZE])
+            for workspace in due:
+                try:
+                    crawl_bucket(workspace, step_size)
+                except Exception:
+                    logger.exception(
+                        "Could not crawl the bucket of workspace %s", workspace.slug
+                    )
+            if not due:
+                time.sleep(POLL_INTERVAL)
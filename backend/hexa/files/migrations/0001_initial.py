@@ -0,0 +1,103 @@
+# Generated by Django 5.2.16 on 2026-10-18 08:12
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("catalog", "0009_enable_trgm"),
+        ("workspaces", "0062_merge_20260804_0809"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BucketCrawl",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("pending_prefixes", models.JSONField(blank=True, default=list)),
+                ("cursor", models.TextField(blank=True, null=True)),
+                (
+                    "workspace",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bucket_crawl",
+                        to="workspaces.workspace",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BucketObject",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.TextField()),
+                ("name", models.TextField()),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("file", "File"), ("directory", "Directory")],
+                        default="file",
+                        max_length=10,
+                    ),
+                ),
+                ("size", models.BigIntegerField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(blank=True, null=True)),
+                ("indexed_at", models.DateTimeField()),
+                (
+                    "workspace",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bucket_objects",
+                        to="workspaces.workspace",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("name"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="files_object_name_trgm_idx",
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("key"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="files_object_key_trgm_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("workspace", "key"),
+                        name="files_bucket_object_unique_key",
+                    )
+                ],
+            },
+        ),
+    ]
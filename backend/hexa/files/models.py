@@ -1 +1,69 @@
-# Create your models here.
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models
+from django.db.models.functions import Upper
+from django.utils.translation import gettext_lazy as _
+
+
+class BucketObject(models.Model):
+    """An object of a workspace bucket, as last seen by the crawler (see hexa.files.index) or by the mutations.
+
+    It is used to search the files of the workspaces without listing their buckets.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["workspace", "key"], name="files_bucket_object_unique_key"
+            )
+        ]
+        indexes = [
+            # Trigram indexes used by the case-insensitive "contains" lookups (`UPPER(...) LIKE UPPER('%...%')`)
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="files_object_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("key"), name="gin_trgm_ops"),
+                name="files_object_key_trgm_idx",
+            ),
+        ]
+
+    TYPE_FILE = "file"
+    TYPE_DIRECTORY = "directory"
+
+    TYPE_CHOICES = [
+        (TYPE_FILE, _("File")),
+        (TYPE_DIRECTORY, _("Directory")),
+    ]
+
+    workspace = models.ForeignKey(
+        "workspaces.Workspace", on_delete=models.CASCADE, related_name="bucket_objects"
+    )
+    key = models.TextField()
+    name = models.TextField()
+    type = models.CharField(max_length=10, choices=TYPE_CHOICES, default=TYPE_FILE)
+    size = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+    # Last time the object was seen in the bucket, the objects not seen by a complete crawl are removed
+    indexed_at = models.DateTimeField()
+
+    @property
+    def path(self):
+        return f"{self.workspace.bucket_name}/{self.key}"
+
+
+class BucketCrawl(models.Model):
+    """Progress of the crawl of the bucket of a workspace, saved after each step so that it can be resumed."""
+
+    workspace = models.OneToOneField(
+        "workspaces.Workspace", on_delete=models.CASCADE, related_name="bucket_crawl"
+    )
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Keys of the directories left to list (the current one first) and cursor of the next page of the current one
+    pending_prefixes = models.JSONField(default=list, blank=True)
+    cursor = models.TextField(null=True, blank=True)
+
+    @property
+    def in_progress(self):
+        return bool(self.pending_prefixes)
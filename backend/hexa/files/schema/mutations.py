@@ -5,6 +5,7 @@ from ariadne import MutationType
 from hexa.analytics.api import track
 from hexa.files import storage
 from hexa.files.backends.exceptions import NotFound
+from hexa.files.index import index_object_key, index_objects, remove_object_key
 from hexa.files.utils import is_safe_path
 from hexa.workspaces.models import Workspace
 
@@ -24,6 +25,7 @@ def resolve_delete_bucket_object(_, info, **kwargs):
         if not is_safe_path(mutation_input["object_key"]):
             return {"success": False, "errors": ["INVALID_PATH"]}
         storage.delete_object(workspace.bucket_name, mutation_input["object_key"])
+        remove_object_key(workspace, mutation_input["object_key"])
         return {"success": True, "errors": []}
     except (storage.exceptions.NotFound, Workspace.DoesNotExist):
         return {"success": False, "errors": ["NOT_FOUND"]}
@@ -78,6 +80,8 @@ def resolve_prepare_upload_object(_, info, **kwargs):
             target_key=object_key,
             content_type=mutation_input.get("content_type"),
         )
+        # The object is searchable right away, its properties are updated by the next crawl of the bucket
+        index_object_key(workspace, object_key)
 
         return {
             "success": True,
@@ -104,6 +108,7 @@ def resolve_create_bucket_folder(_, info, **kwargs):
         if not is_safe_path(folder_key):
             return {"success": False, "errors": ["INVALID_PATH"]}
         folder_object = storage.create_bucket_folder(workspace.bucket_name, folder_key)
+        index_objects(workspace, [folder_object])
 
         return {"success": True, "folder": folder_object, "errors": []}
     except (storage.exceptions.NotFound, Workspace.DoesNotExist):
@@ -148,6 +153,7 @@ def resolve_write_file_content(_, info, **kwargs):
             pass
 
     storage.save_object(workspace.bucket_name, file_path, io.BytesIO(encoded))
+    index_object_key(workspace, file_path, size=len(encoded))
     return {
         "success": True,
         "errors": [],
@@ -50,25 +50,32 @@ def resolve_bucket_objects(
     page=1,
     per_page=15,
     ignore_hidden_files=True,
+    cursor=None,
     **kwargs,
 ):
     if workspace.bucket_name is None:
         raise ImproperlyConfigured("Workspace does not have a bucket")
+    empty_page = {
+        "has_previous_page": False,
+        "has_next_page": False,
+        "page_number": 1,
+        "items": [],
+    }
     if prefix and not is_safe_path(prefix):
-        return {
-            "has_previous_page": False,
-            "has_next_page": False,
-            "page_number": 1,
-            "items": [],
-        }
-    page = storage.list_bucket_objects(
-        workspace.bucket_name,
-        prefix=prefix,
-        page=page,
-        per_page=per_page,
-        query=query,
-        ignore_hidden_files=ignore_hidden_files,
-    )
+        return empty_page
+    try:
+        page = storage.list_bucket_objects(
+            workspace.bucket_name,
+            prefix=prefix,
+            page=page,
+            per_page=per_page,
+            query=query,
+            ignore_hidden_files=ignore_hidden_files,
+            cursor=cursor,
+        )
+    except storage.exceptions.BadRequest:
+        # Invalid cursor
+        return empty_page
 
     return page
 
@@ -1,3 +1,4 @@
+import hashlib
 import io
 
 from hexa.files.backends.base import Storage
@@ -47,6 +48,25 @@ class StorageTestMixin:
         with self.assertRaises(self.storage.exceptions.NotFound):
             self.storage.read_object(BUCKET, "nonexistent.txt")
 
+    def test_read_object_range(self):
+        self.storage.create_bucket(BUCKET)
+        self.storage.save_object(BUCKET, "file.txt", io.BytesIO(b"hello world"))
+        self.assertEqual(
+            self.storage.read_object_range(BUCKET, "file.txt", 6, 3), b"wor"
+        )
+        self.assertEqual(
+            self.storage.read_object_range(BUCKET, "file.txt", 6, 100), b"world"
+        )
+
+    def test_open_object(self):
+        self.storage.create_bucket(BUCKET)
+        self.storage.save_object(BUCKET, "file.txt", io.BytesIO(b"hello world"))
+        with self.storage.open_object(BUCKET, "file.txt") as file:
+            file.seek(-5, io.SEEK_END)
+            self.assertEqual(file.read(), b"world")
+            file.seek(0)
+            self.assertEqual(file.read(5), b"hello")
+
     def test_overwrite_object(self):
         self.storage.create_bucket(BUCKET)
         self.storage.save_object(BUCKET, "file.txt", io.BytesIO(b"original"))
@@ -60,6 +80,7 @@ class StorageTestMixin:
         self.assertEqual(obj.name, "file.txt")
         self.assertEqual(obj.type, "file")
         self.assertEqual(obj.size, 7)
+        self.assertIn(obj.checksum, [None, hashlib.md5(b"content").hexdigest()])
 
     def test_get_bucket_object_not_found(self):
         self.storage.create_bucket(BUCKET)
@@ -180,6 +201,42 @@ class StorageTestMixin:
         self.assertEqual(len(page3.items), 1)
         self.assertFalse(page3.has_next_page)
 
+    def test_list_bucket_objects_cursor(self):
+        self.storage.create_bucket(BUCKET)
+        self.storage.save_object(BUCKET, "dir/nested.txt", io.BytesIO(b"x"))
+        for i in range(7):
+            self.storage.save_object(BUCKET, f"file_{i}.txt", io.BytesIO(b"x"))
+        expected = [
+            o.name for o in self.storage.list_bucket_objects(BUCKET, per_page=10).items
+        ]
+
+        names, cursor = [], None
+        for _ in range(3):
+            page = self.storage.list_bucket_objects(BUCKET, per_page=3, cursor=cursor)
+            self.assertEqual(page.has_previous_page, cursor is not None)
+            names += [o.name for o in page.items]
+            cursor = page.next_cursor
+        self.assertEqual(names, expected)
+        self.assertFalse(page.has_next_page)
+        self.assertIsNone(page.next_cursor)
+
+    def test_list_bucket_objects_cursor_of_page(self):
+        self.storage.create_bucket(BUCKET)
+        for i in range(7):
+            self.storage.save_object(BUCKET, f"file_{i}.txt", io.BytesIO(b"x"))
+        page1 = self.storage.list_bucket_objects(BUCKET, page=1, per_page=3)
+        self.assertEqual(
+            self.storage.list_bucket_objects(
+                BUCKET, per_page=3, cursor=page1.next_cursor
+            ).items,
+            self.storage.list_bucket_objects(BUCKET, page=2, per_page=3).items,
+        )
+
+    def test_list_bucket_objects_invalid_cursor(self):
+        self.storage.create_bucket(BUCKET)
+        with self.assertRaises(self.storage.exceptions.BadRequest):
+            self.storage.list_bucket_objects(BUCKET, cursor="invalid")
+
     # --- Delete ---
 
     def test_delete_object(self):
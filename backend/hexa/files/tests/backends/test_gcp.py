@@ -145,3 +145,55 @@ class GoogleCloudStorageTest(StorageTestMixin, TestCase):
             [item.name for item in result.items if item.name],
             ["file_009.txt", "file_010.txt", "file_011.txt"],
         )
+
+    def test_list_bucket_objects_cursor_lists_folders_first(self):
+        bucket_name = self.storage.create_bucket("my-bucket")
+        bucket = self.storage_client.get_bucket(bucket_name)
+        for i in range(12):
+            bucket.blob(f"file_{i:03d}.txt").upload_from_string(b"data")
+        bucket.blob("zzz/").upload_from_string(b"")
+
+        names, cursor = [], None
+        while True:
+            result = self.storage.list_bucket_objects(
+                "my-bucket", per_page=5, cursor=cursor
+            )
+            names.append([item.name for item in result.items])
+            if not result.has_next_page:
+                break
+            cursor = result.next_cursor
+
+        self.assertEqual(
+            names,
+            [
+                ["zzz"] + [f"file_{i:03d}.txt" for i in range(4)],
+                [f"file_{i:03d}.txt" for i in range(4, 9)],
+                [f"file_{i:03d}.txt" for i in range(9, 12)],
+            ],
+        )
+
+    def test_list_bucket_objects_cursor_resumes_from_page_token(self):
+        bucket_name = self.storage.create_bucket("my-bucket")
+        bucket = self.storage_client.get_bucket(bucket_name)
+        for i in range(25):
+            bucket.blob(f"file_{i:03d}.txt").upload_from_string(b"data")
+
+        first = self.storage.list_bucket_objects("my-bucket", per_page=5)
+        second = self.storage.list_bucket_objects(
+            "my-bucket", per_page=5, cursor=first.next_cursor
+        )
+        third = self.storage.list_bucket_objects(
+            "my-bucket", per_page=5, cursor=second.next_cursor
+        )
+        # The third page starts on the second GCP page (page_size=10): it is listed from its page token
+        with patch.object(
+            self.storage_client, "list_blobs", wraps=self.storage_client.list_blobs
+        ) as list_blobs:
+            self.storage.list_bucket_objects(
+                "my-bucket", per_page=5, cursor=second.next_cursor
+            )
+        self.assertEqual(list_blobs.call_args.kwargs["page_token"], "10")
+        self.assertEqual(
+            [item.name for item in third.items],
+            [f"file_{i:03d}.txt" for i in range(10, 15)],
+        )
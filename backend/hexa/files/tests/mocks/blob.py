@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 from typing import TYPE_CHECKING
 
 from google.cloud._helpers import _bytes_to_unicode
@@ -22,6 +24,12 @@ class MockBlob:
             return len(self._content)
         return None
 
+    @property
+    def md5_hash(self):
+        if self._content is not None:
+            return base64.b64encode(hashlib.md5(self._content).digest()).decode()
+        return None
+
     @property
     def content_type(self):
         return self._content_type
@@ -46,10 +54,12 @@ class MockBlob:
         with open(filename, "rb") as f:
             self.upload_from_file(f)
 
-    def download_as_bytes(self):
+    def download_as_bytes(self, start=None, end=None):
         if self._content is None:
             raise NotFound(f"Blob {self.name} not found")
-        return self._content
+        if start is None and end is None:
+            return self._content
+        return self._content[start or 0 : None if end is None else end + 1]
 
     def generate_signed_url(self, *args, **kwargs):
         return f"http://signed-url/{self.name}"
@@ -5,9 +5,12 @@ from .bucket import MockBucket
 
 
 class MockHTTPIterator:
-    def __init__(self, items, page_size, max_results=None):
+    def __init__(self, items, page_size, max_results=None, page_token=None):
         self.items = items
         self._page_size = page_size
+        # Page tokens are the position of the first item of the page
+        self._offset = int(page_token) if page_token else 0
+        self.next_page_token = page_token
         self.num_results = 0
         self.page_number = 0
         self.max_results = max_results
@@ -84,20 +87,22 @@ class MockHTTPIterator:
                 there are no pages left.
         """
         if self._has_next_page():
+            start = self._offset + self.num_results
             if self._page_size is None:
-                page_items = self.items[self.num_results :]
+                page_items = self.items[start:]
             else:
-                page_items = self.items[
-                    self.num_results : self.num_results + self._page_size
-                ]
-            for item in page_items:
-                if item.name.endswith("/"):
-                    self._prefixes.add(item.name)
+                page_items = self.items[start : start + self._page_size]
             page = page_iterator.Page(
                 self,
                 page_items,
                 lambda _, item: item,
             )
+            page.prefixes = tuple(
+                item.name for item in page_items if item.name.endswith("/")
+            )
+            self._prefixes.update(page.prefixes)
+            end = start + len(page_items)
+            self.next_page_token = str(end) if end < len(self.items) else None
             return page
         else:
             return None
@@ -116,7 +121,7 @@ class MockHTTPIterator:
             if self.num_results >= self.max_results:
                 return False
 
-        return self.num_results < len(self.items)
+        return self._offset + self.num_results < len(self.items)
 
 
 class MockClient:
@@ -221,6 +226,7 @@ class MockClient:
         prefix=None,
         page_size=None,
         match_glob=None,
+        page_token=None,
         **kwargs,
     ):
         bucket = self._bucket_arg_to_bucket(bucket_or_name)
@@ -271,6 +277,7 @@ class MockClient:
             items=blobs,
             page_size=page_size,
             max_results=max_results,
+            page_token=page_token,
         )
 
         return iterator
@@ -0,0 +1,144 @@
+import io
+import shutil
+from datetime import timedelta
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from hexa.core.test import TestCase
+from hexa.files.backends.fs import FileSystemStorage
+from hexa.files.index import (
+    crawl_bucket,
+    get_workspaces_to_crawl,
+    index_object_key,
+    remove_object_key,
+)
+from hexa.files.models import BucketCrawl, BucketObject
+from hexa.user_management.models import User
+from hexa.workspaces.tests.testutils import create_workspace
+
+
+class BucketIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER = User.objects.create_user(
+            "user@bluesquarehub.com", "password", is_superuser=True
+        )
+        cls.WORKSPACE = create_workspace(
+            cls.USER, name="Senegal Workspace", description="", countries=[]
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.data_directory = Path(mkdtemp())
+        self.addCleanup(shutil.rmtree, self.data_directory)
+        self.storage = FileSystemStorage(data_dir=self.data_directory)
+        self.storage.create_bucket(self.WORKSPACE.bucket_name)
+        for key in ["a.csv", "dir/b.csv", "dir/sub/c.csv", ".hidden"]:
+            self.storage.save_object(
+                self.WORKSPACE.bucket_name, key, io.BytesIO(b"col\n1\n")
+            )
+        storage_patch = patch("hexa.files.index.storage", self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+
+    def indexed_keys(self):
+        return set(self.WORKSPACE.bucket_objects.values_list("key", flat=True))
+
+    def test_crawl_bucket(self):
+        self.assertTrue(crawl_bucket(self.WORKSPACE))
+
+        self.assertEqual(
+            self.indexed_keys(),
+            {"a.csv", "dir", "dir/b.csv", "dir/sub", "dir/sub/c.csv"},
+        )
+        file = BucketObject.objects.get(workspace=self.WORKSPACE, key="dir/b.csv")
+        self.assertEqual(file.name, "b.csv")
+        self.assertEqual(file.type, BucketObject.TYPE_FILE)
+        self.assertEqual(file.size, 6)
+        self.assertIsNotNone(file.updated_at)
+        self.assertEqual(file.path, f"{self.WORKSPACE.bucket_name}/dir/b.csv")
+        self.assertIsNotNone(
+            BucketCrawl.objects.get(workspace=self.WORKSPACE).finished_at
+        )
+
+    def test_crawl_bucket_in_steps(self):
+        with patch("hexa.files.index.CRAWL_PAGE_SIZE", 1):
+            self.assertFalse(crawl_bucket(self.WORKSPACE, max_objects=2))
+            crawl = BucketCrawl.objects.get(workspace=self.WORKSPACE)
+            self.assertTrue(crawl.in_progress)
+            self.assertIsNone(crawl.finished_at)
+
+            self.assertFalse(crawl_bucket(self.WORKSPACE, max_objects=2))
+            self.assertTrue(crawl_bucket(self.WORKSPACE, max_objects=2))
+
+        self.assertEqual(
+            self.indexed_keys(),
+            {"a.csv", "dir", "dir/b.csv", "dir/sub", "dir/sub/c.csv"},
+        )
+
+    def test_crawl_bucket_skips_directory_that_can_not_be_listed(self):
+        list_bucket_objects = self.storage.list_bucket_objects
+
+        def list_objects(bucket_name, prefix=None, **kwargs):
+            if prefix and prefix.rstrip("/") == "dir/sub":
+                raise self.storage.exceptions.BadRequest("Invalid prefix")
+            return list_bucket_objects(bucket_name, prefix=prefix, **kwargs)
+
+        with (
+            patch.object(self.storage, "list_bucket_objects", side_effect=list_objects),
+            self.assertLogs("hexa.files.index", level="WARNING"),
+        ):
+            self.assertTrue(crawl_bucket(self.WORKSPACE))
+
+        self.assertEqual(self.indexed_keys(), {"a.csv", "dir", "dir/b.csv", "dir/sub"})
+
+    def test_crawl_bucket_removes_deleted_objects(self):
+        crawl_bucket(self.WORKSPACE)
+        self.storage.delete_object(self.WORKSPACE.bucket_name, "dir/sub")
+        # Prepared upload that never happened
+        index_object_key(self.WORKSPACE, "uploading.csv")
+
+        crawl_bucket(self.WORKSPACE)
+
+        self.assertEqual(self.indexed_keys(), {"a.csv", "dir", "dir/b.csv"})
+
+    def test_index_and_remove_object_key(self):
+        crawl_bucket(self.WORKSPACE)
+        index_object_key(self.WORKSPACE, "new/report.csv", size=10)
+        self.assertEqual(
+            BucketObject.objects.get(
+                workspace=self.WORKSPACE, key="new/report.csv"
+            ).name,
+            "report.csv",
+        )
+
+        remove_object_key(self.WORKSPACE, "dir/")
+
+        self.assertEqual(self.indexed_keys(), {"a.csv", "new/report.csv"})
+
+    def test_get_workspaces_to_crawl(self):
+        self.assertIn(self.WORKSPACE, get_workspaces_to_crawl(timedelta(hours=1)))
+        crawl_bucket(self.WORKSPACE)
+        self.assertNotIn(self.WORKSPACE, get_workspaces_to_crawl(timedelta(hours=1)))
+
+        BucketCrawl.objects.filter(workspace=self.WORKSPACE).update(
+            finished_at=timezone.now() - timedelta(hours=2)
+        )
+        self.assertIn(self.WORKSPACE, get_workspaces_to_crawl(timedelta(hours=1)))
+
+    def test_files_index_crawler_command(self):
+        call_command(
+            "files_index_crawler",
+            "--once",
+            "--workspace",
+            self.WORKSPACE.slug,
+            "--step-size",
+            "1",
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(len(self.indexed_keys()), 5)
@@ -1,6 +1,8 @@
+import io
 from unittest.mock import patch
 
 from hexa.core.test import GraphQLTestCase
+from hexa.files import storage
 from hexa.files.backends.base import StorageObject
 from hexa.files.backends.exceptions import NotFound
 from hexa.user_management.models import User
@@ -77,10 +79,62 @@ class FilesTest(GraphQLTestCase):
             r["data"]["workspace"],
         )
 
+    def test_workspace_objects_cursor(self):
+        self.client.force_login(self.USER_WORKSPACE_ADMIN)
+        for name in ["a.csv", "b.csv", "c.csv"]:
+            storage.save_object(
+                self.WORKSPACE.bucket_name, f"cursor/{name}", io.BytesIO(b"x")
+            )
+        query = """
+        query WorkspaceObjects ($workspaceSlug: String!, $cursor: String) {
+            workspace (slug: $workspaceSlug) {
+                bucket {
+                    objects(prefix: "cursor/", perPage: 2, cursor: $cursor) {
+                        hasNextPage
+                        hasPreviousPage
+                        nextCursor
+                        items {
+                            name
+                        }
+                    }
+                }
+            }
+        }
+        """
+
+        r = self.run_query(query, {"workspaceSlug": self.WORKSPACE.slug})
+        first = r["data"]["workspace"]["bucket"]["objects"]
+        self.assertEqual([item["name"] for item in first["items"]], ["a.csv", "b.csv"])
+        self.assertTrue(first["hasNextPage"])
+
+        r = self.run_query(
+            query,
+            {"workspaceSlug": self.WORKSPACE.slug, "cursor": first["nextCursor"]},
+        )
+        self.assertEqual(
+            {
+                "hasNextPage": False,
+                "hasPreviousPage": True,
+                "nextCursor": None,
+                "items": [{"name": "c.csv"}],
+            },
+            r["data"]["workspace"]["bucket"]["objects"],
+        )
+
+        r = self.run_query(
+            query, {"workspaceSlug": self.WORKSPACE.slug, "cursor": "invalid"}
+        )
+        self.assertEqual(r["data"]["workspace"]["bucket"]["objects"]["items"], [])
+
     @patch("hexa.files.schema.mutations.storage")
     def test_create_bucket_folder(self, mock_storage):
         self.client.force_login(self.USER_WORKSPACE_ADMIN)
-        mock_storage.create_bucket_folder.return_value = {"name": self.FOLDER_NAME}
+        mock_storage.create_bucket_folder.return_value = StorageObject(
+            name=self.FOLDER_NAME,
+            key=f"{self.FOLDER_NAME}/",
+            path=f"{self.WORKSPACE.bucket_name}/{self.FOLDER_NAME}/",
+            type="directory",
+        )
 
         r = self.run_query(
             """
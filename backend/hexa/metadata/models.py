@@ -97,6 +97,38 @@ class MetadataMixin(models.Model):
                 system=system,
             )
 
+    def bulk_update_or_create_attributes(
+        self,
+        attributes: typing.Iterable[dict],
+        principal: User | None = None,
+    ) -> list[MetadataAttribute]:
+        """Same as `update_or_create_attribute` for many attributes at once, in a single upsert per batch.
+
+        Each attribute is a dict with the `key` and `value`, and optionally the `system` and `label` arguments
+        of `update_or_create_attribute`. When a key is repeated, its last attribute is kept.
+        """
+        content_type = ContentType.objects.get_for_model(self)
+        attributes_by_key = {
+            attribute["key"]: MetadataAttribute(
+                object_content_type=content_type,
+                object_id=self.pk,
+                key=attribute["key"],
+                value=attribute["value"],
+                label=attribute.get("label"),
+                system=attribute.get("system", False),
+                created_by=principal,
+                updated_by=principal,
+            )
+            for attribute in attributes
+        }
+        return MetadataAttribute.objects.bulk_create(
+            attributes_by_key.values(),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["object_content_type", "object_id", "key"],
+            update_fields=["value", "label", "system", "updated_by", "updated_at"],
+        )
+
     def delete_attribute(self, key: str) -> None:
         attr: MetadataAttribute = self.attributes.get(key=key)
         attr.delete()
@@ -142,3 +142,32 @@ class MetadataMixinTest(TestCase):
         self.assertEqual(attr2.created_by, self.user)
         # updated_by should be the new user
         self.assertEqual(attr2.updated_by, another_user)
+
+    def test_bulk_update_or_create_attributes(self):
+        existing = self.test_obj.update_or_create_attribute(
+            key="existing_key", value="initial_value", principal=self.user
+        )
+        another_user = User.objects.create(email="another@example.com")
+
+        # The content type is already cached, the attributes are upserted in a single query
+        with self.assertNumQueries(1):
+            self.test_obj.bulk_update_or_create_attributes(
+                [
+                    {"key": "existing_key", "value": "updated_value"},
+                    {"key": "new_key", "value": 1, "system": True},
+                    {"key": "new_key", "value": 2, "system": True, "label": "New"},
+                ],
+                principal=another_user,
+            )
+
+        attributes = {
+            attribute.key: attribute for attribute in self.test_obj.attributes.all()
+        }
+        self.assertEqual(attributes.keys(), {"existing_key", "new_key"})
+        self.assertEqual(attributes["existing_key"].id, existing.id)
+        self.assertEqual(attributes["existing_key"].value, "updated_value")
+        self.assertEqual(attributes["existing_key"].created_by, self.user)
+        self.assertEqual(attributes["existing_key"].updated_by, another_user)
+        self.assertEqual(attributes["new_key"].value, 2)
+        self.assertEqual(attributes["new_key"].label, "New")
+        self.assertTrue(attributes["new_key"].system)
@@ -0,0 +1,173 @@
+"""Fan-out of the messages and state changes of pipeline runs to the SSE streams of a worker.
+
+Each process runs a single listener thread that LISTENs for the ids of runs that logged messages
+or changed state (see `notify_pipeline_run_events`). When a run with open streams is notified,
+the new messages are read once and pushed to all of its subscribers, so that the number of queries
+depends on the number of messages written rather than on the number of viewers.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from logging import getLogger
+
+from django.db import close_old_connections, connections
+
+from .constants import PIPELINE_RUN_EVENTS_CHANNEL
+from .models import PipelineRun
+
+logger = getLogger(__name__)
+
+REFRESH_INTERVAL = 30  # seconds between reads of all the subscribed runs, in case a notification was missed
+COALESCE_DELAY = 0.2  # seconds to wait for more notifications once one is received
+RECONNECT_DELAY = 5  # seconds to wait before listening again after a connection error
+
+
+@dataclass
+class RunUpdate:
+    state: str
+    position: int  # Position of the first message in the log of the run
+    messages: list[dict]
+
+
+class Subscription:
+    """The updates of a run, consumed by one SSE stream."""
+
+    def __init__(self, broadcaster: "PipelineRunBroadcaster", run_id: str, loop):
+        self.broadcaster = broadcaster
+        self.run_id = run_id
+        self.loop = loop
+        self.queue: asyncio.Queue[RunUpdate] = asyncio.Queue()
+
+    def push(self, update: RunUpdate):
+        # Called from the listener thread
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, update)
+
+    async def get(self, timeout: float) -> RunUpdate | None:
+        """Return the next update of the run, or None if there was none within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class _RunChannel:
+    def __init__(self, position: int):
+        self.position = position
+        self.state = None
+        self.subscriptions: set[Subscription] = set()
+
+
+class PipelineRunBroadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels: dict[str, _RunChannel] = {}
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, run_id, cursor: int, loop=None) -> Subscription:
+        """Subscribe to the state changes of the run and to the messages logged after position `cursor`.
+
+        Updates can overlap with messages that the caller has already read: it is up to the caller to skip
+        the messages positioned before its own cursor.
+        """
+        subscription = Subscription(
+            self, str(run_id), loop or asyncio.get_running_loop()
+        )
+        with self._lock:
+            channel = self._channels.get(subscription.run_id)
+            if channel is None:
+                channel = self._channels[subscription.run_id] = _RunChannel(cursor)
+            channel.position = min(channel.position, cursor)
+            channel.subscriptions.add(subscription)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="pipeline-run-broadcaster", daemon=True
+                )
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            channel = self._channels.get(subscription.run_id)
+            if channel is None:
+                return
+            channel.subscriptions.discard(subscription)
+            if not channel.subscriptions:
+                del self._channels[subscription.run_id]
+
+    def refresh(self, run_ids: set[str]):
+        """Read what is new for the given runs and push it to their subscribers."""
+        with self._lock:
+            positions = {
+                run_id: self._channels[run_id].position
+                for run_id in run_ids
+                if run_id in self._channels
+            }
+        if not positions:
+            return
+
+        runs = PipelineRun.objects.filter(id__in=positions.keys()).only(
+            "id", "state", "messages"
+        )
+        for run in runs:
+            run_id = str(run.id)
+            messages = run.get_messages(after=positions[run_id])
+            with self._lock:
+                channel = self._channels.get(run_id)
+                if channel is None or (not messages and channel.state == run.state):
+                    continue
+                update = RunUpdate(run.state, positions[run_id], messages)
+                # Unless a subscriber asked for older messages in the meantime
+                if channel.position == positions[run_id]:
+                    channel.position += len(messages)
+                channel.state = run.state
+                subscriptions = list(channel.subscriptions)
+            for subscription in subscriptions:
+                try:
+                    subscription.push(update)
+                except RuntimeError:
+                    # The event loop of the stream is closed
+                    self.unsubscribe(subscription)
+
+    def _run(self):
+        listener = None
+        last_refresh = time.monotonic()
+        while True:
+            try:
+                if listener is None:
+                    listener = connections.create_connection("default")
+                    with listener.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{PIPELINE_RUN_EVENTS_CHANNEL}";')
+                    # Catch up on what happened while we were not listening
+                    with self._lock:
+                        run_ids = set(self._channels)
+                else:
+                    run_ids = self._wait(listener.connection)
+
+                if time.monotonic() - last_refresh >= REFRESH_INTERVAL:
+                    with self._lock:
+                        run_ids = set(self._channels)
+                    last_refresh = time.monotonic()
+                close_old_connections()
+                self.refresh(run_ids)
+            except Exception:
+                logger.exception("Pipeline run broadcaster error, listening again")
+                if listener is not None:
+                    listener.close()
+                    listener = None
+                time.sleep(RECONNECT_DELAY)
+
+    def _wait(self, connection) -> set[str]:
+        notifies = list(connection.notifies(timeout=REFRESH_INTERVAL, stop_after=1))
+        if notifies:
+            # Coalesce the notifications of a burst of writes into a single read per run
+            notifies += connection.notifies(timeout=COALESCE_DELAY)
+        return {notify.payload for notify in notifies}
+
+
+pipeline_run_broadcaster = PipelineRunBroadcaster()
@@ -1 +1,7 @@
 UNIQUE_PIPELINE_VERSION_NAME = "unique_pipeline_version_name"
+
+# Postgres NOTIFY channel used to wake up the pipelines runner when a run is queued
+PIPELINE_RUN_QUEUE_CHANNEL = "pipeline_run_queue"
+
+# Postgres NOTIFY channel on which the id of a run is sent when it logs messages or changes state
+PIPELINE_RUN_EVENTS_CHANNEL = "pipeline_run_events"
@@ -0,0 +1,195 @@
+"""Measure the throughput of the pipeline scheduler and runner without containers.
+
+Synthetic pipelines are created in a dedicated workspace and made due. They are launched through
+the scheduler, and the resulting runs are supervised by the pool runner with the fake spawner. The
+runner only claims the runs of the synthetic pipelines, and the synthetic data is deleted at the
+end.
+"""
+
+import math
+import statistics
+import threading
+import uuid
+from time import monotonic, sleep
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.utils import timezone
+
+from hexa.pipelines.management.commands.pipelines_runner import (
+    FakeSpawner,
+    RunSupervisor,
+)
+from hexa.pipelines.management.commands.pipelines_scheduler import (
+    get_due_pipelines,
+    launch_scheduled_pipeline,
+)
+from hexa.pipelines.models import Pipeline, PipelineRun, PipelineRunState, PipelineType
+from hexa.user_management.models import Organization
+from hexa.workspaces.models import Workspace
+
+
+class QueryCounter:
+    """Count the queries executed on all the connections, including those of the runner threads."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self.install)
+        for conn in connections.all(initialized_only=True):
+            self.install(connection=conn)
+        return self
+
+    def __exit__(self, *args):
+        connection_created.disconnect(self.install)
+        for conn in connections.all(initialized_only=True):
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+
+class Command(BaseCommand):
+    help = "Push synthetic runs through the pipeline scheduler and runner, using the fake spawner"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs", type=int, default=1000, help="Number of runs to launch"
+        )
+        parser.add_argument(
+            "--max-concurrency",
+            type=int,
+            default=100,
+            help="Maximum number of runs supervised at the same time",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=1,
+            help="Duration of the simulated containers, in seconds",
+        )
+        parser.add_argument(
+            "--failure-rate",
+            type=float,
+            default=0,
+            help="Share of the simulated containers that fail",
+        )
+        parser.add_argument(
+            "--tick-interval",
+            type=float,
+            default=1,
+            help="Seconds between two ticks of the runner",
+        )
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.create(name="Pipelines benchmark")
+        workspace = Workspace.objects.create(
+            name="Pipelines benchmark",
+            slug=f"benchmark-{uuid.uuid4().hex[:8]}",
+            organization=organization,
+        )
+        try:
+            pipeline_ids = self.create_pipelines(workspace, options["runs"])
+            self.benchmark_scheduler(pipeline_ids)
+            self.benchmark_runner(workspace, options)
+        finally:
+            Pipeline.all_objects.filter(workspace=workspace).hard_delete()
+            workspace.delete()
+            organization.hard_delete()
+
+    def create_pipelines(self, workspace: Workspace, count: int) -> set[str]:
+        now = timezone.now()
+        pipelines = Pipeline.objects.bulk_create(
+            [
+                Pipeline(
+                    workspace=workspace,
+                    name=f"Benchmark {i}",
+                    code=f"benchmark-{i}",
+                    type=PipelineType.NOTEBOOK,
+                    notebook_path="benchmark.ipynb",
+                    schedule="0 0 * * *",
+                    next_execution_at=now,
+                )
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+        return {str(pipeline.id) for pipeline in pipelines}
+
+    def benchmark_scheduler(self, pipeline_ids: set[str]):
+        with QueryCounter() as counter:
+            start = monotonic()
+            due = [
+                entry
+                for entry in get_due_pipelines(timezone.now())
+                if entry[1] in pipeline_ids
+            ]
+            for execution_date, pipeline_id in sorted(due):
+                launch_scheduled_pipeline(pipeline_id, execution_date)
+            elapsed = monotonic() - start
+
+        self.report("Scheduler", len(due), elapsed, counter.count)
+
+    def benchmark_runner(self, workspace: Workspace, options):
+        # A subquery rather than a join, so that only the runs are locked when claimed
+        runs = PipelineRun.objects.filter(
+            pipeline__in=Pipeline.all_objects.filter(workspace=workspace).values("id")
+        )
+        spawner = FakeSpawner(options["duration"], options["failure_rate"])
+
+        with QueryCounter() as counter:
+            start = monotonic()
+            supervisor = RunSupervisor(
+                options["max_concurrency"], spawner=spawner, runs=runs
+            )
+            try:
+                while True:
+                    supervisor.tick()
+                    if (
+                        not supervisor.futures
+                        and not runs.filter(
+                            state__in=[
+                                PipelineRunState.QUEUED,
+                                PipelineRunState.RUNNING,
+                            ]
+                        ).exists()
+                    ):
+                        break
+                    sleep(options["tick_interval"])
+            finally:
+                supervisor.shutdown()
+            elapsed = monotonic() - start
+
+        self.report("Runner", runs.count(), elapsed, counter.count)
+
+        latencies = sorted(
+            (spawner.containers[run.id].created_at - run.execution_date).total_seconds()
+            for run in runs.only("id", "execution_date")
+            if run.id in spawner.containers
+        )
+        if latencies:
+            p95 = latencies[max(0, math.ceil(len(latencies) * 0.95) - 1)]
+            self.stdout.write(
+                f"  time to start: p50 {statistics.median(latencies):.3f}s, "
+                f"p95 {p95:.3f}s, max {latencies[-1]:.3f}s"
+            )
+        for row in runs.values("state").annotate(count=Count("id")).order_by("state"):
+            self.stdout.write(f"  {row['state']}: {row['count']}")
+
+    def report(self, name: str, count: int, elapsed: float, queries: int):
+        self.stdout.write(
+            f"{name}: {count} runs in {elapsed:.2f}s "
+            f"({count / elapsed if elapsed else 0:.1f} runs/s), "
+            f"{queries} queries ({queries / count if count else 0:.1f} per run)"
+        )
@@ -1,33 +1,64 @@
 import base64
 import json
 import os
+import queue
+import random
 import signal
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from enum import Enum
 from logging import getLogger
-from time import sleep
+from time import monotonic, sleep
+from typing import Iterator
 
 import docker
+import psycopg
 import requests
 import urllib3
 from django import db
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.core.signing import Signer
+from django.db import transaction
+from django.db.models import F, QuerySet
 from django.utils import timezone
 from kubernetes import config as k8s_config
+from kubernetes import watch as k8s_watch
 from kubernetes.client import CoreV1Api
 from kubernetes.client import models as k8s
 from kubernetes.client.rest import ApiException
 
 from hexa.files import storage
-from hexa.pipelines.models import PipelineRun, PipelineRunState, PipelineType
+from hexa.pipelines.constants import PIPELINE_RUN_QUEUE_CHANNEL
+from hexa.pipelines.models import (
+    PipelineRun,
+    PipelineRunLogChunk,
+    PipelineRunState,
+    PipelineType,
+)
 from hexa.pipelines.utils import generate_pipeline_container_name, mail_run_recipients
 
 logger = getLogger(__name__)
 
 HEARTBEAT_TIMEOUT = 15 * 60  # 15 minutes
+# A RUNNING run without heartbeat for this long is no longer supervised by any runner
+ORPHAN_HEARTBEAT_TIMEOUT = 60
+ZOMBIE_REAPING_INTERVAL = 60
+# Queued runs are picked up on NOTIFY, the queue is polled at this interval as a fallback
+QUEUE_POLL_INTERVAL = 60
+# Container logs are stored in chunks of at most LOG_CHUNK_SIZE bytes, written at least every LOG_FLUSH_INTERVAL
+LOG_CHUNK_SIZE = 256 * 1024
+LOG_FLUSH_INTERVAL = 5
+LOG_FOLLOW_BUFFER = (
+    16  # number of chunks read ahead from the container before it is throttled
+)
+LOG_FOLLOW_RETRY_INTERVAL = 2
+LOG_FOLLOW_TIMEOUT = (
+    10  # seconds to wait for the end of the container logs once the run is over
+)
+FAKE_POLL_INTERVAL = 1  # seconds between two checks of a simulated container
 
 
 def setup_child_process_reaping():
@@ -46,6 +77,9 @@ class PodTerminationReason(Enum):
     DeadlineExceeded = "DeadlineExceeded"
 
 
+POD_TERMINAL_PHASES = {"Succeeded", "Failed"}
+
+
 def load_local_dev_kubernetes_config():
     """Load Kubernetes config for local dev (Docker Desktop for Mac/Windows)."""
     import tempfile
@@ -250,25 +284,389 @@ def attach_to_pod_kube(run: PipelineRun):
     )
 
     if not pod_list.items:
-        logger.info("No pod found for run %s, exiting attachment process", run.id)
-        sys.exit(0)
+        logger.info("No pod found for run %s", run.id)
+        return None
 
     return pod_list.items[0]
 
 
-def monitor_pod_kube(run: PipelineRun, pod):
-    """Monitor a Kubernetes pod until completion and return success status and logs."""
+class PodWatcher:
+    """Follow the pods of all pipeline runs through a single Kubernetes watch stream.
+
+    The latest known state of the pods of the runs supervised by this process (see `watch`) is kept
+    in memory, so that monitors do not have to poll the Kubernetes API and are woken up as soon as a
+    pod completes. The events of the other pods are ignored, and the state of a pod is dropped when
+    its run is forgotten.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.pods = {}
+        # Ids of the runs supervised by this process, as strings
+        self.supervised = set()
+        self.synced = False
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._watch = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="pod-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._watch is not None:
+            self._watch.stop()
+
+    def _run(self):
+        v1 = CoreV1Api()
+        resource_version = None
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    pod_list = v1.list_namespaced_pod(
+                        namespace=self.namespace, label_selector="hexa-run-id"
+                    )
+                    with self._condition:
+                        self.pods = {
+                            pod.metadata.labels["hexa-run-id"]: pod
+                            for pod in pod_list.items
+                            if pod.metadata.labels["hexa-run-id"] in self.supervised
+                        }
+                        self.synced = True
+                        self._condition.notify_all()
+                    resource_version = pod_list.metadata.resource_version
+
+                self._watch = k8s_watch.Watch()
+                for event in self._watch.stream(
+                    v1.list_namespaced_pod,
+                    namespace=self.namespace,
+                    label_selector="hexa-run-id",
+                    resource_version=resource_version,
+                    timeout_seconds=300,
+                ):
+                    pod = event["object"]
+                    resource_version = pod.metadata.resource_version
+                    self._update(event["type"], pod)
+            except ApiException as e:
+                if e.status == 410:
+                    # our resource version is too old, start over from a fresh listing
+                    resource_version = None
+                    continue
+                logger.exception("Pod watch error")
+                self._mark_unsynced()
+                resource_version = None
+                self._stopped.wait(5)
+            except Exception:
+                logger.exception("Pod watch error")
+                self._mark_unsynced()
+                resource_version = None
+                self._stopped.wait(5)
+
+    def _mark_unsynced(self):
+        with self._condition:
+            self.synced = False
+
+    def _update(self, event_type: str, pod):
+        run_id = pod.metadata.labels.get("hexa-run-id")
+        if run_id is None:
+            return
+        if event_type == "DELETED" and pod.status.phase not in POD_TERMINAL_PHASES:
+            # the pod disappeared before completing: there is nothing left to wait for
+            pod.status.phase = "Failed"
+        with self._condition:
+            if run_id not in self.supervised:
+                # pod of a run supervised by another process, or of a run that was forgotten (its
+                # pod is deleted once monitored)
+                self.pods.pop(run_id, None)
+                return
+            # the state of a deleted pod is kept for its monitor until the run is forgotten
+            self.pods[run_id] = pod
+            self._condition.notify_all()
+
+    def watch(self, run_id, pod=None):
+        """Start keeping the state of the pod of the run, until `forget` is called.
+
+        The pod returned when creating or attaching to it is kept until the stream sends a newer
+        state: a pod whose phase does not change anymore gets no further event.
+        """
+        with self._condition:
+            self.supervised.add(str(run_id))
+            if pod is not None:
+                self.pods.setdefault(str(run_id), pod)
+
+    def get(self, run_id):
+        with self._condition:
+            return self.pods.get(str(run_id))
+
+    def wait(self, run_id, timeout: float):
+        """Wait until the pod of the run reaches a terminal phase, at most `timeout` seconds."""
+
+        def is_terminal():
+            pod = self.pods.get(str(run_id))
+            return pod is not None and pod.status.phase in POD_TERMINAL_PHASES
+
+        with self._condition:
+            self._condition.wait_for(is_terminal, timeout=timeout)
+            return self.pods.get(str(run_id))
+
+    def forget(self, run_id):
+        with self._condition:
+            self.supervised.discard(str(run_id))
+            self.pods.pop(str(run_id), None)
+
+
+class HeartbeatBatcher:
+    """Collect the heartbeats of the runs supervised by this process and write them in bulk.
+
+    Monitors only record their heartbeat in memory. The supervisor then flushes them with a single
+    UPDATE per tick, and reads the runs that have been flagged as TERMINATING with a single query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._beats = set()
+        self._terminating = set()
+
+    def beat(self, run_id):
+        with self._lock:
+            self._beats.add(run_id)
+
+    def is_terminating(self, run_id) -> bool:
+        with self._lock:
+            return run_id in self._terminating
+
+    def flush(self, run_ids):
+        with self._lock:
+            beats, self._beats = self._beats, set()
+        if beats:
+            PipelineRun.objects.filter(id__in=beats).update(
+                last_heartbeat=timezone.now()
+            )
+        terminating = (
+            set(
+                PipelineRun.objects.filter(
+                    id__in=list(run_ids), state=PipelineRunState.TERMINATING
+                ).values_list("id", flat=True)
+            )
+            if run_ids
+            else set()
+        )
+        with self._lock:
+            self._terminating = terminating
+
+
+def heartbeat(run: PipelineRun, heartbeats: HeartbeatBatcher = None):
+    """Record that the run is still being monitored and refresh its state.
+
+    Only the `last_heartbeat` column is written: saving the whole run would rewrite its (possibly
+    large) messages, outputs and logs, and could overwrite concurrent updates of those.
+    """
+    if heartbeats is not None:
+        heartbeats.beat(run.id)
+        if heartbeats.is_terminating(run.id):
+            run.state = PipelineRunState.TERMINATING
+        return
+
+    PipelineRun.objects.filter(id=run.id).update(last_heartbeat=timezone.now())
+    run.state = PipelineRun.objects.only("state").get(id=run.id).state
+
+
+class RunLogWriter:
+    """Append the output of a run to its chunked log store (see `PipelineRunLogChunk`).
+
+    Output is buffered up to LOG_CHUNK_SIZE bytes or LOG_FLUSH_INTERVAL seconds before being written,
+    so that users can follow the logs of a run while it is going on. Once the log exceeds
+    PIPELINE_RUN_LOGS_MAX_SIZE, its oldest chunks are deleted so that only its tail is retained.
+    """
+
+    def __init__(self, run: PipelineRun):
+        self.run = run
+        self.size = run.logs_size
+        self.buffer = bytearray()
+        self.last_flush = monotonic()
+
+    def reset(self):
+        PipelineRunLogChunk.objects.filter(run_id=self.run.id).delete()
+        PipelineRun.objects.filter(id=self.run.id).update(logs_size=0, run_logs=None)
+        self.run.logs_size = self.size = 0
+        self.run.run_logs = None
+        self.buffer.clear()
+
+    def write(self, data: bytes | str):
+        self.buffer += data.encode() if isinstance(data, str) else data
+        while len(self.buffer) >= LOG_CHUNK_SIZE:
+            self._write_chunk(LOG_CHUNK_SIZE)
+
+    def write_line(self, line: str):
+        self.write(f"{line}\n")
+
+    def flush(self, force: bool = True):
+        if self.buffer and (
+            force or monotonic() - self.last_flush >= LOG_FLUSH_INTERVAL
+        ):
+            self._write_chunk(len(self.buffer))
+
+    def _write_chunk(self, size: int):
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        with transaction.atomic():
+            PipelineRunLogChunk.objects.create(
+                run_id=self.run.id, offset=self.size, size=len(data), data=data
+            )
+            self.size += len(data)
+            PipelineRun.objects.filter(id=self.run.id).update(logs_size=self.size)
+            if self.size > settings.PIPELINE_RUN_LOGS_MAX_SIZE:
+                PipelineRunLogChunk.objects.alias(
+                    end_offset=F("offset") + F("size")
+                ).filter(
+                    run_id=self.run.id,
+                    end_offset__lte=self.size - settings.PIPELINE_RUN_LOGS_MAX_SIZE,
+                ).delete()
+        self.run.logs_size = self.size
+        self.last_flush = monotonic()
+
+
+class LogFollower:
+    """Follow the output of a container from a background thread.
+
+    `open_stream` returns an iterator over the output of the container. It is opened again when
+    the container has not started yet or when the stream breaks, skipping what was already read.
+    Chunks are handed over in a bounded queue and written to the log store by the thread that
+    monitors the run, so that the memory used by a run does not depend on the size of its logs.
+    """
+
+    def __init__(self, open_stream):
+        self.open_stream = open_stream
+        self.chunks = queue.Queue(maxsize=LOG_FOLLOW_BUFFER)
+        self.read = 0
+        self._stopping = threading.Event()
+        self._abandoned = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="pipeline-run-logs", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            last_attempt = self._stopping.is_set()
+            try:
+                self._follow()
+            except Exception as e:  # NOQA
+                if last_attempt:
+                    logger.warning("Could not get logs (%s)", e)
+                    return
+                # the container may not have started yet
+                self._stopping.wait(LOG_FOLLOW_RETRY_INTERVAL)
+            else:
+                # the stream ends with the container, or when the connection is dropped: follow it
+                # again unless the run is over
+                if last_attempt or self._stopping.wait(LOG_FOLLOW_RETRY_INTERVAL):
+                    return
+            if self._abandoned.is_set():
+                return
+
+    def _follow(self):
+        skip = self.read
+        for data in self.open_stream():
+            if skip >= len(data):
+                skip -= len(data)
+                continue
+            data, skip = data[skip:], 0
+            while True:
+                try:
+                    self.chunks.put(data, timeout=1)
+                    break
+                except queue.Full:
+                    if self._abandoned.is_set():
+                        return
+            self.read += len(data)
+
+    def drain(self, log: RunLogWriter):
+        while True:
+            try:
+                log.write(self.chunks.get_nowait())
+            except queue.Empty:
+                return
+
+    def finish(self, log: RunLogWriter, timeout: float = LOG_FOLLOW_TIMEOUT):
+        """Wait for the end of the container output and write what is left of it to `log`."""
+        self._stopping.set()
+        deadline = monotonic() + timeout
+        while self._thread.is_alive() and monotonic() < deadline:
+            try:
+                log.write(self.chunks.get(timeout=0.5))
+            except queue.Empty:
+                pass
+        if self._thread.is_alive():
+            logger.warning("Gave up waiting for the end of the container logs")
+            self._abandoned.set()
+        self.drain(log)
+        log.flush()
+
+
+def stream_pod_logs(v1: CoreV1Api, pod, container_name: str, follow: bool = False):
+    """Return an iterator over the output of the pipeline container of the pod, in chunks of bytes."""
+    response = v1.read_namespaced_pod_log(
+        name=pod.metadata.name,
+        namespace=pod.metadata.namespace,
+        container=container_name,
+        follow=follow,
+        _preload_content=False,
+    )
+
+    def chunks():
+        try:
+            yield from response.stream(LOG_CHUNK_SIZE)
+        finally:
+            response.release_conn()
+
+    return chunks()
+
+
+def monitor_pod_kube(
+    run: PipelineRun,
+    pod,
+    pod_watcher: PodWatcher = None,
+    heartbeats: HeartbeatBatcher = None,
+    log: RunLogWriter = None,
+) -> bool:
+    """Monitor a Kubernetes pod until completion, store its logs as they come and return its success status.
+
+    When a `pod_watcher` is provided (and in sync with the cluster), the pod state is read from
+    the shared watch stream instead of polling the Kubernetes API.
+    """
     v1 = CoreV1Api()
     container_name = generate_pipeline_container_name(run)
+    log = log or RunLogWriter(run)
+    if pod_watcher is not None:
+        pod_watcher.watch(run.id, pod)
+    follower = LogFollower(
+        lambda: stream_pod_logs(v1, pod, container_name, follow=True)
+    ).start()
 
     # monitor the pod
     while True:
-        start_time = timezone.now()
-        run.refresh_from_db()
-        run.last_heartbeat = start_time
-        run.save()
-
-        remote_pod = v1.read_namespaced_pod(pod.metadata.name, pod.metadata.namespace)
+        heartbeat(run, heartbeats)
+        follower.drain(log)
+        log.flush(force=False)
+
+        remote_pod = (
+            pod_watcher.get(run.id)
+            if pod_watcher is not None and pod_watcher.synced
+            else None
+        )
+        if remote_pod is None:
+            # no watch stream, or the pod has just been created and was not seen by it yet
+            remote_pod = v1.read_namespaced_pod(
+                pod.metadata.name, pod.metadata.namespace
+            )
 
         # if the run is flagged as TERMINATING stop the loop
         if run.state == PipelineRunState.TERMINATING:
@@ -278,33 +676,34 @@ def monitor_pod_kube(run: PipelineRun, pod):
         if (
             remote_pod
             and remote_pod.status
-            and remote_pod.status.phase in {"Succeeded", "Failed"}
+            and remote_pod.status.phase in POD_TERMINAL_PHASES
         ):
             break
-        sleep(5)
 
-    # download logs
-    try:
-        stdout = v1.read_namespaced_pod_log(
-            name=pod.metadata.name,
-            namespace=pod.metadata.namespace,
-            container=container_name,
-        )
-    except Exception as e:  # NOQA
-        logger.exception("Could not get logs (%s)", e)
-        stdout = ""
+        if pod_watcher is not None and pod_watcher.synced:
+            pod_watcher.wait(run.id, timeout=5)
+        else:
+            sleep(5)
+
+    if pod_watcher is not None:
+        pod_watcher.forget(run.id)
+
+    # get the end of the logs, unless the run is being stopped
+    follower.finish(
+        log,
+        timeout=0 if run.state == PipelineRunState.TERMINATING else LOG_FOLLOW_TIMEOUT,
+    )
 
     # check termination reason
     if remote_pod.status.reason == PodTerminationReason.DeadlineExceeded.value:
-        reason = f"Timeout killed run {run.pipeline.name} #{run.id}"
-        stdout = "\n".join([stdout, reason])
+        log.write_line(f"Timeout killed run {run.pipeline.name} #{run.id}")
 
     grace_period = None
 
     if run.state == PipelineRunState.TERMINATING:
-        reason = f"Stop signal sent to run {run.pipeline.name} #{run.id}."
-        stdout = "\n".join([stdout, reason])
+        log.write_line(f"Stop signal sent to run {run.pipeline.name} #{run.id}.")
         grace_period = 0
+    log.flush()
 
     # delete terminated pod
     try:
@@ -319,13 +718,11 @@ def monitor_pod_kube(run: PipelineRun, pod):
         if e.status != 404:
             logger.exception("pod delete")
 
-    success = (
+    return (
         remote_pod.status.phase == "Succeeded"
         and run.state != PipelineRunState.TERMINATING
     )
 
-    return success, stdout
-
 
 def _get_docker_client():
     try:
@@ -396,40 +793,239 @@ def attach_to_container_docker(run: PipelineRun):
     try:
         container = docker_client.containers.get(container_name)
     except docker.errors.NotFound:
-        logger.info("No container found for run %s, exiting attachment process", run.id)
-        sys.exit(0)
+        logger.info("No container found for run %s", run.id)
+        return None
 
     logger.info("Re-attached to container %s for run %s", container.id, run.id)
     return container
 
 
-def monitor_container_docker(run: PipelineRun, container):
-    while True:
-        run.refresh_from_db()
-        run.last_heartbeat = timezone.now()
-        run.save()
-        # we stop the running process when the run state is a terminating
-        if run.state == PipelineRunState.TERMINATING:
-            container.kill()
-            return False, container.logs().decode("UTF-8")
+def monitor_container_docker(
+    run: PipelineRun,
+    container,
+    heartbeats: HeartbeatBatcher = None,
+    log: RunLogWriter = None,
+) -> bool:
+    """Monitor a Docker container until completion, store its logs as they come and return its success status."""
+    log = log or RunLogWriter(run)
+    follower = LogFollower(lambda: container.logs(stream=True, follow=True)).start()
+    try:
+        while True:
+            heartbeat(run, heartbeats)
+            follower.drain(log)
+            log.flush(force=False)
+            # we stop the running process when the run state is a terminating
+            if run.state == PipelineRunState.TERMINATING:
+                container.kill()
+                return False
+
+            try:
+                logger.debug("Wait for container %s", container.id)
+                r = container.wait(timeout=1)
+                follower.finish(log)
+                container.remove()
+                return r["StatusCode"] == 0
+            except (
+                urllib3.exceptions.ReadTimeoutError,
+                requests.exceptions.ReadTimeout,
+                requests.exceptions.ConnectionError,
+            ):
+                logger.debug("Container wait timeout")
+                continue
+            except Exception as e:
+                logger.exception("Container wait error", exc_info=True)
+                log.write_line(str(e))
+                return False
+    finally:
+        follower.finish(log)
+
+
+class Spawner:
+    """Backend running the containers of pipeline runs.
+
+    The runner only goes through this interface: a spawner creates the container of a run (or
+    attaches to the one left behind by a previous runner), watches it until completion while
+    storing its output, streams its logs and kills it.
+    """
+
+    name: str
+
+    def start(self):
+        """Set up the resources shared by all the runs supervised by this process."""
+
+    def stop(self):
+        """Release the resources acquired in `start`."""
 
+    def create(self, run: PipelineRun, image: str, env_vars: dict):
+        """Start the container of the run and return it."""
+        raise NotImplementedError
+
+    def attach(self, run: PipelineRun):
+        """Return the existing container of the run, or None when there is none left."""
+        raise NotImplementedError
+
+    def watch(
+        self,
+        run: PipelineRun,
+        container,
+        heartbeats: HeartbeatBatcher = None,
+        log: RunLogWriter = None,
+    ) -> bool:
+        """Wait for the completion of the container, store its logs and return its success status."""
+        raise NotImplementedError
+
+    def logs(
+        self, run: PipelineRun, container, follow: bool = False
+    ) -> Iterator[bytes]:
+        """Return an iterator over the output of the container, in chunks of bytes."""
+        raise NotImplementedError
+
+    def kill(self, run: PipelineRun, container):
+        raise NotImplementedError
+
+
+class DockerSpawner(Spawner):
+    name = "docker"
+
+    def create(self, run, image, env_vars):
+        return create_container_docker(run, image, env_vars)
+
+    def attach(self, run):
+        return attach_to_container_docker(run)
+
+    def watch(self, run, container, heartbeats=None, log=None):
+        return monitor_container_docker(run, container, heartbeats, log)
+
+    def logs(self, run, container, follow=False):
+        return container.logs(stream=True, follow=follow)
+
+    def kill(self, run, container):
+        container.kill()
+
+
+class KubernetesSpawner(Spawner):
+    """Run the pipelines in pods. Once started, the pods of all runs are followed by a single `PodWatcher`."""
+
+    name = "kubernetes"
+
+    def __init__(self):
+        self.pod_watcher = None
+
+    def start(self):
+        is_local_dev = os.environ.get("IS_LOCAL_DEV", "false").lower() == "true"
+        k8s_config.load_incluster_config() if not is_local_dev else load_local_dev_kubernetes_config()
+        self.pod_watcher = PodWatcher(os.environ.get("PIPELINE_NAMESPACE", "default"))
+        self.pod_watcher.start()
+
+    def stop(self):
+        if self.pod_watcher is not None:
+            self.pod_watcher.stop()
+
+    def create(self, run, image, env_vars):
+        return create_pod_kube(run, image, env_vars)
+
+    def attach(self, run):
+        return attach_to_pod_kube(run)
+
+    def watch(self, run, container, heartbeats=None, log=None):
+        return monitor_pod_kube(run, container, self.pod_watcher, heartbeats, log)
+
+    def logs(self, run, container, follow=False):
+        return stream_pod_logs(
+            CoreV1Api(), container, generate_pipeline_container_name(run), follow
+        )
+
+    def kill(self, run, container):
         try:
-            logger.debug("Wait for container %s", container.id)
-            r = container.wait(timeout=1)
-            status_code = r["StatusCode"] == 0
-            logs = container.logs().decode("UTF-8")
-            container.remove()
-            return status_code, logs
-        except (
-            urllib3.exceptions.ReadTimeoutError,
-            requests.exceptions.ReadTimeout,
-            requests.exceptions.ConnectionError,
-        ):
-            logger.debug("Container wait timeout")
-            continue
-        except Exception as e:
-            logger.exception("Container wait error", exc_info=True)
-            return False, str(e)
+            CoreV1Api().delete_namespaced_pod(
+                name=container.metadata.name,
+                namespace=container.metadata.namespace,
+                body=k8s.V1DeleteOptions(),
+                grace_period_seconds=0,
+            )
+        except ApiException as e:
+            if e.status != 404:
+                raise
+
+
+class FakeContainer:
+    def __init__(self, run_id, duration: float, exit_code: int):
+        self.run_id = run_id
+        self.created_at = timezone.now()
+        self.started = monotonic()
+        self.duration = duration
+        self.exit_code = exit_code
+        self.killed = False
+
+    @property
+    def remaining(self) -> float:
+        return 0 if self.killed else self.duration - (monotonic() - self.started)
+
+
+class FakeSpawner(Spawner):
+    """Simulate the containers of the runs in-process, without Docker or Kubernetes.
+
+    Every container lasts `duration` seconds, outputs a few lines of logs and fails with a
+    probability of `failure_rate`. Used to measure the runner on its own (see `pipelines_benchmark`).
+    """
+
+    name = "fake"
+
+    def __init__(self, duration: float = 1, failure_rate: float = 0):
+        self.duration = duration
+        self.failure_rate = failure_rate
+        self.containers = {}
+
+    def create(self, run, image, env_vars):
+        container = FakeContainer(
+            run.id, self.duration, 1 if random.random() < self.failure_rate else 0
+        )
+        self.containers[run.id] = container
+        return container
+
+    def attach(self, run):
+        if run.id not in self.containers:
+            logger.info("No container found for run %s", run.id)
+            return None
+        return self.containers[run.id]
+
+    def watch(self, run, container, heartbeats=None, log=None):
+        log = log or RunLogWriter(run)
+        while True:
+            heartbeat(run, heartbeats)
+            if run.state == PipelineRunState.TERMINATING:
+                self.kill(run, container)
+                break
+            if container.remaining <= 0:
+                break
+            sleep(min(FAKE_POLL_INTERVAL, container.remaining))
+
+        for data in self.logs(run, container):
+            log.write(data)
+        log.flush()
+        return container.exit_code == 0 and not container.killed
+
+    def logs(self, run, container, follow=False):
+        yield f"Simulating run {run.id}\n".encode()
+        if container.killed:
+            yield b"Killed\n"
+        else:
+            yield f"Exited with code {container.exit_code}\n".encode()
+
+    def kill(self, run, container):
+        container.killed = True
+
+
+SPAWNERS = {
+    spawner_class.name: spawner_class
+    for spawner_class in (DockerSpawner, KubernetesSpawner, FakeSpawner)
+}
+
+
+def get_spawner(name: str = None) -> Spawner | None:
+    """Return a new spawner of the given kind (PIPELINE_SCHEDULER_SPAWNER by default)."""
+    spawner_class = SPAWNERS.get(name or settings.PIPELINE_SCHEDULER_SPAWNER)
+    return spawner_class() if spawner_class is not None else None
 
 
 def run_pipeline(run: PipelineRun, create_container: bool = True):
@@ -442,6 +1038,21 @@ def run_pipeline(run: PipelineRun, create_container: bool = True):
 
     # force a cycle of the DB connection to stop interference with parent
     db.connections.close_all()
+    if not execute_run(run, create_container):
+        sys.exit(1)
+    sys.exit()
+
+
+def execute_run(
+    run: PipelineRun,
+    create_container: bool = True,
+    spawner: Spawner = None,
+    heartbeats: HeartbeatBatcher = None,
+) -> bool:
+    """Spawn (or re-attach to) the container of a run, wait for its completion and store the outcome.
+
+    Returns False if the spawner failed to handle the run.
+    """
     run.refresh_from_db()
 
     # stringify env vars for kubernetes deployment
@@ -463,44 +1074,73 @@ def run_pipeline(run: PipelineRun, create_container: bool = True):
         if run.pipeline.workspace.docker_image
         else settings.DEFAULT_WORKSPACE_IMAGE
     )
-    spawner = settings.PIPELINE_SCHEDULER_SPAWNER
+    spawner = spawner or get_spawner()
+    spawner_name = (
+        spawner.name if spawner is not None else settings.PIPELINE_SCHEDULER_SPAWNER
+    )
 
     time_start = timezone.now()
-    base_logs = f"Running {run.pipeline.code} pipeline with the {spawner} spawner using the {image} image"
+    log = RunLogWriter(run)
+
+    def start_log():
+        # containers are followed from the start, including when re-attaching to them: the logs
+        # stored so far are replaced, once there is a container to get them from again
+        log.reset()
+        log.write_line(
+            f"Running {run.pipeline.code} pipeline with the {spawner_name} spawner using the {image} image"
+        )
+
+    if create_container:
+        start_log()
 
     try:
-        if spawner == "docker":
-            container = (
-                create_container_docker(run, image, env_vars)
-                if create_container
-                else attach_to_container_docker(run)
-            )
-            success, container_logs = monitor_container_docker(run, container)
-        elif spawner == "kubernetes":
-            pod = (
-                create_pod_kube(run, image, env_vars)
-                if create_container
-                else attach_to_pod_kube(run)
-            )
-            success, container_logs = monitor_pod_kube(run, pod)
+        if spawner is not None:
+            if create_container:
+                container = spawner.create(run, image, env_vars)
+            else:
+                container = spawner.attach(run)
+                if container is not None:
+                    start_log()
+            if container is None:
+                # the container is gone (and its outcome with it): end the run rather than leaving it
+                # RUNNING, to be claimed again by the next runner looking for orphaned runs. Its
+                # stored logs are kept.
+                run.refresh_from_db()
+                append_run_log(
+                    run,
+                    f"No container left to re-attach to for run {run.pipeline.name} #{run.id}",
+                )
+                run.state = (
+                    PipelineRunState.STOPPED
+                    if run.state == PipelineRunState.TERMINATING
+                    else PipelineRunState.FAILED
+                )
+                run.duration = timezone.now() - run.execution_date
+                run.save()
+                logger.warning("No container left for run: %s", run)
+                if run.send_mail_notifications:
+                    mail_run_recipients(run)
+                return True
+            success = spawner.watch(run, container, heartbeats, log)
         else:
             logger.error(
                 "Scheduler spawner %s not found", settings.PIPELINE_SCHEDULER_SPAWNER
             )
-            success, container_logs = False, ""
+            success = False
     except Exception as e:
+        log.write_line(str(e))
+        log.flush()
         run.state = PipelineRunState.FAILED
         run.duration = timezone.now() - time_start
-        run.run_logs = "\n".join([base_logs, str(e)])
         run.save()
         logger.exception("Failure of run: %s", run)
         if run.send_mail_notifications:
             mail_run_recipients(run)
-        sys.exit(1)
+        return False
 
+    log.flush()
     run.refresh_from_db()
     run.duration = timezone.now() - time_start
-    run.run_logs = "\n".join([base_logs, container_logs])
 
     if run.state == PipelineRunState.TERMINATING:
         run.state = PipelineRunState.STOPPED
@@ -512,8 +1152,136 @@ def run_pipeline(run: PipelineRun, create_container: bool = True):
     if run.send_mail_notifications:
         mail_run_recipients(run)
     logger.info("End of run pipeline: %s", run)
+    return True
 
-    sys.exit()
+
+def supervise_run(
+    run_id,
+    create_container: bool = True,
+    spawner: Spawner = None,
+    heartbeats: HeartbeatBatcher = None,
+):
+    """Entrypoint of the pool workers: handle a single run in the current thread."""
+    try:
+        execute_run(
+            PipelineRun.objects.get(id=run_id),
+            create_container,
+            spawner,
+            heartbeats,
+        )
+    except Exception:
+        logger.exception("Could not supervise run %s", run_id)
+    finally:
+        # every pool thread holds its own connection, give it back once the run is over
+        db.connection.close()
+
+
+def claim_queued_runs(limit: int, queryset: QuerySet = None) -> list[PipelineRun]:
+    """Mark up to `limit` QUEUED runs (among `queryset`, defaults to all runs) as RUNNING and return them.
+
+    Rows locked by another runner are skipped so that several runners can share the queue.
+    """
+    queryset = PipelineRun.objects.all() if queryset is None else queryset
+    with transaction.atomic():
+        runs = list(
+            queryset.select_for_update(skip_locked=True)
+            .filter(state=PipelineRunState.QUEUED)
+            .order_by("execution_date")[:limit]
+        )
+        for run in runs:
+            run.state = PipelineRunState.RUNNING
+            run.last_heartbeat = timezone.now()
+            run.save(update_fields=["state", "last_heartbeat", "updated_at"])
+    return runs
+
+
+def claim_orphaned_runs(
+    limit: int, exclude_ids=(), queryset: QuerySet = None
+) -> list[PipelineRun]:
+    """Claim up to `limit` RUNNING runs (among `queryset`, defaults to all runs) that are no longer
+    supervised by any runner.
+
+    A run is considered orphaned when its heartbeat is older than ORPHAN_HEARTBEAT_TIMEOUT. The
+    heartbeat is bumped while the rows are locked so that other runners do not claim them as well.
+    """
+    queryset = PipelineRun.objects.all() if queryset is None else queryset
+    with transaction.atomic():
+        runs = list(
+            queryset.select_for_update(skip_locked=True)
+            .filter(
+                state=PipelineRunState.RUNNING,
+                last_heartbeat__lt=timezone.now()
+                - timedelta(seconds=ORPHAN_HEARTBEAT_TIMEOUT),
+            )
+            .exclude(id__in=list(exclude_ids))
+            .order_by("execution_date")[:limit]
+        )
+        PipelineRun.objects.filter(id__in=[run.id for run in runs]).update(
+            last_heartbeat=timezone.now()
+        )
+    return runs
+
+
+class RunSupervisor:
+    """Supervise all the active runs of this runner from a single process.
+
+    Each run is handled by a thread of a bounded pool, instead of a forked process per run. Runs
+    above `max_concurrency` stay QUEUED until a slot is freed (or another runner claims them). When
+    `runs` is given, only these runs are claimed.
+    """
+
+    def __init__(
+        self, max_concurrency: int, spawner: Spawner = None, runs: QuerySet = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.runs = runs
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="pipeline-run"
+        )
+        self.futures = {}
+        self.heartbeats = HeartbeatBatcher()
+        self.spawner = spawner or get_spawner()
+        if self.spawner is not None:
+            self.spawner.start()
+
+    @property
+    def available_slots(self) -> int:
+        return self.max_concurrency - len(self.futures)
+
+    def submit(self, run: PipelineRun, create_container: bool = True):
+        action = "Run pipeline" if create_container else "Re-attaching to orphaned run"
+        logger.info("%s: %s", action, run)
+        self.futures[run.id] = self.executor.submit(
+            supervise_run,
+            run.id,
+            create_container,
+            self.spawner,
+            self.heartbeats,
+        )
+
+    def reap(self):
+        for run_id, future in list(self.futures.items()):
+            if future.done():
+                del self.futures[run_id]
+
+    def tick(self):
+        self.reap()
+        self.heartbeats.flush(self.futures.keys())
+        if self.available_slots > 0:
+            for run in claim_orphaned_runs(
+                self.available_slots,
+                exclude_ids=self.futures.keys(),
+                queryset=self.runs,
+            ):
+                self.submit(run, create_container=False)
+        if self.available_slots > 0:
+            for run in claim_queued_runs(self.available_slots, queryset=self.runs):
+                self.submit(run)
+
+    def shutdown(self):
+        if self.spawner is not None:
+            self.spawner.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 
 KILLED_BY_TIMEOUT_MESSAGE = "Killed due to heartbeat timeout"
@@ -527,6 +1295,16 @@ def timed_out_state(run: PipelineRun):
     return PipelineRunState.FAILED, KILLED_BY_TIMEOUT_MESSAGE
 
 
+def append_run_log(run: PipelineRun, line: str):
+    if run.logs_size:
+        log = RunLogWriter(run)
+        log.write_line(line)
+        log.flush()
+    else:
+        # runs that predate the chunked log store
+        run.run_logs = "\n".join([run.run_logs, line]) if run.run_logs else line
+
+
 def process_zombie_runs():
     """Check for zombie runs and update their status based on actual pod state."""
     zombie_runs = PipelineRun.objects.filter(
@@ -543,9 +1321,7 @@ def process_zombie_runs():
             logger.warning("Timeout kill run %s #%s", run.pipeline.name, run.id)
             state, message = timed_out_state(run)
             run.state = state
-            run.run_logs = (
-                "\n".join([run.run_logs, message]) if run.run_logs else message
-            )
+            append_run_log(run, message)
             run.save()
         return
 
@@ -561,15 +1337,20 @@ def process_zombie_runs():
 
     v1 = CoreV1Api()
 
+    # a single listing of the pipeline pods for all the zombie runs
+    try:
+        pods = {
+            pod.metadata.labels["hexa-run-id"]: pod
+            for pod in v1.list_namespaced_pod(
+                namespace=namespace, label_selector="hexa-run-id"
+            ).items
+        }
+    except Exception as e:
+        logger.exception("Could not get pods for zombie runs: %s", e)
+        pods = {}
+
     for run in zombie_runs:
-        try:
-            pod_list = v1.list_namespaced_pod(
-                namespace=namespace, label_selector=f"hexa-run-id={run.id}"
-            )
-            pod = pod_list.items[0] if pod_list.items else None
-        except Exception as e:
-            logger.exception("Could not get pod for run %s: %s", run.id, e)
-            pod = None
+        pod = pods.get(str(run.id))
 
         if pod:
             phase = pod.status.phase
@@ -585,17 +1366,17 @@ def process_zombie_runs():
                 phase,
             )
 
+            # the runner that supervised the run may have missed the end of the logs
             try:
-                logs = v1.read_namespaced_pod_log(
-                    name=pod.metadata.name,
-                    namespace=namespace,
-                    container=container_name,
-                )
+                stream = stream_pod_logs(v1, pod, container_name)
+                log = RunLogWriter(run)
+                log.reset()
+                for data in stream:
+                    log.write(data)
+                log.flush()
             except Exception as e:
                 logger.exception("Could not get logs (%s)", e)
-                logs = ""
 
-            run.run_logs = logs or run.run_logs
             if run.state != PipelineRunState.TERMINATING and phase in {
                 "Succeeded",
                 "Failed",
@@ -611,15 +1392,66 @@ def process_zombie_runs():
         logger.warning("Timeout kill run %s #%s", run.pipeline.name, run.id)
         state, message = timed_out_state(run)
         run.state = state
-        run.run_logs = "\n".join([run.run_logs, message]) if run.run_logs else message
+        append_run_log(run, message)
         run.save()
 
 
+# Database connection (psycopg) on which LISTEN was issued. A LISTEN only lasts as long as its
+# connection: it is issued again when Django opens a new one.
+_listening_connection = None
+
+
+def listen_for_queued_runs():
+    global _listening_connection
+    db.connection.ensure_connection()
+    if db.connection.connection is _listening_connection:
+        return
+    with db.connection.cursor() as cursor:
+        cursor.execute(f'LISTEN "{PIPELINE_RUN_QUEUE_CHANNEL}";')
+    _listening_connection = db.connection.connection
+
+
+def wait_for_queued_runs(timeout: float) -> bool:
+    """Block until a run is queued (see `notify_pipeline_run_queue`) or `timeout` seconds elapsed.
+
+    Returns True if the runner has been notified.
+    """
+    listen_for_queued_runs()
+    try:
+        return any(
+            notify.channel == PIPELINE_RUN_QUEUE_CHANNEL
+            for notify in db.connection.connection.notifies(
+                timeout=timeout, stop_after=1
+            )
+        )
+    except psycopg.OperationalError:
+        # the connection was lost: the next call listens on a new one
+        logger.warning("Lost the connection listening for queued runs")
+        db.connection.close()
+        return False
+
+
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            choices=["fork", "pool"],
+            default=settings.PIPELINE_RUNNER_MODE,
+            help="Fork a process per run, or supervise all runs from a bounded thread pool",
+        )
+        parser.add_argument(
+            "--max-concurrency",
+            type=int,
+            default=settings.PIPELINE_RUNNER_MAX_CONCURRENCY,
+            help="Maximum number of runs supervised at the same time in pool mode",
+        )
+
     def handle(self, *args, **options):
+        if options["mode"] == "pool":
+            return self.handle_pool(options["max_concurrency"])
+
         logger.info("start pipeline runner")
         setup_child_process_reaping()
-        sleep(10)
 
         orphaned_runs = list(
             PipelineRun.objects.filter(state=PipelineRunState.RUNNING).order_by(
@@ -631,7 +1463,7 @@ class Command(BaseCommand):
             len(orphaned_runs),
         )
 
-        i = 0
+        last_reaping = monotonic()
         sleeptime = 5
         orphaned_batch_size = 10
         batch_size = 20
@@ -646,23 +1478,57 @@ class Command(BaseCommand):
             db.connections.close_all()
 
             # timeout-manager/zombie-reaper
-            if i > 60:
+            if monotonic() - last_reaping > ZOMBIE_REAPING_INTERVAL:
                 process_zombie_runs()
-                i = 0
-            else:
-                i += sleeptime
+                last_reaping = monotonic()
 
-            # Process QUEUED runs in batches to prevent spikes
-            runs = PipelineRun.objects.filter(state=PipelineRunState.QUEUED).order_by(
-                "execution_date"
-            )[:batch_size]
+            # listen before claiming, so that no run queued in between can be missed
+            listen_for_queued_runs()
 
-            for run in runs:
-                # mark all pipelines to be sure to never try executing them again
-                # we first update the status for all because the fork (in run_pipeline) closes the connection
-                run.state = PipelineRunState.RUNNING
-                run.save()
+            # Process QUEUED runs in batches to prevent spikes. Runs are marked as RUNNING
+            # before forking to be sure to never try executing them again (the fork in
+            # run_pipeline closes the connection)
+            runs = claim_queued_runs(batch_size)
             for run in runs:
                 run_pipeline(run)
 
-            sleep(sleeptime)
+            if runs or orphaned_runs:
+                # the forked processes closed the listening connection, and there may be
+                # more runs waiting: take a breath and check again
+                sleep(sleeptime)
+            else:
+                wait_for_queued_runs(
+                    min(
+                        QUEUE_POLL_INTERVAL,
+                        max(0, ZOMBIE_REAPING_INTERVAL - (monotonic() - last_reaping)),
+                    )
+                )
+
+    def handle_pool(self, max_concurrency: int):
+        logger.info("start pipeline runner (pool of %d)", max_concurrency)
+        supervisor = RunSupervisor(max_concurrency)
+        listen_for_queued_runs()
+
+        last_reaping = monotonic()
+        sleeptime = 5
+        try:
+            while True:
+                # timeout-manager/zombie-reaper
+                if monotonic() - last_reaping > ZOMBIE_REAPING_INTERVAL:
+                    process_zombie_runs()
+                    last_reaping = monotonic()
+
+                supervisor.tick()
+
+                # active runs are checked regularly to free their slots as soon as they end,
+                # an idle runner only wakes up when a run is queued
+                wait_for_queued_runs(
+                    sleeptime
+                    if supervisor.futures
+                    else min(
+                        QUEUE_POLL_INTERVAL,
+                        max(0, ZOMBIE_REAPING_INTERVAL - (monotonic() - last_reaping)),
+                    )
+                )
+        finally:
+            supervisor.shutdown()
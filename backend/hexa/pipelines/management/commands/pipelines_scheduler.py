@@ -1,10 +1,11 @@
+import heapq
 import time as time_module
-from datetime import datetime
+from datetime import datetime, timedelta
 from logging import getLogger
 from time import sleep
 
-from croniter import croniter
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 
 from hexa.analytics.api import track
@@ -18,99 +19,124 @@ from hexa.pipelines.utils import mail_skipped_run_recipients
 
 logger = getLogger(__name__)
 
+# Seconds between two reads of the due pipelines, which also bounds the delay before a
+# schedule change is taken into account
+REFRESH_INTERVAL = 15
+# Pipelines due within this delay are read in advance so that they can be launched on time
+LOOKAHEAD = timedelta(seconds=60)
+
+
+def get_due_pipelines(until: datetime) -> list[tuple[datetime, str]]:
+    """Return the (next execution date, id) of the pipelines to launch before `until`."""
+    return [
+        (next_execution_at, str(pipeline_id))
+        for next_execution_at, pipeline_id in Pipeline.objects.filter(
+            next_execution_at__lte=until,
+            deleted_at__isnull=True,
+            workspace__archived=False,
+        ).values_list("next_execution_at", "id")
+    ]
+
+
+def launch_scheduled_pipeline(pipeline_id: str, execution_date: datetime):
+    """Launch the pipeline if it is still due at `execution_date` and move its next execution date forward."""
+    with transaction.atomic():
+        # Another scheduler may be launching it, or the schedule changed since it was read
+        pipeline = (
+            Pipeline.objects.select_for_update(skip_locked=True)
+            .filter(id=pipeline_id, next_execution_at=execution_date)
+            .first()
+        )
+        if pipeline is None:
+            return
+        Pipeline.objects.filter(id=pipeline.id).update(
+            next_execution_at=pipeline.get_next_execution_date(
+                max(execution_date, timezone.now())
+            )
+        )
+
+    if pipeline.is_schedulable is False:
+        # A pipeline may have a schedule but not be schedulable because the configuration of the version has changed
+        logger.warning("pipeline %s not schedulable", pipeline.id)
+        return
+
+    try:
+        run_scheduled_pipeline(pipeline, execution_date)
+    except Exception:
+        logger.exception("Could not launch scheduled pipeline %s", pipeline.id)
+
+
+def run_scheduled_pipeline(pipeline: Pipeline, execution_date: datetime):
+    pipeline_version = pipeline.version_to_run
+    if PipelineRun.objects.filter(
+        pipeline=pipeline,
+        state__in=[PipelineRunState.QUEUED, PipelineRunState.RUNNING],
+    ).exists():
+        logger.warning(
+            "Pipeline %s (%s) already has a run in progress, skipping scheduled execution",
+            pipeline.code,
+            pipeline.id,
+        )
+
+        PipelineRun.objects.create(
+            user=None,
+            pipeline=pipeline,
+            pipeline_version=pipeline_version,
+            run_id=str(PipelineRunTrigger.SCHEDULED.value)
+            + "__"
+            + str(time_module.time()),
+            trigger_mode=PipelineRunTrigger.SCHEDULED,
+            execution_date=execution_date,
+            state=PipelineRunState.SKIPPED,
+            config=(
+                pipeline.merge_pipeline_config({}, pipeline_version.config)
+                if pipeline_version
+                else {}
+            ),
+            send_mail_notifications=False,
+        )
+
+        mail_skipped_run_recipients(pipeline, execution_date)
+        return
+
+    pipeline.run(
+        user=None,
+        pipeline_version=pipeline_version,
+        trigger_mode=PipelineRunTrigger.SCHEDULED,
+    )
+    track(
+        request=None,
+        event="pipelines.pipeline_run",
+        properties={
+            "pipeline_id": pipeline.code,
+            "version_name": (pipeline_version.name if pipeline_version else None),
+            "version_id": (str(pipeline_version.id) if pipeline_version else None),
+            "trigger": PipelineRunTrigger.SCHEDULED,
+            "workspace": pipeline.workspace.slug,
+        },
+    )
+
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
-        # only run by sequence of 5min
-        cutoff = 5 * 60
+        # Min-heap of the (next execution date, pipeline id) read ahead of time
+        heap: list[tuple[datetime, str]] = []
 
         while True:
-            sequence, start_time = [], timezone.now()
-            for pipeline in Pipeline.objects.exclude(schedule=None).filter(
-                workspace__archived=False
-            ):
-                if not croniter.is_valid(pipeline.schedule):
-                    logger.error("pipeline %s invalid schedule", pipeline.id)
-                    continue
-                if pipeline.is_schedulable is False:
-                    # A pipeline may have a schedule but not be schedulable because the configuration of the version has changed
-                    logger.warning("pipeline %s not schedulable", pipeline.id)
-                    continue
+            refreshed_at = timezone.now()
+            for entry in set(get_due_pipelines(refreshed_at + LOOKAHEAD)) - set(heap):
+                heapq.heappush(heap, entry)
+            logger.debug("exec seq %s", heap)
 
-                if pipeline.last_run:
-                    last_exec = pipeline.last_run.execution_date
-                else:
-                    last_exec = timezone.now()
-
-                cron = croniter(pipeline.schedule, last_exec)
-                next_exec_time = cron.get_next(datetime)
-                next_exec_delay = (next_exec_time - start_time).total_seconds()
-                if next_exec_delay < cutoff:
-                    sequence.append((pipeline, next_exec_delay, next_exec_time))
-
-            logger.debug("exec seq %s", sequence)
-            for pipeline, delay, exec_time in sorted(sequence, key=lambda e: e[1]):
-                # to have a good quality sequence, correct the next delay with an
-                # offset based on the diff between NOW and START
-                real_delay = delay - (timezone.now() - start_time).total_seconds()
-                if real_delay > 0:
-                    logger.debug(f"sleep before run: {real_delay}")
-                    sleep(real_delay)
-
-                pipeline_version = pipeline.version_to_run
-                if PipelineRun.objects.filter(
-                    pipeline=pipeline,
-                    state__in=[PipelineRunState.QUEUED, PipelineRunState.RUNNING],
-                ).exists():
-                    logger.warning(
-                        "Pipeline %s (%s) already has a run in progress, skipping scheduled execution",
-                        pipeline.code,
-                        pipeline.id,
-                    )
-
-                    PipelineRun.objects.create(
-                        user=None,
-                        pipeline=pipeline,
-                        pipeline_version=pipeline_version,
-                        run_id=str(PipelineRunTrigger.SCHEDULED.value)
-                        + "__"
-                        + str(time_module.time()),
-                        trigger_mode=PipelineRunTrigger.SCHEDULED,
-                        execution_date=exec_time,
-                        state=PipelineRunState.SKIPPED,
-                        config=(
-                            pipeline.merge_pipeline_config({}, pipeline_version.config)
-                            if pipeline_version
-                            else {}
-                        ),
-                        send_mail_notifications=False,
-                    )
-
-                    mail_skipped_run_recipients(pipeline, exec_time)
+            next_refresh = refreshed_at + timedelta(seconds=REFRESH_INTERVAL)
+            while True:
+                now = timezone.now()
+                if heap and heap[0][0] <= now:
+                    execution_date, pipeline_id = heapq.heappop(heap)
+                    launch_scheduled_pipeline(pipeline_id, execution_date)
                     continue
 
-                pipeline.run(
-                    user=None,
-                    pipeline_version=pipeline_version,
-                    trigger_mode=PipelineRunTrigger.SCHEDULED,
-                )
-                track(
-                    request=None,
-                    event="pipelines.pipeline_run",
-                    properties={
-                        "pipeline_id": pipeline.code,
-                        "version_name": (
-                            pipeline_version.name if pipeline_version else None
-                        ),
-                        "version_id": (
-                            str(pipeline_version.id) if pipeline_version else None
-                        ),
-                        "trigger": PipelineRunTrigger.SCHEDULED,
-                        "workspace": pipeline.workspace.slug,
-                    },
-                )
-
-            empty_delay = cutoff - (timezone.now() - start_time).total_seconds()
-            if empty_delay > 0:
-                logger.debug("sleep end runs: %s", empty_delay)
-                sleep(empty_delay)
+                wake_at = min(heap[0][0], next_refresh) if heap else next_refresh
+                if wake_at <= now:
+                    break
+                sleep((wake_at - now).total_seconds())
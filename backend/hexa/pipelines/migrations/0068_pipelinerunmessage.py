@@ -0,0 +1,41 @@
+# Generated by Django 5.2.16 on 2026-10-18 07:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pipelines", "0067_pipeline_scheduled_pipeline_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PipelineRunMessage",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("sequence", models.PositiveIntegerField()),
+                ("priority", models.CharField(max_length=32)),
+                ("message", models.TextField()),
+                ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="message_entries",
+                        to="pipelines.pipelinerun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("run", "sequence"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("run", "sequence"),
+                        name="unique_pipeline_run_message_sequence",
+                    )
+                ],
+            },
+        ),
+    ]
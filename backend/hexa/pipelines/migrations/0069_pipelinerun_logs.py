@@ -0,0 +1,44 @@
+# Generated by Django 5.2.16 on 2026-10-18 07:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pipelines", "0068_pipelinerunmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pipelinerun",
+            name="logs_size",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="PipelineRunLogChunk",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("offset", models.BigIntegerField()),
+                ("size", models.PositiveIntegerField()),
+                ("data", models.BinaryField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="log_chunks",
+                        to="pipelines.pipelinerun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("run", "offset"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("run", "offset"),
+                        name="unique_pipeline_run_log_chunk_offset",
+                    )
+                ],
+            },
+        ),
+    ]
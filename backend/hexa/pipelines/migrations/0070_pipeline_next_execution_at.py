@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from croniter import croniter
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def set_next_execution_dates(apps, _):
+    Pipeline = apps.get_model("pipelines", "Pipeline")
+    PipelineRun = apps.get_model("pipelines", "PipelineRun")
+
+    for pipeline in Pipeline.objects.exclude(schedule=None).exclude(schedule=""):
+        if not croniter.is_valid(pipeline.schedule):
+            continue
+        # Same as the previous scheduler: the next execution follows the last run
+        last_run = (
+            PipelineRun.objects.filter(pipeline=pipeline)
+            .order_by("-execution_date")
+            .first()
+        )
+        last_execution = last_run.execution_date if last_run else timezone.now()
+        pipeline.next_execution_at = croniter(
+            pipeline.schedule, last_execution
+        ).get_next(datetime)
+        pipeline.save(update_fields=["next_execution_at"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pipelines", "0069_pipelinerun_logs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pipeline",
+            name="next_execution_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="pipeline",
+            index=models.Index(
+                condition=models.Q(("next_execution_at__isnull", False)),
+                fields=["next_execution_at"],
+                name="idx_pipeline_next_execution_at",
+            ),
+        ),
+        migrations.RunPython(set_next_execution_dates, migrations.RunPython.noop),
+    ]
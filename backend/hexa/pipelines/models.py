@@ -1,4 +1,5 @@
 import base64
+import datetime
 import secrets
 import time
 import typing
@@ -12,8 +13,8 @@ from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.postgres.indexes import GinIndex, GistIndex
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.signing import Signer, TimestampSigner
-from django.db import models, transaction
-from django.db.models import Q
+from django.db import connection, models, transaction
+from django.db.models import Exists, F, OuterRef, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from dpq.models import BaseJob
@@ -34,7 +35,11 @@ from hexa.core.models.soft_delete import (
     SoftDeletedModel,
     SoftDeleteQuerySet,
 )
-from hexa.pipelines.constants import UNIQUE_PIPELINE_VERSION_NAME
+from hexa.pipelines.constants import (
+    PIPELINE_RUN_EVENTS_CHANNEL,
+    PIPELINE_RUN_QUEUE_CHANNEL,
+    UNIQUE_PIPELINE_VERSION_NAME,
+)
 from hexa.user_management.models import User, UserInterface
 from hexa.workspaces.models import ConnectionType, Workspace
 
@@ -433,6 +438,11 @@ class Pipeline(SoftDeletedModel):
         ]
         indexes = [
             models.Index(fields=["name"], name="idx_pipeline_name"),
+            models.Index(
+                fields=["next_execution_at"],
+                name="idx_pipeline_next_execution_at",
+                condition=Q(next_execution_at__isnull=False),
+            ),
         ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -446,6 +456,8 @@ class Pipeline(SoftDeletedModel):
     description = models.TextField(blank=True)
     config = models.JSONField(blank=True, default=dict)
     schedule = models.CharField(max_length=200, null=True, blank=True)
+    # Next time the scheduler has to launch the pipeline, kept in sync with `schedule`
+    next_execution_at = models.DateTimeField(null=True, blank=True)
     workspace = models.ForeignKey(Workspace, on_delete=models.SET_NULL, null=True)
     webhook_enabled = models.BooleanField(default=False)
 
@@ -493,6 +505,39 @@ class Pipeline(SoftDeletedModel):
     objects = PipelineManager()
     all_objects = IncludeSoftDeletedManager.from_queryset(PipelineQuerySet)()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Schedule as last saved, the next execution date is computed again when it changes
+        self._saved_schedule = self.__dict__.get("schedule")
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._saved_schedule = self.__dict__.get("schedule")
+
+    def save(self, *args, **kwargs):
+        if not self.schedule or self.deleted_at is not None:
+            # Deleted pipelines are not scheduled, the date is computed again when restored
+            self.next_execution_at = None
+        elif self.next_execution_at is None or self.schedule != self._saved_schedule:
+            self.next_execution_at = self.get_next_execution_date()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"schedule", "deleted_at"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "next_execution_at"}
+        super().save(*args, **kwargs)
+        self._saved_schedule = self.schedule
+
+    def get_next_execution_date(
+        self, after: datetime.datetime | None = None
+    ) -> datetime.datetime | None:
+        """Return the first time matching the schedule of the pipeline after `after` (defaults to now)."""
+        if not self.schedule or not croniter.is_valid(self.schedule):
+            return None
+        return croniter(self.schedule, after or timezone.now()).get_next(
+            datetime.datetime
+        )
+
     def run(
         self,
         user: typing.Optional[User],
@@ -540,6 +585,7 @@ class Pipeline(SoftDeletedModel):
             or settings.PIPELINE_DEFAULT_CONTAINER_MEMORY_LIMIT,
             log_level=log_level,
         )
+        notify_pipeline_run_queue()
 
         return run
 
@@ -715,6 +761,9 @@ class Pipeline(SoftDeletedModel):
 
     def set_schedule(self, schedule: str):
         if schedule is None or croniter.is_valid(schedule):
+            if schedule != self.schedule:
+                # computed again from now on save
+                self.next_execution_at = None
             self.schedule = schedule
         else:
             raise ValidationError("Invalid cron expression")
@@ -831,10 +880,35 @@ class PipelineRecipient(Base):
         return self.delete()
 
 
+def notify_pipeline_run_queue():
+    """Wake up the pipelines runners listening for queued runs (delivered when the transaction commits)."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'NOTIFY "{PIPELINE_RUN_QUEUE_CHANNEL}";')
+
+
+def notify_pipeline_run_events(run_id):
+    """Wake up the message streams of the run (delivered when the transaction commits)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_notify(%s, %s);", [PIPELINE_RUN_EVENTS_CHANNEL, str(run_id)]
+        )
+
+
 class PipelineRunQuerySet(BaseQuerySet):
     def filter_for_user(self, user: AnonymousUser | UserInterface):
         return self.filter(pipeline__in=Pipeline.objects.filter_for_user(user))
 
+    def with_error_message_entries(self):
+        """Annotate the runs with whether they logged error messages, read by `PipelineRun.has_error_messages`."""
+        return self.annotate(
+            has_error_message_entries=Exists(
+                PipelineRunMessage.objects.filter(
+                    run=OuterRef("pk"),
+                    priority__in=PipelineRunMessage.ERROR_PRIORITIES,
+                )
+            )
+        )
+
 
 class PipelineRunState(models.TextChoices):
     SUCCESS = "success", _("Success")
@@ -892,6 +966,7 @@ class PipelineRun(Base, WithStatus):
     messages = models.JSONField(null=True, blank=True, default=list)
     outputs = models.JSONField(null=True, blank=True, default=list)
     run_logs = models.TextField(null=True, blank=True)
+    logs_size = models.BigIntegerField(default=0)
     current_progress = models.PositiveSmallIntegerField(default=0)
     timeout = models.IntegerField(null=True)
     cpu_limit = models.CharField(
@@ -924,17 +999,99 @@ class PipelineRun(Base, WithStatus):
         return self.pipeline_version.zipfile
 
     def log_message(self, priority: str, message: str):
-        self.refresh_from_db()
-        if self.messages is None:
-            self.messages = []
-        self.messages.append(
-            {
-                "priority": priority if priority else "INFO",
-                "message": message,
-                "timestamp": timezone.now().isoformat(),
-            }
+        self.log_messages([(priority, message)])
+
+    def log_messages(self, messages: typing.Iterable[tuple[str, str]]):
+        """Append (priority, message) pairs to the message log of the run in a single insert."""
+        with transaction.atomic():
+            # Lock the run so that concurrent writers get consecutive sequences, committed in order
+            run = (
+                PipelineRun.objects.select_for_update().only("messages").get(id=self.id)
+            )
+            last_sequence = run.message_entries.aggregate(
+                last_sequence=models.Max("sequence")
+            )["last_sequence"]
+            # Sequences of runs created before the message log continue after the legacy messages
+            next_sequence = (
+                last_sequence + 1
+                if last_sequence is not None
+                else len(run.messages or [])
+            )
+            timestamp = timezone.now()
+            entries = PipelineRunMessage.objects.bulk_create(
+                [
+                    PipelineRunMessage(
+                        run=run,
+                        sequence=next_sequence + i,
+                        priority=priority if priority else "INFO",
+                        message=message,
+                        timestamp=timestamp,
+                    )
+                    for i, (priority, message) in enumerate(messages)
+                ]
+            )
+            notify_pipeline_run_events(self.id)
+            return entries
+
+    def get_messages(self, after: int = 0) -> list[dict]:
+        """Return the messages of the run, starting at position `after`."""
+        legacy_messages = self.messages or []
+        return legacy_messages[after:] + [
+            entry.to_dict()
+            for entry in self.message_entries.filter(
+                sequence__gte=max(after, len(legacy_messages))
+            )
+        ]
+
+    def has_error_messages(self) -> bool:
+        if any(
+            msg.get("priority") in PipelineRunMessage.ERROR_PRIORITIES
+            for msg in self.messages or []
+        ):
+            return True
+        if hasattr(self, "has_error_message_entries"):
+            # Annotated by `PipelineRunQuerySet.with_error_message_entries`
+            return self.has_error_message_entries
+        return self.message_entries.filter(
+            priority__in=PipelineRunMessage.ERROR_PRIORITIES
+        ).exists()
+
+    @property
+    def logs_total_size(self) -> int:
+        """Size in bytes of the whole log of the run, including the part that is no longer retained."""
+        return self.logs_size or len((self.run_logs or "").encode())
+
+    def read_logs(self, start: int = 0, end: int = None) -> tuple[int, bytes]:
+        """Return the stored bytes of the log between offsets `start` and `end` (excluded).
+
+        Only the tail of long logs is retained (see `PIPELINE_RUN_LOGS_MAX_SIZE`): the returned offset
+        is the one of the first returned byte, past `start` if the head of the log has been dropped.
+        """
+        if not self.logs_size:
+            # Runs that predate the chunked log store
+            data = (self.run_logs or "").encode()
+            return min(start, len(data)), data[start:end]
+
+        end = self.logs_size if end is None else min(end, self.logs_size)
+        chunks = list(
+            self.log_chunks.alias(end_offset=F("offset") + F("size")).filter(
+                offset__lt=end, end_offset__gt=start
+            )
         )
-        self.save()
+        if not chunks:
+            return min(start, end), b""
+        offset = max(start, chunks[0].offset)
+        data = b"".join(bytes(chunk.data) for chunk in chunks)
+        return offset, data[offset - chunks[0].offset : end - chunks[0].offset]
+
+    def get_logs(self) -> str | None:
+        if not self.logs_size:
+            return self.run_logs
+        offset, data = self.read_logs()
+        logs = data.decode("utf-8", errors="replace")
+        if offset > 0:
+            logs = f"[{offset} bytes of logs truncated]\n{logs}"
+        return logs
 
     def add_output(self, uri: str, output_type: str, name: typing.Optional[str]):
         self.refresh_from_db()
@@ -964,6 +1121,66 @@ class PipelineRun(Base, WithStatus):
         self.save()
 
 
+class PipelineRunMessage(models.Model):
+    """A message logged by a pipeline run.
+
+    Messages are only ever appended: `sequence` gives their position in the log of the run, so
+    that readers can fetch the messages logged after the last one they have seen.
+    """
+
+    ERROR_PRIORITIES = ("ERROR", "CRITICAL")
+
+    class Meta:
+        ordering = ("run", "sequence")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "sequence"],
+                name="unique_pipeline_run_message_sequence",
+            )
+        ]
+
+    id = models.BigAutoField(primary_key=True)
+    run = models.ForeignKey(
+        PipelineRun, on_delete=models.CASCADE, related_name="message_entries"
+    )
+    sequence = models.PositiveIntegerField()
+    priority = models.CharField(max_length=32)
+    message = models.TextField()
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    def to_dict(self):
+        return {
+            "priority": self.priority,
+            "message": self.message,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+class PipelineRunLogChunk(models.Model):
+    """A chunk of the log of a pipeline run, starting at byte `offset` of the log.
+
+    Logs are written in chunks while the run is going on, and the oldest chunks are deleted once
+    the log exceeds `PIPELINE_RUN_LOGS_MAX_SIZE`.
+    """
+
+    class Meta:
+        ordering = ("run", "offset")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "offset"],
+                name="unique_pipeline_run_log_chunk_offset",
+            )
+        ]
+
+    id = models.BigAutoField(primary_key=True)
+    run = models.ForeignKey(
+        PipelineRun, on_delete=models.CASCADE, related_name="log_chunks"
+    )
+    offset = models.BigIntegerField()
+    size = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+
 class EnvironmentsSyncJob(BaseJob):
     # queue table to hold sync job from django-postgres-queue. Need to redefine this class to specify a
     # custom table name, to avoid conflicts with other queue in the system
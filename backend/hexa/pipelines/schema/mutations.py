@@ -717,36 +717,49 @@ def resolve_delete_pipeline_recipient(_, info, **kwargs):
         }
 
 
-@pipelines_mutations.field("logPipelineMessage")
-def resolve_pipeline_log_message(_, info, **kwargs):
-    request: HttpRequest = info.context["request"]
+def _get_run_accepting_messages(request: HttpRequest):
+    """Return the run authenticated by the request, or the error code to return."""
     if not request.user.is_authenticated or not isinstance(
         request.user, PipelineRunUser
     ):
-        return {
-            "success": False,
-            "errors": ["PIPELINE_NOT_FOUND"],
-        }
+        return None, "PIPELINE_NOT_FOUND"
 
     try:
-        pipeline_run = PipelineRun.objects.get(pk=request.user.pipeline_run.id)
+        pipeline_run = PipelineRun.objects.only("id", "state").get(
+            pk=request.user.pipeline_run.id
+        )
     except PipelineRun.DoesNotExist:
-        return {
-            "success": False,
-            "errors": ["PIPELINE_NOT_FOUND"],
-        }
+        return None, "PIPELINE_NOT_FOUND"
 
     if pipeline_run.state in [PipelineRunState.SUCCESS, PipelineRunState.FAILED]:
-        return {
-            "success": False,
-            "errors": ["PIPELINE_ALREADY_COMPLETED"],
-        }
+        return None, "PIPELINE_ALREADY_COMPLETED"
+    return pipeline_run, None
+
+
+@pipelines_mutations.field("logPipelineMessage")
+def resolve_pipeline_log_message(_, info, **kwargs):
+    pipeline_run, error = _get_run_accepting_messages(info.context["request"])
+    if error:
+        return {"success": False, "errors": [error]}
 
     input = kwargs["input"]
     pipeline_run.log_message(input.get("priority"), input.get("message"))
     return {"success": True, "errors": []}
 
 
+@pipelines_mutations.field("logPipelineMessages")
+def resolve_pipeline_log_messages(_, info, **kwargs):
+    pipeline_run, error = _get_run_accepting_messages(info.context["request"])
+    if error:
+        return {"success": False, "errors": [error]}
+
+    pipeline_run.log_messages(
+        (message.get("priority"), message.get("message"))
+        for message in kwargs["input"]["messages"]
+    )
+    return {"success": True, "errors": []}
+
+
 @pipelines_mutations.field("updatePipelineProgress")
 def resolve_pipeline_progress(_, info, **kwargs):
     request: HttpRequest = info.context["request"]
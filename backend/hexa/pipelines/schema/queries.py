@@ -156,7 +156,7 @@ def resolve_pipeline_run(_, info, **kwargs):
         else:
             qs = PipelineRun.objects.filter_for_user(request.user)
 
-        return qs.get(id=run_id)
+        return qs.with_error_message_entries().get(id=run_id)
 
     except PipelineRun.DoesNotExist:
         return None
@@ -284,7 +284,7 @@ def resolve_has_new_template_versions(pipeline: Pipeline, info, **kwargs):
 
 @pipeline_object.field("runs")
 def resolve_pipeline_runs(pipeline: Pipeline, info, **kwargs):
-    qs = PipelineRun.objects.filter(pipeline=pipeline)
+    qs = PipelineRun.objects.filter(pipeline=pipeline).with_error_message_entries()
 
     order_by = kwargs.get("order_by", None)
     if order_by is not None:
@@ -331,15 +331,27 @@ def resolve_pipeline_run_code(run: PipelineRun, info, **kwargs):
 
 
 pipeline_run_object.set_alias("progress", "current_progress")
-pipeline_run_object.set_alias("logs", "run_logs")
 pipeline_run_object.set_alias("version", "pipeline_version")
 
 
+@pipeline_run_object.field("logs")
+def resolve_pipeline_run_logs(run: PipelineRun, info, **kwargs):
+    return run.get_logs()
+
+
+@pipeline_run_object.field("logsSize")
+def resolve_pipeline_run_logs_size(run: PipelineRun, info, **kwargs):
+    return run.logs_total_size
+
+
+@pipeline_run_object.field("messages")
+def resolve_pipeline_run_messages(run: PipelineRun, info, **kwargs):
+    return run.get_messages()
+
+
 @pipeline_run_object.field("hasErrorMessages")
 def resolve_pipeline_run_has_error_messages(run: PipelineRun, info, **kwargs):
-    if not run.messages:
-        return False
-    return any(msg.get("priority") in ("ERROR", "CRITICAL") for msg in run.messages)
+    return run.has_error_messages()
 
 
 def get_language_from_path(path: str) -> str:
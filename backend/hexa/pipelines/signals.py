@@ -1,9 +1,14 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from hexa.workspaces.models import WorkspaceMembership
 
-from .models import Pipeline, PipelineRecipient
+from .models import (
+    Pipeline,
+    PipelineRecipient,
+    PipelineRun,
+    notify_pipeline_run_events,
+)
 
 
 @receiver(post_delete, sender=WorkspaceMembership, dispatch_uid="delete_member_handler")
@@ -18,3 +23,12 @@ def delete_member_handler(sender: type, instance: WorkspaceMembership, **kwargs)
         ).delete()
     except PipelineRecipient.DoesNotExist:
         pass
+
+
+@receiver(post_save, sender=PipelineRun, dispatch_uid="pipeline_run_saved_handler")
+def pipeline_run_saved_handler(
+    sender: type, instance: PipelineRun, created: bool, **kwargs
+):
+    # Let the message streams of the run pick up state changes
+    if not created:
+        notify_pipeline_run_events(instance.id)
@@ -0,0 +1,127 @@
+import asyncio
+from unittest.mock import Mock
+
+from django.utils import timezone
+
+from hexa.core.test import TestCase
+from hexa.pipelines.broadcaster import PipelineRunBroadcaster
+from hexa.pipelines.constants import PIPELINE_RUN_EVENTS_CHANNEL
+from hexa.pipelines.models import (
+    Pipeline,
+    PipelineRun,
+    PipelineRunState,
+    PipelineRunTrigger,
+)
+from hexa.user_management.models import User
+from hexa.workspaces.tests.testutils import create_workspace
+
+
+class PipelineRunBroadcasterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER = User.objects.create_user(
+            "broadcaster@bluesquarehub.com", "password", is_superuser=True
+        )
+        cls.WORKSPACE = create_workspace(cls.USER, name="Broadcaster", description="")
+        cls.PIPELINE = Pipeline.objects.create(
+            workspace=cls.WORKSPACE, name="Broadcaster", code="broadcaster"
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.broadcaster = PipelineRunBroadcaster()
+        # Don't start the listener thread, updates are triggered with refresh()
+        self.broadcaster._thread = Mock(is_alive=Mock(return_value=True))
+        self.run = PipelineRun.objects.create(
+            pipeline=self.PIPELINE,
+            user=self.USER,
+            run_id="broadcaster-run",
+            execution_date=timezone.now(),
+            trigger_mode=PipelineRunTrigger.MANUAL,
+            state=PipelineRunState.RUNNING,
+        )
+
+    def _get(self, subscription):
+        return self.loop.run_until_complete(subscription.get(timeout=0.1))
+
+    def test_refresh_reads_once_for_all_subscribers(self):
+        subscriptions = [
+            self.broadcaster.subscribe(self.run.id, 0, loop=self.loop)
+            for _ in range(10)
+        ]
+        self.run.log_messages([("INFO", "First"), ("INFO", "Second")])
+
+        with self.assertNumQueries(2):
+            self.broadcaster.refresh({str(self.run.id)})
+
+        for subscription in subscriptions:
+            update = self._get(subscription)
+            self.assertEqual(update.state, PipelineRunState.RUNNING)
+            self.assertEqual(update.position, 0)
+            self.assertEqual(
+                [msg["message"] for msg in update.messages], ["First", "Second"]
+            )
+
+    def test_refresh_pushes_deltas(self):
+        subscription = self.broadcaster.subscribe(self.run.id, 0, loop=self.loop)
+        self.run.log_message("INFO", "First")
+        self.broadcaster.refresh({str(self.run.id)})
+        self.run.log_message("INFO", "Second")
+        self.broadcaster.refresh({str(self.run.id)})
+
+        self.assertEqual(
+            [msg["message"] for msg in self._get(subscription).messages], ["First"]
+        )
+        update = self._get(subscription)
+        self.assertEqual(update.position, 1)
+        self.assertEqual([msg["message"] for msg in update.messages], ["Second"])
+
+    def test_refresh_pushes_state_changes_only(self):
+        subscription = self.broadcaster.subscribe(self.run.id, 0, loop=self.loop)
+        self.broadcaster.refresh({str(self.run.id)})
+        self.assertEqual(self._get(subscription).state, PipelineRunState.RUNNING)
+
+        self.broadcaster.refresh({str(self.run.id)})
+        self.assertIsNone(self._get(subscription))
+
+        self.run.state = PipelineRunState.SUCCESS
+        self.run.save()
+        self.broadcaster.refresh({str(self.run.id)})
+        self.assertEqual(self._get(subscription).state, PipelineRunState.SUCCESS)
+
+    def test_late_subscriber_gets_earlier_messages(self):
+        first = self.broadcaster.subscribe(self.run.id, 0, loop=self.loop)
+        self.run.log_message("INFO", "First")
+        self.broadcaster.refresh({str(self.run.id)})
+        self._get(first)
+
+        second = self.broadcaster.subscribe(self.run.id, 0, loop=self.loop)
+        self.run.log_message("INFO", "Second")
+        self.broadcaster.refresh({str(self.run.id)})
+
+        for subscription in (first, second):
+            update = self._get(subscription)
+            self.assertEqual(update.position, 0)
+            self.assertEqual(len(update.messages), 2)
+
+    def test_refresh_ignores_runs_without_subscribers(self):
+        subscription = self.broadcaster.subscribe(self.run.id, 0, loop=self.loop)
+        subscription.close()
+
+        with self.assertNumQueries(0):
+            self.broadcaster.refresh({str(self.run.id)})
+
+    def test_wait_coalesces_notifications(self):
+        connection = Mock()
+        connection.notifies.side_effect = [
+            iter([Mock(channel=PIPELINE_RUN_EVENTS_CHANNEL, payload="a")]),
+            iter(
+                [
+                    Mock(channel=PIPELINE_RUN_EVENTS_CHANNEL, payload="a"),
+                    Mock(channel=PIPELINE_RUN_EVENTS_CHANNEL, payload="b"),
+                ]
+            ),
+        ]
+        self.assertEqual(self.broadcaster._wait(connection), {"a", "b"})
@@ -2,6 +2,7 @@ import uuid
 from unittest.mock import patch
 
 from django.core import mail
+from django.utils import timezone
 
 from hexa.core.test import TestCase
 from hexa.pipeline_templates.models import PipelineTemplateVersion
@@ -11,6 +12,7 @@ from hexa.pipelines.models import (
     PipelineFunctionalType,
     PipelineNotificationLevel,
     PipelineRecipient,
+    PipelineRun,
     PipelineRunLogLevel,
     PipelineRunState,
     PipelineRunTrigger,
@@ -253,6 +255,18 @@ class PipelineTest(TestCase):
         ):
             mail_run_recipients(run)
 
+    def test_run_notifies_runners(self):
+        with patch("hexa.pipelines.models.notify_pipeline_run_queue") as mock_notify:
+            run = self.PIPELINE.run(
+                user=self.USER_ADMIN,
+                pipeline_version=self.PIPELINE.last_version,
+                trigger_mode=PipelineRunTrigger.MANUAL,
+                config={},
+            )
+
+        self.assertEqual(run.state, PipelineRunState.QUEUED)
+        mock_notify.assert_called_once_with()
+
     def test_get_config_from_previous_version(self):
         pipeline = Pipeline.objects.create(
             name="Test pipeline",
@@ -1098,3 +1112,113 @@ class ScheduledPipelineVersionModelTest(TestCase):
         self.PIPELINE.refresh_from_db()
         self.assertEqual(self.PIPELINE.schedule, "0 12 * * *")
         self.assertEqual(self.PIPELINE.scheduled_pipeline_version, self.VERSION_1)
+
+
+class PipelineRunMessageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER = User.objects.create_user(
+            "run_messages@bluesquarehub.com",
+            "password",
+            is_superuser=True,
+        )
+        cls.WORKSPACE = create_workspace(
+            cls.USER,
+            name="RunMessagesWS",
+            description="",
+        )
+        cls.PIPELINE = Pipeline.objects.create(
+            workspace=cls.WORKSPACE,
+            name="Run Messages Pipeline",
+            code="run-messages-pipeline",
+        )
+
+    def _make_run(self, messages=None):
+        return PipelineRun.objects.create(
+            pipeline=self.PIPELINE,
+            user=self.USER,
+            run_id="run-messages",
+            execution_date=timezone.now(),
+            trigger_mode=PipelineRunTrigger.MANUAL,
+            state=PipelineRunState.RUNNING,
+            messages=messages or [],
+        )
+
+    def test_log_messages_appends_in_order(self):
+        run = self._make_run()
+        run.log_message("INFO", "First")
+        run.log_messages([("WARNING", "Second"), (None, "Third")])
+
+        self.assertEqual(
+            list(run.message_entries.values_list("sequence", "priority", "message")),
+            [(0, "INFO", "First"), (1, "WARNING", "Second"), (2, "INFO", "Third")],
+        )
+
+    def test_log_messages_single_insert(self):
+        run = self._make_run()
+        with self.assertNumQueries(6):
+            # savepoint, lock, last sequence, insert, notify, release
+            run.log_messages([("INFO", f"Message {i}") for i in range(50)])
+        self.assertEqual(run.message_entries.count(), 50)
+
+    def test_get_messages_after_cursor(self):
+        run = self._make_run()
+        run.log_messages([("INFO", "First"), ("INFO", "Second"), ("INFO", "Third")])
+
+        self.assertEqual(
+            [msg["message"] for msg in run.get_messages(after=1)], ["Second", "Third"]
+        )
+        self.assertEqual(run.get_messages(after=3), [])
+
+    def test_legacy_messages_come_first(self):
+        run = self._make_run(
+            messages=[
+                {"message": "Legacy 1", "timestamp": None, "priority": "INFO"},
+                {"message": "Legacy 2", "timestamp": None, "priority": "ERROR"},
+            ]
+        )
+        run.log_message("INFO", "New")
+
+        self.assertEqual(run.message_entries.get().sequence, 2)
+        self.assertEqual(
+            [msg["message"] for msg in run.get_messages()],
+            ["Legacy 1", "Legacy 2", "New"],
+        )
+        self.assertEqual(
+            [msg["message"] for msg in run.get_messages(after=1)], ["Legacy 2", "New"]
+        )
+        self.assertTrue(run.has_error_messages())
+
+    def test_has_error_messages(self):
+        run = self._make_run()
+        run.log_message("INFO", "All good")
+        self.assertFalse(run.has_error_messages())
+        run.log_message("CRITICAL", "Not good")
+        self.assertTrue(run.has_error_messages())
+
+    def test_has_error_messages_annotated(self):
+        failed, succeeded = self._make_run(), self._make_run()
+        failed.log_message("ERROR", "Not good")
+        succeeded.log_message("INFO", "All good")
+
+        with self.assertNumQueries(1):
+            runs = PipelineRun.objects.filter(
+                id__in=[failed.id, succeeded.id]
+            ).with_error_message_entries()
+            self.assertEqual(
+                {run.id: run.has_error_messages() for run in runs},
+                {failed.id: True, succeeded.id: False},
+            )
+
+    def test_log_messages_notifies_streams(self):
+        run = self._make_run()
+        with patch("hexa.pipelines.models.notify_pipeline_run_events") as mock_notify:
+            run.log_message("INFO", "Hello")
+        mock_notify.assert_called_once_with(run.id)
+
+    def test_state_change_notifies_streams(self):
+        run = self._make_run()
+        with patch("hexa.pipelines.signals.notify_pipeline_run_events") as mock_notify:
+            run.state = PipelineRunState.SUCCESS
+            run.save()
+        mock_notify.assert_called_once_with(run.id)
@@ -2,17 +2,32 @@ import os
 from datetime import timedelta
 from unittest.mock import MagicMock, Mock, patch
 
+import psycopg
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from kubernetes.client import ApiException
 
+from hexa.pipelines.constants import PIPELINE_RUN_QUEUE_CHANNEL
 from hexa.pipelines.management.commands.pipelines_runner import (
+    DockerSpawner,
+    FakeSpawner,
+    HeartbeatBatcher,
+    KubernetesSpawner,
+    LogFollower,
+    PodWatcher,
+    RunLogWriter,
+    RunSupervisor,
     attach_to_container_docker,
     attach_to_pod_kube,
+    claim_orphaned_runs,
+    claim_queued_runs,
     create_pod_kube,
+    execute_run,
+    get_spawner,
     monitor_pod_kube,
     process_zombie_runs,
     run_pipeline,
+    wait_for_queued_runs,
 )
 from hexa.pipelines.models import (
     Pipeline,
@@ -32,6 +47,7 @@ class TestRunPipeline(TestCase):
         DEFAULT_WORKSPACE_IMAGE="default_workspace_image",
         PIPELINE_SCHEDULER_SPAWNER="docker",
     )
+    @patch("hexa.pipelines.management.commands.pipelines_runner.RunLogWriter")
     @patch(
         "hexa.pipelines.management.commands.pipelines_runner.monitor_container_docker"
     )
@@ -39,7 +55,7 @@ class TestRunPipeline(TestCase):
         "hexa.pipelines.management.commands.pipelines_runner.create_container_docker"
     )
     @patch("os.fork", return_value=0)
-    def test_env_vars(self, _, mock_create_container, mock_monitor_container):
+    def test_env_vars(self, _, mock_create_container, mock_monitor_container, __):
         mock_run = MagicMock(spec=PipelineRun)
         mock_run.id = 123
         mock_run.access_token = "someAccessToken"
@@ -52,7 +68,7 @@ class TestRunPipeline(TestCase):
         mock_run.pipeline.code = "pipeline_code"
         mock_run.send_mail_notifications = False
 
-        mock_monitor_container.return_value = (True, "SomeLogs")
+        mock_monitor_container.return_value = True
 
         with self.assertRaises(SystemExit):
             run_pipeline(mock_run)
@@ -77,6 +93,7 @@ class TestRunPipeline(TestCase):
         DEFAULT_WORKSPACE_IMAGE="default_workspace_image",
         PIPELINE_SCHEDULER_SPAWNER="docker",
     )
+    @patch("hexa.pipelines.management.commands.pipelines_runner.RunLogWriter")
     @patch(
         "hexa.pipelines.management.commands.pipelines_runner.monitor_container_docker"
     )
@@ -88,7 +105,12 @@ class TestRunPipeline(TestCase):
     )
     @patch("os.fork", return_value=0)
     def test_docker_reattach_does_not_create_new_container(
-        self, _, mock_create_container, mock_attach_container, mock_monitor_container
+        self,
+        _,
+        mock_create_container,
+        mock_attach_container,
+        mock_monitor_container,
+        __,
     ):
         mock_run = MagicMock(spec=PipelineRun)
         mock_run.id = 123
@@ -101,7 +123,7 @@ class TestRunPipeline(TestCase):
         mock_run.pipeline.code = "pipeline_code"
         mock_run.send_mail_notifications = False
 
-        mock_monitor_container.return_value = (True, "SomeLogs")
+        mock_monitor_container.return_value = True
 
         with self.assertRaises(SystemExit):
             run_pipeline(mock_run, create_container=False)
@@ -110,7 +132,7 @@ class TestRunPipeline(TestCase):
         mock_create_container.assert_not_called()
 
     @patch("hexa.pipelines.management.commands.pipelines_runner.docker")
-    def test_attach_to_container_docker_exits_when_missing(self, mock_docker):
+    def test_attach_to_container_docker_returns_none_when_missing(self, mock_docker):
         mock_client = Mock()
         mock_docker.DockerClient.return_value = mock_client
         mock_docker.errors.NotFound = Exception
@@ -121,10 +143,7 @@ class TestRunPipeline(TestCase):
         mock_run.pipeline.workspace.slug = "test_workspace"
         mock_run.pipeline.code = "pipeline_code"
 
-        with self.assertRaises(SystemExit) as cm:
-            attach_to_container_docker(mock_run)
-
-        self.assertEqual(cm.exception.code, 0)
+        self.assertIsNone(attach_to_container_docker(mock_run))
 
 
 class TestKubernetesPipelineIntegration(TestCase):
@@ -166,10 +185,15 @@ class TestKubernetesPipelineIntegration(TestCase):
         mock_pod = Mock()
         mock_pod.metadata.name = f"pipeline-{self.run.id}"
         mock_pod.metadata.namespace = "default"
+        mock_pod.metadata.labels = {"hexa-run-id": str(self.run.id)}
         mock_pod.status.phase = phase
         mock_pod.status.reason = reason
         return mock_pod
 
+    def _create_mock_log_response(self, logs: str):
+        """Helper to create the streamed response of a pod log request"""
+        return Mock(stream=Mock(side_effect=lambda *args: iter([logs.encode()])))
+
     def _create_mock_kubernetes_api(self, pod_phase="Succeeded", pod_reason=None):
         """Helper to create mock K8s API with realistic behavior"""
         mock_api = Mock()
@@ -177,7 +201,9 @@ class TestKubernetesPipelineIntegration(TestCase):
 
         mock_api.create_namespaced_pod.return_value = mock_pod
         mock_api.read_namespaced_pod.return_value = mock_pod
-        mock_api.read_namespaced_pod_log.return_value = "Pipeline execution logs"
+        mock_api.read_namespaced_pod_log.return_value = self._create_mock_log_response(
+            "Pipeline execution logs"
+        )
         mock_api.delete_namespaced_pod.return_value = None
 
         return mock_api
@@ -231,11 +257,11 @@ class TestKubernetesPipelineIntegration(TestCase):
         }
 
         pod = create_pod_kube(self.run, "test-image:latest", env_vars)
-        success, logs = monitor_pod_kube(self.run, pod)
+        success = monitor_pod_kube(self.run, pod)
 
         self.run.refresh_from_db()
         self.assertTrue(success)
-        self.assertIn("Pipeline execution logs", logs)
+        self.assertIn("Pipeline execution logs", self.run.get_logs())
 
         mock_api.create_namespaced_pod.assert_called_once()
         mock_api.read_namespaced_pod_log.assert_called_once()
@@ -256,10 +282,10 @@ class TestKubernetesPipelineIntegration(TestCase):
         }
 
         pod = create_pod_kube(self.run, "test-image:latest", env_vars)
-        success, logs = monitor_pod_kube(self.run, pod)
+        success = monitor_pod_kube(self.run, pod)
 
         self.assertFalse(success)
-        self.assertIn("Pipeline execution logs", logs)
+        self.assertIn("Pipeline execution logs", self.run.get_logs())
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
@@ -276,10 +302,12 @@ class TestKubernetesPipelineIntegration(TestCase):
         }
 
         pod = create_pod_kube(self.run, "test-image:latest", env_vars)
-        success, logs = monitor_pod_kube(self.run, pod)
+        success = monitor_pod_kube(self.run, pod)
 
         self.assertFalse(success)
-        self.assertIn(f"Timeout killed run {self.run.pipeline.name}", logs)
+        self.assertIn(
+            f"Timeout killed run {self.run.pipeline.name}", self.run.get_logs()
+        )
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch("hexa.pipelines.management.commands.pipelines_runner.sleep")
@@ -295,7 +323,9 @@ class TestKubernetesPipelineIntegration(TestCase):
 
         mock_api = Mock()
         mock_api.read_namespaced_pod.side_effect = pod_progression
-        mock_api.read_namespaced_pod_log.return_value = "logs"
+        mock_api.read_namespaced_pod_log.return_value = self._create_mock_log_response(
+            "logs"
+        )
         mock_api.delete_namespaced_pod.return_value = None
         mock_k8s_client.return_value = mock_api
 
@@ -308,6 +338,78 @@ class TestKubernetesPipelineIntegration(TestCase):
         self.assertIsNotNone(self.run.last_heartbeat)
         self.assertGreater(self.run.last_heartbeat, initial_heartbeat)
 
+    @patch("hexa.pipelines.management.commands.pipelines_runner.sleep")
+    @patch("hexa.pipelines.management.commands.pipelines_runner.CoreV1Api")
+    def test_monitor_uses_pod_watcher(self, mock_k8s_client, mock_sleep):
+        mock_api = self._create_mock_kubernetes_api("Succeeded")
+        mock_k8s_client.return_value = mock_api
+        pod_watcher = PodWatcher("default")
+        pod_watcher.synced = True
+        pod_watcher.watch(self.run.id)
+        pod_watcher._update("MODIFIED", self._create_mock_pod("Succeeded"))
+
+        success = monitor_pod_kube(
+            self.run, self._create_mock_pod("Running"), pod_watcher
+        )
+
+        self.assertTrue(success)
+        mock_api.read_namespaced_pod.assert_not_called()
+        mock_sleep.assert_not_called()
+        self.assertIsNone(pod_watcher.get(self.run.id))
+
+    @patch("hexa.pipelines.management.commands.pipelines_runner.sleep")
+    @patch("hexa.pipelines.management.commands.pipelines_runner.CoreV1Api")
+    def test_monitor_seeds_pod_watcher_with_attached_pod(
+        self, mock_k8s_client, mock_sleep
+    ):
+        mock_api = self._create_mock_kubernetes_api("Succeeded")
+        mock_k8s_client.return_value = mock_api
+        pod_watcher = PodWatcher("default")
+        pod_watcher.synced = True
+
+        # the pod completed before the run was re-attached: the stream sends no event for it
+        success = monitor_pod_kube(
+            self.run, self._create_mock_pod("Succeeded"), pod_watcher
+        )
+
+        self.assertTrue(success)
+        mock_api.read_namespaced_pod.assert_not_called()
+        self.assertIsNone(pod_watcher.get(self.run.id))
+
+    def test_pod_watcher_wait_returns_on_terminal_phase(self):
+        pod_watcher = PodWatcher("default")
+        pod_watcher.watch(self.run.id)
+        pod_watcher._update("ADDED", self._create_mock_pod("Running"))
+        self.assertEqual(
+            pod_watcher.wait(self.run.id, timeout=0).status.phase, "Running"
+        )
+
+        pod_watcher._update("DELETED", self._create_mock_pod("Running"))
+        self.assertEqual(
+            pod_watcher.wait(self.run.id, timeout=1).status.phase, "Failed"
+        )
+
+    def test_pod_watcher_forgets_pods(self):
+        pod_watcher = PodWatcher("default")
+        pod_watcher.watch(self.run.id)
+        pod_watcher._update("ADDED", self._create_mock_pod("Running"))
+        pod_watcher._update("MODIFIED", self._create_mock_pod("Succeeded"))
+
+        pod_watcher.forget(self.run.id)
+        # events of the deletion of the pod, after its run was monitored
+        pod_watcher._update("MODIFIED", self._create_mock_pod("Succeeded"))
+        pod_watcher._update("DELETED", self._create_mock_pod("Succeeded"))
+
+        self.assertEqual(pod_watcher.pods, {})
+        self.assertEqual(pod_watcher.supervised, set())
+
+    def test_pod_watcher_ignores_pods_not_supervised(self):
+        pod_watcher = PodWatcher("default")
+
+        pod_watcher._update("ADDED", self._create_mock_pod("Running"))
+
+        self.assertEqual(pod_watcher.pods, {})
+
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
     @patch("hexa.pipelines.management.commands.pipelines_runner.sleep")
@@ -335,10 +437,10 @@ class TestKubernetesPipelineIntegration(TestCase):
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
     @patch("hexa.pipelines.management.commands.pipelines_runner.k8s_config")
     @patch("hexa.pipelines.management.commands.pipelines_runner.CoreV1Api")
-    def test_attach_to_pod_when_no_pod_found_exits_gracefully(
+    def test_attach_to_pod_when_no_pod_found_returns_none(
         self, mock_k8s_client, mock_config
     ):
-        """Test that attach_to_pod_kube exits when no pod is found for the run."""
+        """Test that attach_to_pod_kube returns None when no pod is found for the run."""
         mock_api = Mock()
         mock_api.list_namespaced_pod.return_value.items = []
         mock_k8s_client.return_value = mock_api
@@ -346,10 +448,7 @@ class TestKubernetesPipelineIntegration(TestCase):
         self.run.state = PipelineRunState.RUNNING
         self.run.save()
 
-        with self.assertRaises(SystemExit) as cm:
-            attach_to_pod_kube(self.run)
-
-        self.assertEqual(cm.exception.code, 0)
+        self.assertIsNone(attach_to_pod_kube(self.run))
         mock_api.list_namespaced_pod.assert_called_once_with(
             namespace="default", label_selector=f"hexa-run-id={self.run.id}"
         )
@@ -372,10 +471,10 @@ class TestKubernetesPipelineIntegration(TestCase):
         }
 
         pod = create_pod_kube(self.run, "test-image:latest", env_vars)
-        success, logs = monitor_pod_kube(self.run, pod)
+        success = monitor_pod_kube(self.run, pod)
 
         self.assertTrue(success)
-        self.assertEqual(logs, "")
+        self.assertEqual(self.run.logs_size, 0)
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
@@ -395,7 +494,7 @@ class TestKubernetesPipelineIntegration(TestCase):
         }
 
         pod = create_pod_kube(self.run, "test-image:latest", env_vars)
-        success, logs = monitor_pod_kube(self.run, pod)
+        success = monitor_pod_kube(self.run, pod)
 
         self.assertTrue(success)
 
@@ -416,7 +515,7 @@ class TestKubernetesPipelineIntegration(TestCase):
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.FAILED)
-        self.assertIn("Killed due to heartbeat timeout", self.run.run_logs)
+        self.assertIn("Killed due to heartbeat timeout", self.run.get_logs())
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
@@ -434,13 +533,15 @@ class TestKubernetesPipelineIntegration(TestCase):
         mock_pod = self._create_mock_pod("Succeeded")
         mock_pod.spec.containers = [Mock(name="test-container")]
         mock_api.list_namespaced_pod.return_value.items = [mock_pod]
-        mock_api.read_namespaced_pod_log.return_value = "Final pod logs"
+        mock_api.read_namespaced_pod_log.return_value = self._create_mock_log_response(
+            "Final pod logs"
+        )
 
         process_zombie_runs()
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.SUCCESS)
-        self.assertEqual(self.run.run_logs, "Final pod logs")
+        self.assertEqual(self.run.get_logs(), "Final pod logs")
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
@@ -459,13 +560,17 @@ class TestKubernetesPipelineIntegration(TestCase):
         mock_pod = self._create_mock_pod("Running")
         mock_pod.spec.containers = [Mock(name="test-container")]
         mock_api.list_namespaced_pod.return_value.items = [mock_pod]
-        mock_api.read_namespaced_pod_log.return_value = "Current pod logs"
+        mock_api.read_namespaced_pod_log.return_value = self._create_mock_log_response(
+            "Current pod logs"
+        )
 
         process_zombie_runs()
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.FAILED)
-        self.assertIn("Killed due to heartbeat timeout", self.run.run_logs)
+        self.assertIn("Killed due to heartbeat timeout", self.run.get_logs())
+        self.assertIn("Current pod logs", self.run.get_logs())
+        self.assertNotIn("Old logs", self.run.get_logs())
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="docker")
     def test_zombie_runs_for_docker_spawner(self):
@@ -478,7 +583,7 @@ class TestKubernetesPipelineIntegration(TestCase):
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.FAILED)
-        self.assertIn("Killed due to heartbeat timeout", self.run.run_logs)
+        self.assertIn("Killed due to heartbeat timeout", self.run.get_logs())
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="docker")
     def test_zombie_terminating_run_marked_stopped(self):
@@ -491,7 +596,7 @@ class TestKubernetesPipelineIntegration(TestCase):
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.STOPPED)
-        self.assertIn("Stopped due to heartbeat timeout", self.run.run_logs)
+        self.assertIn("Stopped due to heartbeat timeout", self.run.get_logs())
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
@@ -512,7 +617,7 @@ class TestKubernetesPipelineIntegration(TestCase):
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.STOPPED)
-        self.assertIn("Stopped due to heartbeat timeout", self.run.run_logs)
+        self.assertIn("Stopped due to heartbeat timeout", self.run.get_logs())
 
     @override_settings(PIPELINE_SCHEDULER_SPAWNER="kubernetes")
     @patch.dict(os.environ, {"IS_LOCAL_DEV": "False"}, clear=False)
@@ -530,11 +635,378 @@ class TestKubernetesPipelineIntegration(TestCase):
         mock_pod = self._create_mock_pod("Succeeded")
         mock_pod.spec.containers = [Mock(name="test-container")]
         mock_api.list_namespaced_pod.return_value.items = [mock_pod]
-        mock_api.read_namespaced_pod_log.return_value = "Final pod logs"
+        mock_api.read_namespaced_pod_log.return_value = self._create_mock_log_response(
+            "Final pod logs"
+        )
 
         process_zombie_runs()
 
         self.run.refresh_from_db()
         self.assertEqual(self.run.state, PipelineRunState.STOPPED)
-        self.assertIn("Final pod logs", self.run.run_logs)
-        self.assertIn("Stopped due to heartbeat timeout", self.run.run_logs)
+        self.assertIn("Final pod logs", self.run.get_logs())
+        self.assertIn("Stopped due to heartbeat timeout", self.run.get_logs())
+
+
+@patch("hexa.pipelines.management.commands.pipelines_runner.sleep")
+class TestSpawners(TestCase):
+    def setUp(self):
+        self.workspace = create_workspace(slug="test-workspace", name="Test Workspace")
+        self.pipeline = Pipeline.objects.create(
+            workspace=self.workspace,
+            code="test_pipeline",
+            name="Test Pipeline",
+            type=PipelineType.NOTEBOOK,
+        )
+        self.run = PipelineRun.objects.create(
+            pipeline=self.pipeline,
+            state=PipelineRunState.RUNNING,
+            config={},
+            send_mail_notifications=False,
+            execution_date=timezone.now(),
+        )
+
+    def test_get_spawner(self, _):
+        self.assertIsInstance(get_spawner("docker"), DockerSpawner)
+        self.assertIsInstance(get_spawner("kubernetes"), KubernetesSpawner)
+        self.assertIsInstance(get_spawner("fake"), FakeSpawner)
+        self.assertIsNone(get_spawner("unknown"))
+        with override_settings(PIPELINE_SCHEDULER_SPAWNER="fake"):
+            self.assertIsInstance(get_spawner(), FakeSpawner)
+
+    def test_fake_spawner_success(self, mock_sleep):
+        self.assertTrue(execute_run(self.run, spawner=FakeSpawner(duration=0)))
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.state, PipelineRunState.SUCCESS)
+        self.assertIn("with the fake spawner", self.run.get_logs())
+        self.assertIn("Exited with code 0", self.run.get_logs())
+        mock_sleep.assert_not_called()
+
+    def test_fake_spawner_failure(self, _):
+        execute_run(self.run, spawner=FakeSpawner(duration=0, failure_rate=1))
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.state, PipelineRunState.FAILED)
+        self.assertIn("Exited with code 1", self.run.get_logs())
+
+    def test_fake_spawner_stopped(self, mock_sleep):
+        def stop(_):
+            PipelineRun.objects.filter(id=self.run.id).update(
+                state=PipelineRunState.TERMINATING
+            )
+
+        mock_sleep.side_effect = stop
+        spawner = FakeSpawner(duration=60)
+        execute_run(self.run, spawner=spawner)
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.state, PipelineRunState.STOPPED)
+        self.assertTrue(spawner.containers[self.run.id].killed)
+        self.assertIn("Killed", self.run.get_logs())
+
+    def test_fake_spawner_attach(self, _):
+        spawner = FakeSpawner(duration=0)
+        self.assertIsNone(spawner.attach(self.run))
+
+        container = spawner.create(self.run, "image", {})
+        self.assertIs(spawner.attach(self.run), container)
+
+    def test_attach_replaces_the_logs(self, _):
+        spawner = FakeSpawner(duration=0)
+        spawner.create(self.run, "image", {})
+        log = RunLogWriter(self.run)
+        log.write_line("Output of the previous runner")
+        log.flush()
+
+        execute_run(self.run, create_container=False, spawner=spawner)
+
+        self.run.refresh_from_db()
+        # the container is followed from its start
+        self.assertNotIn("Output of the previous runner", self.run.get_logs())
+        self.assertIn("Exited with code 0", self.run.get_logs())
+
+    def test_attach_without_container_ends_the_run(self, _):
+        self.run.state = PipelineRunState.RUNNING
+        self.run.last_heartbeat = timezone.now() - timedelta(hours=1)
+        self.run.save()
+        log = RunLogWriter(self.run)
+        log.write_line("Output of the previous runner")
+        log.flush()
+
+        self.assertTrue(
+            execute_run(self.run, create_container=False, spawner=FakeSpawner())
+        )
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.state, PipelineRunState.FAILED)
+        self.assertIsNotNone(self.run.duration)
+        # the logs stored so far are kept
+        self.assertIn("Output of the previous runner", self.run.get_logs())
+        self.assertIn("No container left to re-attach to", self.run.get_logs())
+        # the run is not claimed again as an orphan
+        self.assertEqual(claim_orphaned_runs(10), [])
+
+
+class TestRunLogs(TestCase):
+    def setUp(self):
+        self.workspace = create_workspace(slug="test-workspace", name="Test Workspace")
+        self.pipeline = Pipeline.objects.create(
+            workspace=self.workspace,
+            code="test_pipeline",
+            name="Test Pipeline",
+            type=PipelineType.NOTEBOOK,
+        )
+        self.run = PipelineRun.objects.create(
+            pipeline=self.pipeline,
+            state=PipelineRunState.RUNNING,
+            config={},
+            send_mail_notifications=False,
+            execution_date=timezone.now(),
+        )
+
+    @patch("hexa.pipelines.management.commands.pipelines_runner.LOG_CHUNK_SIZE", 4)
+    def test_writer_stores_chunks(self):
+        log = RunLogWriter(self.run)
+        log.write(b"abcdefghij")
+        self.assertEqual(self.run.log_chunks.count(), 2)
+        self.assertEqual(self.run.get_logs(), "abcdefgh")
+
+        log.flush()
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.logs_size, 10)
+        self.assertEqual(self.run.get_logs(), "abcdefghij")
+        self.assertEqual(self.run.read_logs(3, 6), (3, b"def"))
+
+    @override_settings(PIPELINE_RUN_LOGS_MAX_SIZE=8)
+    @patch("hexa.pipelines.management.commands.pipelines_runner.LOG_CHUNK_SIZE", 4)
+    def test_writer_keeps_the_tail_of_the_logs(self):
+        log = RunLogWriter(self.run)
+        log.write(b"0123456789abcdef")
+
+        self.assertEqual(
+            list(self.run.log_chunks.values_list("offset", flat=True)), [8, 12]
+        )
+        self.assertEqual(self.run.logs_total_size, 16)
+        self.assertEqual(self.run.read_logs(), (8, b"89abcdef"))
+        self.assertEqual(self.run.read_logs(0, 10), (8, b"89"))
+        self.assertEqual(self.run.get_logs(), "[8 bytes of logs truncated]\n89abcdef")
+
+    def test_writer_reset_drops_the_logs(self):
+        self.run.run_logs = "Legacy logs"
+        self.run.save()
+        log = RunLogWriter(self.run)
+        log.write_line("First attempt")
+        log.flush()
+
+        log.reset()
+        log.write_line("Second attempt")
+        log.flush()
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.get_logs(), "Second attempt\n")
+
+    def test_legacy_logs(self):
+        self.run.run_logs = "Legacy logs"
+        self.run.save()
+
+        self.assertEqual(self.run.get_logs(), "Legacy logs")
+        self.assertEqual(self.run.logs_total_size, 11)
+        self.assertEqual(self.run.read_logs(7), (7, b"logs"))
+
+    def test_follower_skips_what_was_read_when_reconnecting(self):
+        streams = iter(
+            [
+                iter([b"abc", b"def"]),
+                iter([b"ab", b"cdefgh"]),
+            ]
+        )
+        follower = LogFollower(lambda: next(streams, iter([])))
+        follower._follow()
+        follower._follow()
+
+        log = RunLogWriter(self.run)
+        follower.drain(log)
+        log.flush()
+        self.assertEqual(self.run.get_logs(), "abcdefgh")
+
+    @patch(
+        "hexa.pipelines.management.commands.pipelines_runner.LOG_FOLLOW_RETRY_INTERVAL",
+        0,
+    )
+    def test_follower_retries_until_the_container_has_started(self):
+        attempts = []
+
+        def open_stream():
+            attempts.append(True)
+            if len(attempts) < 3:
+                raise ApiException(status=400)
+            return iter([b"started"])
+
+        follower = LogFollower(open_stream).start()
+        log = RunLogWriter(self.run)
+        follower.finish(log)
+
+        self.assertGreaterEqual(len(attempts), 3)
+        self.assertEqual(self.run.get_logs(), "started")
+
+
+class TestRunClaiming(TestCase):
+    def setUp(self):
+        self.workspace = create_workspace(slug="test-workspace", name="Test Workspace")
+        self.pipeline = Pipeline.objects.create(
+            workspace=self.workspace,
+            code="test_pipeline",
+            name="Test Pipeline",
+            type=PipelineType.NOTEBOOK,
+        )
+
+    def _create_run(self, state, execution_date=None, last_heartbeat=None):
+        run = PipelineRun.objects.create(
+            pipeline=self.pipeline,
+            state=state,
+            config={},
+            send_mail_notifications=False,
+            execution_date=execution_date or timezone.now(),
+        )
+        if last_heartbeat:
+            PipelineRun.objects.filter(id=run.id).update(last_heartbeat=last_heartbeat)
+        return run
+
+    def test_claim_queued_runs(self):
+        now = timezone.now()
+        first = self._create_run(PipelineRunState.QUEUED, now - timedelta(minutes=2))
+        second = self._create_run(PipelineRunState.QUEUED, now - timedelta(minutes=1))
+        third = self._create_run(PipelineRunState.QUEUED, now)
+        self._create_run(PipelineRunState.SUCCESS, now - timedelta(minutes=5))
+
+        claimed = claim_queued_runs(2)
+
+        self.assertEqual([run.id for run in claimed], [first.id, second.id])
+        first.refresh_from_db()
+        third.refresh_from_db()
+        self.assertEqual(first.state, PipelineRunState.RUNNING)
+        self.assertEqual(third.state, PipelineRunState.QUEUED)
+
+    def test_claim_runs_of_queryset(self):
+        stale = timezone.now() - timedelta(minutes=5)
+        other_pipeline = Pipeline.objects.create(
+            workspace=self.workspace,
+            code="other_pipeline",
+            name="Other Pipeline",
+            type=PipelineType.NOTEBOOK,
+        )
+        queued = self._create_run(PipelineRunState.QUEUED)
+        orphan = self._create_run(PipelineRunState.RUNNING, last_heartbeat=stale)
+        other_queued = PipelineRun.objects.create(
+            pipeline=other_pipeline,
+            state=PipelineRunState.QUEUED,
+            config={},
+            execution_date=timezone.now(),
+        )
+        runs = PipelineRun.objects.filter(pipeline=self.pipeline)
+
+        self.assertEqual(claim_queued_runs(10, queryset=runs), [queued])
+        self.assertEqual(claim_orphaned_runs(10, queryset=runs), [orphan])
+        other_queued.refresh_from_db()
+        self.assertEqual(other_queued.state, PipelineRunState.QUEUED)
+
+    def test_claim_orphaned_runs(self):
+        stale = timezone.now() - timedelta(minutes=5)
+        orphan = self._create_run(PipelineRunState.RUNNING, last_heartbeat=stale)
+        supervised = self._create_run(PipelineRunState.RUNNING, last_heartbeat=stale)
+        self._create_run(PipelineRunState.RUNNING)
+
+        claimed = claim_orphaned_runs(10, exclude_ids=[supervised.id])
+
+        self.assertEqual([run.id for run in claimed], [orphan.id])
+        orphan.refresh_from_db()
+        self.assertGreater(orphan.last_heartbeat, stale)
+        self.assertEqual(claim_orphaned_runs(10, exclude_ids=[supervised.id]), [])
+
+    def test_heartbeat_batcher(self):
+        stale = timezone.now() - timedelta(minutes=5)
+        running = self._create_run(PipelineRunState.RUNNING, last_heartbeat=stale)
+        terminating = self._create_run(
+            PipelineRunState.TERMINATING, last_heartbeat=stale
+        )
+        heartbeats = HeartbeatBatcher()
+        heartbeats.beat(running.id)
+        heartbeats.beat(terminating.id)
+
+        with self.assertNumQueries(2):
+            heartbeats.flush([running.id, terminating.id])
+
+        running.refresh_from_db()
+        terminating.refresh_from_db()
+        self.assertGreater(running.last_heartbeat, stale)
+        self.assertGreater(terminating.last_heartbeat, stale)
+        self.assertFalse(heartbeats.is_terminating(running.id))
+        self.assertTrue(heartbeats.is_terminating(terminating.id))
+
+        with self.assertNumQueries(1):
+            heartbeats.flush([running.id])
+        self.assertFalse(heartbeats.is_terminating(terminating.id))
+
+    @patch("hexa.pipelines.management.commands.pipelines_runner.supervise_run")
+    def test_supervisor_respects_max_concurrency(self, mock_supervise_run):
+        runs = [self._create_run(PipelineRunState.QUEUED) for _ in range(3)]
+        supervisor = RunSupervisor(max_concurrency=2)
+        supervisor.executor = Mock()
+        supervisor.executor.submit.return_value.done.return_value = False
+
+        supervisor.tick()
+
+        self.assertEqual(supervisor.available_slots, 0)
+        self.assertEqual(supervisor.executor.submit.call_count, 2)
+        self.assertEqual(
+            PipelineRun.objects.filter(
+                id__in=[run.id for run in runs], state=PipelineRunState.QUEUED
+            ).count(),
+            1,
+        )
+
+        supervisor.executor.submit.return_value.done.return_value = True
+        supervisor.tick()
+
+        self.assertEqual(supervisor.executor.submit.call_count, 3)
+        self.assertFalse(
+            PipelineRun.objects.filter(
+                id__in=[run.id for run in runs], state=PipelineRunState.QUEUED
+            ).exists()
+        )
+
+    @patch("hexa.pipelines.management.commands.pipelines_runner.db")
+    def test_wait_for_queued_runs(self, mock_db):
+        connection = mock_db.connection.connection
+        connection.notifies.return_value = iter(
+            [Mock(channel=PIPELINE_RUN_QUEUE_CHANNEL)]
+        )
+        self.assertTrue(wait_for_queued_runs(60))
+        connection.notifies.assert_called_once_with(timeout=60, stop_after=1)
+
+        connection.notifies.return_value = iter([])
+        self.assertFalse(wait_for_queued_runs(60))
+
+    @patch("hexa.pipelines.management.commands.pipelines_runner.db")
+    def test_wait_for_queued_runs_listens_again_after_reconnection(self, mock_db):
+        cursor = mock_db.connection.cursor.return_value.__enter__.return_value
+        mock_db.connection.connection.notifies.return_value = iter([])
+        wait_for_queued_runs(0)
+        wait_for_queued_runs(0)
+        self.assertEqual(cursor.execute.call_count, 1)
+
+        # Django opened a new connection
+        mock_db.connection.connection = Mock(notifies=Mock(return_value=iter([])))
+        wait_for_queued_runs(0)
+
+        self.assertEqual(cursor.execute.call_count, 2)
+
+    @patch("hexa.pipelines.management.commands.pipelines_runner.db")
+    def test_wait_for_queued_runs_connection_lost(self, mock_db):
+        mock_db.connection.connection.notifies.side_effect = psycopg.OperationalError
+
+        with self.assertLogs(
+            "hexa.pipelines.management.commands.pipelines_runner", "WARNING"
+        ):
+            self.assertFalse(wait_for_queued_runs(60))
+        mock_db.connection.close.assert_called_once()
@@ -189,6 +189,144 @@ class PipelineSchedulerTest(TestCase):
             self.assertEqual(final_run_count, 1)
 
 
+class PipelineNextExecutionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER_ADMIN = User.objects.create_user(
+            "next_execution_admin@bluesquarehub.com",
+            "admin",
+            is_superuser=True,
+        )
+        cls.WORKSPACE = create_workspace(
+            cls.USER_ADMIN,
+            name="NextExecutionWS",
+            description="",
+            countries=[{"code": "AL"}],
+        )
+        cls.PIPELINE = Pipeline.objects.create(
+            workspace=cls.WORKSPACE,
+            name="Next execution",
+            code="next_execution",
+            schedule="0 6 * * *",
+            type=PipelineType.NOTEBOOK,
+        )
+
+    def test_next_execution_set_from_schedule(self):
+        self.assertIsNotNone(self.PIPELINE.next_execution_at)
+        self.assertGreater(self.PIPELINE.next_execution_at, timezone.now())
+        self.assertEqual(self.PIPELINE.next_execution_at.hour, 6)
+        self.assertEqual(self.PIPELINE.next_execution_at.minute, 0)
+
+    def test_next_execution_follows_schedule_changes(self):
+        self.PIPELINE.update_if_has_perm(
+            principal=self.USER_ADMIN, schedule="30 18 * * *"
+        )
+        self.PIPELINE.refresh_from_db()
+        self.assertEqual(self.PIPELINE.next_execution_at.hour, 18)
+        self.assertEqual(self.PIPELINE.next_execution_at.minute, 30)
+
+        self.PIPELINE.update_if_has_perm(principal=self.USER_ADMIN, schedule=None)
+        self.PIPELINE.refresh_from_db()
+        self.assertIsNone(self.PIPELINE.next_execution_at)
+
+    def test_next_execution_follows_schedule_saved_directly(self):
+        # As done by the admin, without set_schedule
+        self.PIPELINE.schedule = "30 18 * * *"
+        self.PIPELINE.save()
+
+        self.PIPELINE.refresh_from_db()
+        self.assertEqual(self.PIPELINE.next_execution_at.hour, 18)
+        self.assertEqual(self.PIPELINE.next_execution_at.minute, 30)
+
+    def test_next_execution_kept_when_schedule_unchanged(self):
+        due_at = timezone.now() - timedelta(seconds=1)
+        Pipeline.objects.filter(id=self.PIPELINE.id).update(next_execution_at=due_at)
+        self.PIPELINE.refresh_from_db()
+
+        self.PIPELINE.name = "Renamed"
+        self.PIPELINE.save()
+
+        self.PIPELINE.refresh_from_db()
+        self.assertEqual(self.PIPELINE.next_execution_at, due_at)
+
+    def test_deleted_pipeline_not_scheduled(self):
+        from hexa.pipelines.management.commands.pipelines_scheduler import (
+            get_due_pipelines,
+        )
+
+        self.PIPELINE.delete()
+        self.assertIsNone(
+            Pipeline.all_objects.get(id=self.PIPELINE.id).next_execution_at
+        )
+        Pipeline.all_objects.filter(id=self.PIPELINE.id).update(
+            next_execution_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(get_due_pipelines(timezone.now()), [])
+
+        self.PIPELINE.restore()
+        self.assertIsNotNone(
+            Pipeline.objects.get(id=self.PIPELINE.id).next_execution_at
+        )
+
+    def test_get_due_pipelines(self):
+        from hexa.pipelines.management.commands.pipelines_scheduler import (
+            get_due_pipelines,
+        )
+
+        Pipeline.objects.create(
+            workspace=self.WORKSPACE,
+            name="Not scheduled",
+            code="not_scheduled",
+            type=PipelineType.NOTEBOOK,
+        )
+        due_at = timezone.now() - timedelta(seconds=1)
+        Pipeline.objects.filter(id=self.PIPELINE.id).update(next_execution_at=due_at)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_due_pipelines(timezone.now()), [(due_at, str(self.PIPELINE.id))]
+            )
+
+        self.WORKSPACE.archived = True
+        self.WORKSPACE.save()
+        self.assertEqual(get_due_pipelines(timezone.now()), [])
+
+    def test_launch_moves_next_execution_forward(self):
+        from hexa.pipelines.management.commands.pipelines_scheduler import (
+            launch_scheduled_pipeline,
+        )
+
+        due_at = timezone.now() - timedelta(days=3)
+        Pipeline.objects.filter(id=self.PIPELINE.id).update(next_execution_at=due_at)
+
+        with patch("hexa.analytics.api.track"):
+            launch_scheduled_pipeline(str(self.PIPELINE.id), due_at)
+
+        self.PIPELINE.refresh_from_db()
+        # Missed executions are not caught up
+        self.assertGreater(self.PIPELINE.next_execution_at, timezone.now())
+        self.assertEqual(
+            PipelineRun.objects.filter(
+                pipeline=self.PIPELINE, trigger_mode=PipelineRunTrigger.SCHEDULED
+            ).count(),
+            1,
+        )
+
+    def test_launch_skips_stale_entries(self):
+        from hexa.pipelines.management.commands.pipelines_scheduler import (
+            launch_scheduled_pipeline,
+        )
+
+        next_execution_at = self.PIPELINE.next_execution_at
+        launch_scheduled_pipeline(
+            str(self.PIPELINE.id), timezone.now() - timedelta(minutes=1)
+        )
+
+        self.PIPELINE.refresh_from_db()
+        self.assertEqual(self.PIPELINE.next_execution_at, next_execution_at)
+        self.assertFalse(PipelineRun.objects.filter(pipeline=self.PIPELINE).exists())
+
+
 class ScheduledPipelineVersionTest(TestCase):
     """Tests that the scheduler respects the pinned scheduled_pipeline_version."""
 
@@ -226,11 +364,10 @@ class ScheduledPipelineVersionTest(TestCase):
     def _run_scheduler_once(self):
         """Invoke the scheduler command for a single iteration.
 
-        A past seed run is required so the pipeline's next scheduled time
-        falls before now (negative next_exec_delay), which means the
-        per-pipeline sleep is skipped and the pipeline fires immediately.
-        The first sleep call that occurs is therefore the end-of-loop sleep,
-        which we raise StopIteration on to break the while-True loop.
+        The next execution date of the pipeline is moved to the past so that
+        it fires immediately. The first sleep call that occurs is therefore
+        the wait for the next refresh, which we raise StopIteration on to
+        break the while-True loop.
         """
         from hexa.pipelines.management.commands.pipelines_scheduler import Command
 
@@ -243,6 +380,9 @@ class ScheduledPipelineVersionTest(TestCase):
             state=PipelineRunState.SUCCESS,
             config={},
         )
+        Pipeline.objects.filter(id=self.PIPELINE.id).update(
+            next_execution_at=timezone.now() - timedelta(minutes=1)
+        )
 
         with patch(
             "hexa.pipelines.management.commands.pipelines_scheduler.sleep",
@@ -1152,6 +1152,49 @@ def test_pipeline(input_file, threshold, enable_debug):
                 r["data"]["addPipelineOutput"],
             )
 
+    def test_log_pipeline_messages(self):
+        self.test_create_pipeline_version()
+
+        pipeline = Pipeline.objects.get(code="monbeaupipeline")
+        run = pipeline.run(
+            user=self.USER_ROOT,
+            pipeline_version=pipeline.last_version,
+            trigger_mode=PipelineRunTrigger.MANUAL,
+            config={},
+        )
+        run.state = PipelineRunState.RUNNING
+        run.save()
+
+        access_token = Signer().sign_object(str(run.access_token))
+
+        r = self.run_query(
+            """
+            mutation logPipelineMessages ($input: LogPipelineMessagesInput!) {
+                logPipelineMessages(input: $input) {
+                      success
+                      errors
+                    }
+            }""",
+            {
+                "input": {
+                    "messages": [
+                        {"priority": "INFO", "message": "Starting"},
+                        {"priority": "ERROR", "message": "Something went wrong"},
+                    ]
+                }
+            },
+            headers={"HTTP_Authorization": f"bearer {access_token}"},
+        )
+        self.assertEqual(
+            {"success": True, "errors": []},
+            r["data"]["logPipelineMessages"],
+        )
+        self.assertEqual(
+            [msg["message"] for msg in run.get_messages()],
+            ["Starting", "Something went wrong"],
+        )
+        self.assertTrue(run.has_error_messages())
+
     def test_pipeline_run_table_output_failed(self):
         self.test_create_pipeline_version()
         self.client.force_login(self.USER_ROOT)
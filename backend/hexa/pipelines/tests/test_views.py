@@ -3,7 +3,7 @@ import base64
 import random
 import string
 import uuid
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 from urllib.parse import urlencode
 
 from django.urls import reverse
@@ -11,9 +11,11 @@ from django.utils import timezone
 
 from hexa.core.test import TestCase
 from hexa.core.test.utils import collect_async_stream, parse_sse_stream
+from hexa.pipelines.broadcaster import RunUpdate
 from hexa.pipelines.models import (
     Pipeline,
     PipelineRun,
+    PipelineRunLogChunk,
     PipelineRunState,
     PipelineRunTrigger,
     PipelineType,
@@ -586,68 +588,162 @@ class SSEStreamTest(TestCase):
 
     # --- Running run (transitions to terminal while streaming) ---
 
-    def test_running_run_transitions_and_sends_done(self):
+    def test_running_run_streams_broadcasted_updates(self):
         run = self._make_run(
             PipelineRunState.RUNNING,
             messages=[{"message": "Hello", "timestamp": None, "priority": "INFO"}],
         )
         self.client.force_login(self.USER)
 
-        call_count = 0
-
-        def on_get():
-            nonlocal call_count
-            call_count += 1
-            if call_count >= 2:
-                run.state = PipelineRunState.SUCCESS
-
+        world = {"message": "World", "timestamp": None, "priority": "INFO"}
+        subscription = _FakeSubscription(
+            [
+                None,
+                RunUpdate(PipelineRunState.RUNNING, 0, [run.messages[0], world]),
+                RunUpdate(PipelineRunState.SUCCESS, 2, []),
+            ]
+        )
         with (
-            patch("asyncio.sleep", new_callable=AsyncMock),
             patch(
                 "hexa.pipelines.views.PipelineRun.objects.filter_for_user",
-                return_value=_MockQuerySet(run, on_get=on_get),
+                return_value=_MockQuerySet(run),
             ),
+            patch(
+                "hexa.pipelines.views.pipeline_run_broadcaster.subscribe",
+                return_value=subscription,
+            ) as mock_subscribe,
         ):
             response = self.client.get(self._url(run.id))
             events = self._consume(response)
 
+        mock_subscribe.assert_called_once_with(run.id, 0)
+        self.assertTrue(subscription.closed)
         message_events = [e for e in events if e["event"] == "message"]
-        done_events = [e for e in events if e["event"] == "done"]
-        self.assertEqual(len(message_events), 1)
-        self.assertEqual(message_events[0]["data"]["message"], "Hello")
-        self.assertEqual(len(done_events), 1)
+        self.assertEqual(
+            [e["data"]["message"] for e in message_events], ["Hello", "World"]
+        )
+        self.assertEqual(events[-1]["event"], "done")
+        self.assertEqual(events[-1]["data"]["status"], PipelineRunState.SUCCESS)
 
     def test_running_run_sends_timeout_when_max_duration_exceeded(self):
         run = self._make_run(PipelineRunState.RUNNING, messages=[])
         self.client.force_login(self.USER)
 
+        subscription = _FakeSubscription([])
         with (
-            patch("asyncio.sleep", new_callable=AsyncMock),
             patch("hexa.pipelines.views.MAX_DURATION", 0),
             patch(
                 "hexa.pipelines.views.PipelineRun.objects.filter_for_user",
                 return_value=_MockQuerySet(run),
             ),
+            patch(
+                "hexa.pipelines.views.pipeline_run_broadcaster.subscribe",
+                return_value=subscription,
+            ),
         ):
             response = self.client.get(self._url(run.id))
             events = self._consume(response)
 
         self.assertEqual(events[-1]["event"], "timeout")
+        self.assertTrue(subscription.closed)
+
+
+class PipelineRunLogsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.USER = User.objects.create_user(
+            "logs_user@example.com", "password", is_superuser=True
+        )
+        cls.OTHER_USER = User.objects.create_user("logs_other@example.com", "password")
+        cls.WORKSPACE = create_workspace(
+            cls.USER, name="Logs Test Workspace", description=""
+        )
+        cls.PIPELINE = Pipeline.objects.create(
+            workspace=cls.WORKSPACE, name="Logs Test Pipeline", code="logs-pipeline"
+        )
+        cls.RUN = PipelineRun.objects.create(
+            pipeline=cls.PIPELINE,
+            user=cls.USER,
+            run_id="logs-test-run",
+            execution_date=timezone.now(),
+            trigger_mode=PipelineRunTrigger.MANUAL,
+            state=PipelineRunState.SUCCESS,
+            logs_size=16,
+        )
+        # The head of the logs has been dropped
+        PipelineRunLogChunk.objects.create(
+            run=cls.RUN, offset=8, size=8, data=b"89abcdef"
+        )
+
+    def _url(self, run_id):
+        return reverse("pipelines:pipeline_run_logs", args=[run_id])
+
+    def test_other_user_cannot_access_logs(self):
+        self.client.force_login(self.OTHER_USER)
+        response = self.client.get(self._url(self.RUN.id))
+        self.assertEqual(response.status_code, 404)
+
+    def test_logs(self):
+        self.client.force_login(self.USER)
+        response = self.client.get(self._url(self.RUN.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"89abcdef")
+        self.assertEqual(response["X-Logs-Offset"], "8")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_logs_range(self):
+        self.client.force_login(self.USER)
+        response = self.client.get(self._url(self.RUN.id), HTTP_RANGE="bytes=10-12")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, b"abc")
+        self.assertEqual(response["Content-Range"], "bytes 10-12/16")
+
+    def test_logs_suffix_range(self):
+        self.client.force_login(self.USER)
+        response = self.client.get(self._url(self.RUN.id), HTTP_RANGE="bytes=-2")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, b"ef")
+        self.assertEqual(response["Content-Range"], "bytes 14-15/16")
+
+    def test_logs_range_starting_in_dropped_head(self):
+        self.client.force_login(self.USER)
+        response = self.client.get(self._url(self.RUN.id), HTTP_RANGE="bytes=4-9")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, b"89")
+        self.assertEqual(response["Content-Range"], "bytes 8-9/16")
+
+    def test_logs_unsatisfiable_range(self):
+        self.client.force_login(self.USER)
+        for header in ("bytes=16-", "bytes=0-3"):
+            response = self.client.get(self._url(self.RUN.id), HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response["Content-Range"], "bytes */16")
+
+
+class _FakeSubscription:
+    """Broadcaster subscription stub that returns a fixed list of updates."""
+
+    def __init__(self, updates):
+        self._updates = list(updates)
+        self.closed = False
+
+    async def get(self, timeout):
+        return self._updates.pop(0) if self._updates else None
+
+    def close(self):
+        self.closed = True
 
 
 class _MockQuerySet:
     """Minimal queryset stub that returns a fixed run for .get()."""
 
-    def __init__(self, run, on_get=None):
+    def __init__(self, run):
         self._run = run
-        self._on_get = on_get
 
     def only(self, *fields):
         return self
 
     def get(self, id):
         if str(self._run.id) == str(id):
-            if self._on_get:
-                self._on_get()
             return self._run
         raise PipelineRun.DoesNotExist
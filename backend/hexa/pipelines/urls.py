@@ -19,6 +19,11 @@ urlpatterns = [
         views.stream_pipeline_run_messages,
         name="stream_pipeline_run_messages",
     ),
+    path(
+        "runs/<uuid:run_id>/logs/",
+        views.pipeline_run_logs,
+        name="pipeline_run_logs",
+    ),
     path(
         "<token>/run/<uuid:version_id>",
         views.run_pipeline,
@@ -1,4 +1,3 @@
-import asyncio
 import base64
 import binascii
 import json
@@ -24,20 +23,20 @@ from django.http import (
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 
 from hexa.analytics.api import track
 from hexa.app import get_hexa_app_configs
 from hexa.core.sse import (
     MAX_DURATION,
     PING_INTERVAL,
-    POLL_INTERVAL,
     format_sse,
     sse_response,
 )
-from hexa.core.views_utils import disable_cors
+from hexa.core.views_utils import disable_cors, parse_range_header
 from hexa.pipelines.models import Environment, PipelineRunLogLevel
 
+from .broadcaster import RunUpdate, pipeline_run_broadcaster
 from .credentials import PipelinesCredentials
 from .models import (
     Pipeline,
@@ -241,45 +240,69 @@ _TERMINAL_STATES = {
 }
 
 
-def _get_run(run_id, user):
-    run = (
+def _fetch_run(run_id, user):
+    return (
         PipelineRun.objects.filter_for_user(user)
         .only("messages", "state")
         .get(id=run_id)
     )
-    connection.close()
-    return run
-
 
-_get_run_async = sync_to_async(_get_run)
 
+def _get_run(run_id, user):
+    try:
+        return _fetch_run(run_id, user)
+    finally:
+        connection.close()
 
-async def _message_stream(run_id: int, cursor: int, user):
-    start = time.monotonic()
-    last_ping = start
 
-    while True:
-        run = await _get_run_async(run_id, user)
-        messages_list = run.messages or []
+def _get_run_messages(run_id, cursor: int, user):
+    """Return the state of the run and the messages logged after position `cursor`."""
+    try:
+        run = _fetch_run(run_id, user)
+        return run.state, run.get_messages(after=cursor)
+    finally:
+        # Both queries share the connection, closed once they are done
+        connection.close()
 
-        for msg in messages_list[cursor:]:
-            yield format_sse("message", msg)
-            cursor += 1
 
-        now = time.monotonic()
-        if now - last_ping >= PING_INTERVAL:
-            yield format_sse("ping", {})
-            last_ping = now
+_get_run_async = sync_to_async(_get_run)
+_get_run_messages_async = sync_to_async(_get_run_messages)
 
-        if run.state in _TERMINAL_STATES:
-            yield format_sse("done", {"status": run.state})
-            return
 
-        if now - start >= MAX_DURATION:
-            yield format_sse("timeout", {})
-            return
+async def _message_stream(run_id: int, cursor: int, user):
+    start = time.monotonic()
+    last_ping = start
 
-        await asyncio.sleep(POLL_INTERVAL)
+    # Subscribe before the first read so that no message logged in between is missed
+    subscription = pipeline_run_broadcaster.subscribe(run_id, cursor)
+    try:
+        state, messages_list = await _get_run_messages_async(run_id, cursor, user)
+        update = RunUpdate(state, cursor, messages_list)
+        while True:
+            for position, msg in enumerate(update.messages, start=update.position):
+                # Updates can overlap with the messages already sent
+                if position >= cursor:
+                    yield format_sse("message", msg)
+                    cursor = position + 1
+
+            now = time.monotonic()
+            if now - last_ping >= PING_INTERVAL:
+                yield format_sse("ping", {})
+                last_ping = now
+
+            if update.state in _TERMINAL_STATES:
+                yield format_sse("done", {"status": update.state})
+                return
+
+            if now - start >= MAX_DURATION:
+                yield format_sse("timeout", {})
+                return
+
+            update = await subscription.get(
+                timeout=min(PING_INTERVAL, MAX_DURATION - (now - start))
+            ) or RunUpdate(update.state, cursor, [])
+    finally:
+        subscription.close()
 
 
 async def stream_pipeline_run_messages(
@@ -302,10 +325,10 @@ async def stream_pipeline_run_messages(
         cursor = 0
 
     if run.state in _TERMINAL_STATES:
-        messages_list = run.messages or []
+        _, messages_list = await _get_run_messages_async(run.id, cursor, request.user)
 
         async def finished_stream():
-            for msg in messages_list[cursor:]:
+            for msg in messages_list:
                 yield format_sse("message", msg)
             yield format_sse("done", {"status": run.state})
 
@@ -314,3 +337,45 @@ async def stream_pipeline_run_messages(
         generator = _message_stream(run.id, cursor, request.user)
 
     return sse_response(generator)
+
+
+@require_GET
+def pipeline_run_logs(request: HttpRequest, run_id: uuid.UUID) -> HttpResponse:
+    """Serve the logs of a pipeline run, or the byte range of them given in the `Range` header.
+
+    Only the tail of large logs is kept: the `X-Logs-Offset` header gives the offset of the first
+    returned byte in the whole logs.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    try:
+        run = (
+            PipelineRun.objects.filter_for_user(request.user)
+            .only("logs_size", "run_logs")
+            .get(id=run_id)
+        )
+    except PipelineRun.DoesNotExist:
+        raise Http404("Pipeline run not found")
+
+    size = run.logs_total_size
+    try:
+        byte_range = parse_range_header(request.headers.get("Range"), size)
+        offset, data = run.read_logs(*(byte_range or (0, size)))
+        if byte_range and not data:
+            raise ValueError("The range is no longer kept")
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    response = HttpResponse(
+        data,
+        content_type="text/plain; charset=utf-8",
+        status=206 if byte_range else 200,
+    )
+    response["Accept-Ranges"] = "bytes"
+    response["X-Logs-Offset"] = offset
+    if byte_range:
+        response["Content-Range"] = f"bytes {offset}-{offset + len(data) - 1}/{size}"
+    return response
@@ -1,10 +1,11 @@
 from ariadne import QueryType
 from django.db.models import Case, FloatField, QuerySet, Value, When
 
+from hexa.core.concurrency import fan_out
 from hexa.core.graphql import result_page
 from hexa.databases.utils import get_database_definition
 from hexa.datasets.models import Dataset
-from hexa.files import storage
+from hexa.files.models import BucketObject
 from hexa.pipeline_templates.models import PipelineTemplate
 from hexa.pipelines.models import Pipeline
 from hexa.user_management.models import Organization
@@ -12,6 +13,10 @@ from hexa.workspaces.models import Workspace
 
 search_query = QueryType()
 
+# Workspace databases queried concurrently by the search, and seconds given to each of them to answer
+WORKSPACE_SEARCH_MAX_WORKERS = 8
+WORKSPACE_SEARCH_TIMEOUT = 5
+
 
 def apply_scored_search(queryset: QuerySet, fields: list[str], query: str):
     if not query:
@@ -144,18 +149,31 @@ def resolve_search_database_tables(
             id=organization_id
         ).workspaces.values_list("slug", flat=True)
     request = info.context["request"]
-
+    if not query:
+        return result_page([], page=page, per_page=per_page)
+
+    # The databases of the workspaces are queried concurrently: the tables of the databases that fail or do not answer
+    # in time are left out of the results
+    definitions = fan_out(
+        lambda workspace: get_database_definition(
+            workspace=workspace,
+            # The calls are bounded too: a call still running after the timeout holds a thread of the fan-outs
+            connect_timeout=WORKSPACE_SEARCH_TIMEOUT,
+            timeout_ms=WORKSPACE_SEARCH_TIMEOUT * 1000,
+        ),
+        Workspace.objects.filter_for_workspace_slugs(request.user, workspace_slugs),
+        max_workers=WORKSPACE_SEARCH_MAX_WORKERS,
+        timeout=WORKSPACE_SEARCH_TIMEOUT,
+    )
     tables = [
         {
             "workspace": workspace,
             "database_table": table,
-            "score": 1.0 if query and table["name"].lower() == query.lower() else 0.5,
+            "score": 1.0 if table["name"].lower() == query.lower() else 0.5,
         }
-        for workspace in Workspace.objects.filter_for_workspace_slugs(
-            request.user, workspace_slugs
-        )
-        for table in get_database_definition(workspace=workspace)
-        if query and query.lower() in table["name"].lower()
+        for workspace, definition in definitions.results
+        for table in definition
+        if query.lower() in table["name"].lower()
     ]
     return result_page(tables, page=page, per_page=per_page)
 
@@ -178,23 +196,32 @@ def resolve_search_files(
         ).workspaces.values_list("slug", flat=True)
     request = info.context["request"]
 
-    files = [
-        {
-            "workspace": workspace,
-            "file": file,
-            "score": 1.0 if query and query.lower() in file.name.lower() else 0.5,
-        }
-        for workspace in Workspace.objects.filter_for_workspace_slugs(
-            request.user, workspace_slugs
+    # Files are searched in the index of the workspace buckets (see hexa.files.index)
+    files = (
+        BucketObject.objects.filter(
+            workspace__in=Workspace.objects.filter_for_workspace_slugs(
+                request.user, workspace_slugs
+            ),
+            name__icontains=query,
         )
-        if workspace.bucket_name
-        for file in storage.list_bucket_objects(
-            bucket_name=workspace.bucket_name,
-            match_glob=f"*{query}*",
-            prefix=prefix,
-        ).items
+        .select_related("workspace")
+        .annotate(
+            score=Case(
+                When(name__iexact=query, then=Value(1.0)),
+                default=Value(0.5),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-score", "name", "id")
+    )
+    if prefix:
+        files = files.filter(key__startswith=prefix)
+    result = result_page(files, page=page, per_page=per_page)
+    result["items"] = [
+        {"workspace": file.workspace, "file": file, "score": file.score}
+        for file in result["items"]
     ]
-    return result_page(files, page=page, per_page=per_page)
+    return result
 
 
 bindables = [search_query]
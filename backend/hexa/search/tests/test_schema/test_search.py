@@ -1,8 +1,11 @@
-from unittest.mock import patch
+from unittest.mock import ANY, patch
+
+import psycopg2
 
 from hexa.core.test import GraphQLTestCase
 from hexa.datasets.models import Dataset
 from hexa.files.backends.base import StorageObject
+from hexa.files.index import index_objects
 from hexa.pipeline_templates.models import PipelineTemplate
 from hexa.pipelines.models import Pipeline
 from hexa.tags.models import Tag
@@ -557,18 +560,19 @@ class SearchResolversTest(GraphQLTestCase):
         }
         self.assertEqual(template_codes, {"org-template-a", "org-template-b"})
 
-    @patch("hexa.files.storage.list_bucket_objects")
-    def test_search_files(self, mock_list_bucket_objects):
+    def test_search_files(self):
         self.client.force_login(self.USER)
 
-        mock_list_bucket_objects.return_value.items = [
-            StorageObject(
-                name="file1", key="file1", path="file1", type="file", size=100
-            ),
-            StorageObject(
-                name="file2", key="file2", path="file2", type="file", size=200
-            ),
-        ]
+        for workspace in [self.WORKSPACE1, self.WORKSPACE2, self.WORKSPACE3]:
+            index_objects(
+                workspace,
+                [
+                    StorageObject(
+                        name=name, key=f"dir/{name}", path=name, type="file", size=100
+                    )
+                    for name in ["file1", "FILE10.csv", "file2"]
+                ],
+            )
 
         response = self.run_query(
             """
@@ -577,7 +581,10 @@ class SearchResolversTest(GraphQLTestCase):
                     items {
                         file {
                             name
+                            key
                             path
+                            size
+                            type
                         }
                         workspace {
                             name
@@ -591,31 +598,84 @@ class SearchResolversTest(GraphQLTestCase):
                 "query": "file1",
                 "page": 1,
                 "perPage": 10,
-                "workspaceSlugs": ["workspace1", "workspace2"],
+                "workspaceSlugs": ["workspace1", "workspace2", "workspace3"],
             },
         )
 
+        items = response["data"]["searchFiles"]["items"]
         self.assertEqual(
-            len(response["data"]["searchFiles"]["items"]),
-            4,  # 2 files * 2 workspaces
+            len(items),
+            4,  # 2 matching files * 2 workspaces of the user
         )
-
-        items = response["data"]["searchFiles"]["items"]
-        expected_items = [
+        self.assertIn(
             {
-                "file": {"name": "file1", "path": "file1"},
+                "file": {
+                    "name": "file1",
+                    "key": "dir/file1",
+                    "path": "bucket_workspace1/dir/file1",
+                    "size": 100,
+                    "type": "file",
+                },
                 "score": 1.0,
                 "workspace": {"name": "Workspace 1"},
             },
+            items,
+        )
+        self.assertIn(
             {
-                "file": {"name": "file2", "path": "file2"},
+                "file": {
+                    "name": "FILE10.csv",
+                    "key": "dir/FILE10.csv",
+                    "path": "bucket_workspace2/dir/FILE10.csv",
+                    "size": 100,
+                    "type": "file",
+                },
                 "score": 0.5,
-                "workspace": {"name": "Workspace 1"},
+                "workspace": {"name": "Workspace 2"},
             },
-        ]
+            items,
+        )
+        self.assertEqual([item["score"] for item in items], [1.0, 1.0, 0.5, 0.5])
 
-        for expected_item in expected_items:
-            self.assertIn(expected_item, items)
+    @patch("hexa.search.schema.queries.get_database_definition")
+    def test_search_database_tables_partial(self, mock_get_database_definition):
+        self.client.force_login(self.USER)
+
+        def get_database_definition(workspace, **kwargs):
+            if workspace.slug == "workspace1":
+                raise psycopg2.OperationalError("Connection refused")
+            return [{"name": "table"}]
+
+        mock_get_database_definition.side_effect = get_database_definition
+
+        with self.assertLogs("hexa.core.concurrency", level="WARNING"):
+            response = self.run_query(
+                """
+                query searchDatabaseTables($query: String!, $workspaceSlugs: [String]!) {
+                    searchDatabaseTables(query: $query, workspaceSlugs: $workspaceSlugs) {
+                        items {
+                            databaseTable {
+                                name
+                            }
+                            workspace {
+                                name
+                            }
+                        }
+                    }
+                }
+                """,
+                {"query": "table", "workspaceSlugs": ["workspace1", "workspace2"]},
+            )
+
+        self.assertEqual(
+            response["data"]["searchDatabaseTables"]["items"],
+            [
+                {
+                    "databaseTable": {"name": "table"},
+                    "workspace": {"name": "Workspace 2"},
+                }
+            ],
+        )
 
     @patch("hexa.search.schema.queries.get_database_definition")
     def test_search_database_tables(self, mock_get_database_definition):
@@ -675,3 +735,7 @@ class SearchResolversTest(GraphQLTestCase):
                 },
             ],
         )
+        # A database that does not answer can not hold a thread of the fan-outs for long
+        mock_get_database_definition.assert_called_with(
+            workspace=ANY, connect_timeout=5, timeout_ms=5000
+        )